@@ -0,0 +1,149 @@
+"""下载写入路径的吞吐量测试
+
+在本机启动一个支持Range请求的HTTP服务器，分别用原来的逐块写入方式、SegmentedDownloader
+（单连接和多连接）以及本地文件复制下载同一个测试文件，输出各自的吞吐量。
+
+用法（在项目根目录运行）:
+    python benchmarks/download_benchmark.py --size 256 --rounds 3
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import http.server
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.checksums import StreamingHasher
+from src.core.downloader import SegmentedDownloader
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """支持单个字节范围的静态文件服务"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        size = os.path.getsize(path)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        start, end = 0, size - 1
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2) or size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        f = open(path, 'rb')
+        f.seek(start)
+        self.remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        while self.remaining > 0:
+            data = source.read(min(1024 * 1024, self.remaining))
+            if not data:
+                break
+            outputfile.write(data)
+            self.remaining -= len(data)
+
+
+def legacy_download(url, temp_path, progress_callback, hasher):
+    """原来的下载方式：8KB逐块读取、写入并回调进度（同样计算摘要以便比较）"""
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        total = int(response.headers.get('content-length', 0))
+        downloaded = 0
+        with open(temp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
+                    hasher.update(downloaded, chunk)
+                    downloaded += len(chunk)
+                    progress_callback({'downloaded': downloaded, 'total': total,
+                                       'percentage': int(downloaded * 100 / total) if total else 0})
+    return downloaded
+
+
+def run(name, func, size, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<28} {size / best / (1024 * 1024):8.1f} MB/s  (最快 {best:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="下载写入路径吞吐量测试")
+    parser.add_argument("--size", type=int, default=256, help="测试文件大小 (MB)")
+    parser.add_argument("--rounds", type=int, default=3, help="每种方式重复的次数，取最快一次")
+    parser.add_argument("--connections", type=int, default=4, help="多连接测试的连接数")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="pythonest-bench-")
+    try:
+        source = os.path.join(work_dir, "installer.bin")
+        size = args.size * 1024 * 1024
+        with open(source, 'wb') as f:
+            for _ in range(args.size):
+                f.write(os.urandom(1024 * 1024))
+        target = os.path.join(work_dir, "download.tmp")
+
+        handler = lambda *a, **kw: RangeRequestHandler(*a, directory=work_dir, **kw)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/installer.bin"
+
+        def progress_callback(progress):
+            pass
+
+        def legacy():
+            hasher = StreamingHasher()
+            legacy_download(url, target, progress_callback, hasher)
+            hasher.finish(target, size)
+
+        def segmented(connections):
+            def download():
+                if os.path.exists(target):
+                    os.remove(target)
+                hasher = StreamingHasher()
+                SegmentedDownloader(connections=connections).download(url, target, progress_callback, hasher)
+                hasher.finish(target, size)
+            return download
+
+        def local_copy():
+            hasher = StreamingHasher()
+            SegmentedDownloader().download(Path(source).as_uri(), target, progress_callback, hasher)
+            hasher.finish(target, size)
+
+        print(f"测试文件 {args.size} MB，每种方式 {args.rounds} 次")
+        run("原逐块写入 (8KB)", legacy, size, args.rounds)
+        run("单连接", segmented(1), size, args.rounds)
+        run(f"{args.connections} 个连接", segmented(args.connections), size, args.rounds)
+        run("本地文件复制", local_copy, size, args.rounds)
+        server.shutdown()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import logging
+import threading
+
+# 版本目录缓存的默认有效期（秒）
+DEFAULT_CATALOG_TTL = 6 * 3600
+
+
+class CatalogCache:
+    """按下载源保存的版本目录缓存
+
+    每个源记录版本列表以及服务器返回的 ETag / Last-Modified，
+    过期后通过条件请求重新验证，目录未变化时服务器只需返回304。
+    """
+
+    def __init__(self, cache_file=None):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser("~"), ".pythonest", "catalog_cache.json")
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries = self._read_file()
+
+    def _read_file(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get("sources", {})
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f"读取版本目录缓存失败: {str(e)}")
+            return {}
+
+    def _save(self):
+        """原子替换写入缓存文件，调用方需持有锁"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "sources": self._entries}, f, indent=1)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logging.error(f"保存版本目录缓存失败: {str(e)}")
+
+    def get(self, source_url):
+        """获取源的缓存条目（不检查有效期），不存在时返回None"""
+        with self._lock:
+            entry = self._entries.get(source_url)
+            return dict(entry) if entry else None
+
+    def is_fresh(self, source_url, ttl=DEFAULT_CATALOG_TTL):
+        """缓存是否仍在有效期内"""
+        entry = self.get(source_url)
+        return bool(entry) and time.time() - entry.get("validated_at", 0) < ttl
+
+    def conditional_headers(self, source_url):
+        """构建条件请求头"""
+        entry = self.get(source_url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, source_url, versions, etag=None, last_modified=None):
+        """保存新获取的版本目录"""
+        now = time.time()
+        with self._lock:
+            self._entries[source_url] = {
+                "versions": list(versions),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": now,
+                "validated_at": now
+            }
+            self._save()
+
+    def touch(self, source_url):
+        """服务器确认目录未变化（304）时刷新有效期"""
+        with self._lock:
+            entry = self._entries.get(source_url)
+            if entry:
+                entry["validated_at"] = time.time()
+                self._save()
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+
+from src.core.http_session import get_session
+
+# 同时计算的摘要算法，python.org为每个安装包发布SHA-256（较早的版本只有MD5）
+DIGEST_ALGORITHMS = ("sha256", "md5")
+
+# 计算摘要时读取文件的块大小（字节）
+HASH_READ_SIZE = 1024 * 1024
+
+# 分段下载时乱序到达的数据最多在内存中缓存的字节数，超出部分在下载完成后从文件中读取
+MAX_PENDING_BYTES = 32 * 1024 * 1024
+
+# python.org发布的下载文件信息
+PYTHON_ORG_RELEASE_API = "https://www.python.org/api/v2/downloads/release/"
+PYTHON_ORG_RELEASE_FILE_API = "https://www.python.org/api/v2/downloads/release_file/"
+
+
+class StreamingHasher:
+    """在数据写入时按文件顺序计算摘要，无需下载完成后再读一遍文件
+
+    分段下载的数据乱序到达：位于已计算位置的数据直接计算，其余数据暂存在内存中，
+    等前面的数据到达后再依次计算。暂存超过MAX_PENDING_BYTES或断点续传之前已写入的部分，
+    在finish时从文件中补读。
+    """
+
+    def __init__(self, algorithms=DIGEST_ALGORITHMS, max_pending=MAX_PENDING_BYTES):
+        self.algorithms = algorithms
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """丢弃已计算的数据，重新开始"""
+        with self._lock:
+            self._hashes = {name: hashlib.new(name) for name in self.algorithms}
+            self._pending = {}
+            self._pending_bytes = 0
+            self.offset = 0
+
+    def _feed(self, data):
+        for h in self._hashes.values():
+            h.update(data)
+        self.offset += len(data)
+
+    def update(self, offset, data):
+        """记录写入文件offset位置的数据"""
+        if not data:
+            return
+        with self._lock:
+            if offset != self.offset:
+                if offset > self.offset and self._pending_bytes + len(data) <= self.max_pending:
+                    # 下载器会重复使用读取缓冲区，暂存时需要复制
+                    self._pending[offset] = bytes(data)
+                    self._pending_bytes += len(data)
+                return
+            self._feed(data)
+            # 依次计算已到达的后续数据
+            while self.offset in self._pending:
+                data = self._pending.pop(self.offset)
+                self._pending_bytes -= len(data)
+                self._feed(data)
+
+    def finish(self, path, size):
+        """补读内存中没有的部分，返回 {算法: 十六进制摘要}"""
+        with self._lock:
+            if self.offset < size:
+                with open(path, 'rb') as f:
+                    while self.offset < size:
+                        data = self._pending.pop(self.offset, None)
+                        if data is not None:
+                            self._pending_bytes -= len(data)
+                        else:
+                            # 读到下一个暂存的数据块为止
+                            next_pending = min((o for o in self._pending if o > self.offset), default=size)
+                            f.seek(self.offset)
+                            data = f.read(min(HASH_READ_SIZE, next_pending - self.offset))
+                            if not data:
+                                break
+                        self._feed(data)
+            self._pending.clear()
+            self._pending_bytes = 0
+            return {name: h.hexdigest() for name, h in self._hashes.items()}
+
+
+def file_digests(path, algorithms=DIGEST_ALGORITHMS):
+    """一次读取计算文件的全部摘要"""
+    hasher = StreamingHasher(algorithms)
+    return hasher.finish(path, os.path.getsize(path))
+
+
+def find_mismatch(expected, actual):
+    """比较摘要，返回第一个不一致的算法名，全部一致或没有可比较的摘要时返回None"""
+    for name in DIGEST_ALGORITHMS:
+        if expected.get(name) and actual.get(name) and expected[name].lower() != actual[name].lower():
+            return name
+    return None
+
+
+def read_digest_file(path):
+    """读取安装包旁的 .sha256 文件，不存在时返回None"""
+    try:
+        with open(path + ".sha256", 'r', encoding='utf-8') as f:
+            return f.read().split()[0].lower()
+    except (OSError, IndexError):
+        return None
+
+
+def quarantine_file(path, download_dir, reason):
+    """将校验失败的文件移入下载目录下的 quarantine 目录，返回新路径"""
+    quarantine_dir = os.path.join(download_dir, "quarantine")
+    target = os.path.join(quarantine_dir, f"{os.path.basename(path)}.{int(time.time())}")
+    try:
+        os.makedirs(quarantine_dir, exist_ok=True)
+        shutil.move(path, target)
+        with open(target + ".reason", 'w', encoding='utf-8') as f:
+            f.write(reason + "\n")
+    except OSError as e:
+        logging.error(f"隔离文件失败，直接删除: {str(e)}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    for suffix in (".json", ".sha256"):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+    logging.warning(f"已隔离 {os.path.basename(path)}: {reason}")
+    return target
+
+
+class PublishedDigests:
+    """python.org为每个发布文件公布的摘要，查询结果缓存在磁盘上
+
+    各镜像同步的是相同的安装包，按文件名匹配即可用于校验任意镜像下载的文件。
+    """
+
+    def __init__(self, cache_file=None):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser("~"), ".pythonest", "published_digests.json")
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+        except Exception as e:
+            logging.warning(f"读取发布摘要缓存失败: {str(e)}")
+            self._entries = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logging.error(f"保存发布摘要缓存失败: {str(e)}")
+
+    def get(self, version, filename, verify_ssl=True):
+        """获取发布文件的摘要
+
+        Returns:
+            {"sha256": ..., "md5": ...}，未发布或查询失败时返回空字典
+        """
+        with self._lock:
+            cached = self._entries.get(version)
+        if cached is None:
+            cached = self._fetch(version, verify_ssl)
+            if cached:
+                with self._lock:
+                    self._entries[version] = cached
+                    self._save()
+        return dict((cached or {}).get(filename, {}))
+
+    def _fetch(self, version, verify_ssl):
+        try:
+            session = get_session()
+            response = session.get(PYTHON_ORG_RELEASE_API, params={"name": f"Python {version}"},
+                                   timeout=15, verify=verify_ssl)
+            response.raise_for_status()
+            releases = response.json()
+            if not releases:
+                return None
+            release_id = releases[0]["resource_uri"].rstrip('/').rsplit('/', 1)[-1]
+
+            response = session.get(PYTHON_ORG_RELEASE_FILE_API, params={"release": release_id},
+                                   timeout=15, verify=verify_ssl)
+            response.raise_for_status()
+            files = {}
+            for item in response.json():
+                name = os.path.basename(item.get("url", ""))
+                digests = {algorithm: item.get(f"{algorithm}_sum") for algorithm in DIGEST_ALGORITHMS
+                           if item.get(f"{algorithm}_sum")}
+                if name and digests:
+                    files[name] = digests
+            return files or None
+        except Exception as e:
+            logging.info(f"获取Python {version}的发布摘要失败: {str(e)}")
+            return None
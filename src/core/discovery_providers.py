@@ -0,0 +1,329 @@
+import os
+import re
+import glob
+import logging
+import platform
+
+from src.core.interpreter import Interpreter
+from src.core.source_builder import DEFAULT_PYTHONS_DIR
+from src.core.version_catalog import PythonVersion
+
+# conda-meta 中Python包的元数据文件名，例如 python-3.12.1-h996f2a0_0.json
+CONDA_PYTHON_META_PATTERN = re.compile(r"^python-(\d+)\.(\d+)\.(\d+)-.*\.json$")
+
+# patchlevel.h 中的完整版本号定义
+PATCHLEVEL_PATTERN = re.compile(r'#define\s+PY_VERSION\s+"(\d+)\.(\d+)\.(\d+)')
+
+# 版本管理工具的目录名，例如 3.12.1、3.13.0t、3.12.1-debug、pypy3.10-7.3.12
+VERSION_NAME_PATTERN = re.compile(r"^(?:(pypy)?(\d+)\.(\d+)(?:\.(\d+))?)(t)?(?:[-.].*)?$")
+
+# uv管理的解释器目录名，例如 cpython-3.12.1-linux-x86_64-gnu、cpython-3.13.0+freethreaded-linux-x86_64-gnu
+UV_NAME_PATTERN = re.compile(r"^(cpython|pypy)-(\d+)\.(\d+)\.(\d+)(\+freethreaded)?(\+debug)?-")
+
+
+def _read_pyvenv_cfg(prefix):
+    """读取 pyvenv.cfg 中的键值对，文件不存在时返回空字典"""
+    values = {}
+    try:
+        with open(os.path.join(prefix, "pyvenv.cfg"), 'r', encoding='utf-8') as f:
+            for line in f:
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    values[key.strip().lower()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+
+def _version_from_pyvenv_cfg(prefix):
+    values = _read_pyvenv_cfg(prefix)
+    for key in ("version_info", "version"):
+        match = re.match(r"(\d+)\.(\d+)\.(\d+)", values.get(key, ""))
+        if match:
+            return tuple(int(part) for part in match.groups())
+    return None
+
+
+def _version_from_conda_meta(prefix):
+    try:
+        names = os.listdir(os.path.join(prefix, "conda-meta"))
+    except OSError:
+        return None
+    for name in names:
+        match = CONDA_PYTHON_META_PATTERN.match(name)
+        if match:
+            return tuple(int(part) for part in match.groups())
+    return None
+
+
+def _version_from_patchlevel(prefix, major_minor=None):
+    """从头文件 include/pythonX.Y/patchlevel.h 中读取完整版本号"""
+    pattern = f"python{major_minor}*" if major_minor else "python*"
+    for header in glob.glob(os.path.join(prefix, "include", pattern, "patchlevel.h")):
+        try:
+            with open(header, 'r', encoding='utf-8', errors='ignore') as f:
+                match = PATCHLEVEL_PATTERN.search(f.read())
+            if match:
+                return tuple(int(part) for part in match.groups())
+        except OSError:
+            continue
+    return None
+
+
+def _lib_dirs(prefix):
+    """列出 lib/pythonX.Y[t] 目录名"""
+    try:
+        return [name for name in os.listdir(os.path.join(prefix, "lib"))
+                if re.match(r"^python\d+\.\d+t?$", name)]
+    except OSError:
+        return []
+
+
+def version_from_prefix(prefix):
+    """不启动解释器，从安装目录的文件布局中读取版本号
+
+    依次尝试 pyvenv.cfg、conda-meta/python-*.json 和 include/pythonX.Y/patchlevel.h。
+
+    Returns:
+        (major, minor, micro) 元组，无法确定时返回None
+    """
+    return (_version_from_pyvenv_cfg(prefix)
+            or _version_from_conda_meta(prefix)
+            or _version_from_patchlevel(prefix))
+
+
+def build_interpreter(python_path, prefix, version_info, implementation="CPython", free_threaded=None,
+                      debug=False, jit=False):
+    """根据目录布局构建解释器记录"""
+    if free_threaded is None:
+        free_threaded = f"python{version_info[0]}.{version_info[1]}t" in _lib_dirs(prefix)
+    lib_name = f"python{version_info[0]}.{version_info[1]}{'t' if free_threaded else ''}"
+    site_packages = os.path.join(prefix, "lib", lib_name, "site-packages")
+    # Debian系发行版的系统解释器使用 dist-packages
+    debian_packages = os.path.join(prefix, "lib", f"python{version_info[0]}", "dist-packages")
+    if not os.path.isdir(site_packages) and os.path.isdir(debian_packages):
+        site_packages = debian_packages
+    paths = {
+        "stdlib": os.path.join(prefix, "lib", lib_name),
+        "purelib": site_packages,
+        "platlib": site_packages,
+        "scripts": os.path.join(prefix, "bin"),
+        "data": prefix
+    }
+    return Interpreter(
+        python_path,
+        tuple(version_info[:3]) + ("final", 0),
+        implementation=implementation,
+        architecture=platform.machine(),
+        prefix=prefix,
+        base_prefix=prefix,
+        paths=paths,
+        free_threaded=free_threaded,
+        debug=debug,
+        jit=jit
+    )
+
+
+def _find_bin_python(prefix):
+    # 自由线程构建只安装 python3t 和 python3.Xt
+    for name in ("python3", "python3t", "python", "pypy3"):
+        python_path = os.path.join(prefix, "bin", name)
+        if os.path.isfile(python_path) and os.access(python_path, os.X_OK):
+            return python_path
+    return None
+
+
+def _discover_version_dirs(root):
+    """处理 pyenv/asdf 风格的 <root>/<版本号>/bin/python 目录"""
+    results = []
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return results
+
+    for name in names:
+        prefix = os.path.join(root, name)
+        python_path = _find_bin_python(prefix)
+        if not python_path:
+            continue
+
+        # pyenv-virtualenv 创建的虚拟环境（versions/<名称> 链接到 versions/<版本号>/envs/<名称>）
+        # 的sys.prefix与base_prefix不同，无法从目录布局得到，交由探测阶段处理
+        if os.path.isfile(os.path.join(prefix, "pyvenv.cfg")):
+            results.append((python_path, None))
+            continue
+
+        # conda发行版（如 miniconda3-latest）按conda环境处理
+        if os.path.isdir(os.path.join(prefix, "conda-meta")):
+            results.extend(_conda_prefix(prefix))
+            continue
+
+        match = VERSION_NAME_PATTERN.match(name)
+        version_info = None
+        implementation = "CPython"
+        free_threaded = None
+        debug = jit = False
+        parsed = PythonVersion.parse(name)
+        if parsed is not None:
+            # 带变体后缀的目录名，例如PythoNest安装的 3.13.1t、3.12.8d、3.13.1+jit
+            version_info = (parsed.major, parsed.minor, parsed.micro)
+            free_threaded = parsed.free_threaded or None
+            debug, jit = parsed.debug, parsed.jit
+        elif match:
+            is_pypy, major, minor, micro, t_suffix = match.groups()
+            if is_pypy:
+                implementation = "PyPy"
+            elif micro is not None:
+                version_info = (int(major), int(minor), int(micro))
+            if t_suffix:
+                free_threaded = True
+            debug = name.endswith("-debug")
+
+        # PyPy和不含补丁号的目录名需要从文件布局中读取版本号
+        if version_info is None and implementation == "CPython":
+            version_info = version_from_prefix(prefix)
+
+        if version_info:
+            results.append((python_path, build_interpreter(python_path, prefix, version_info,
+                                                           implementation, free_threaded, debug, jit)))
+        else:
+            results.append((python_path, None))
+    return results
+
+
+def discover_pyenv():
+    """发现pyenv管理的解释器 (~/.pyenv/versions/*)"""
+    root = os.environ.get("PYENV_ROOT") or os.path.join(os.path.expanduser("~"), ".pyenv")
+    return _discover_version_dirs(os.path.join(root, "versions"))
+
+
+def discover_asdf():
+    """发现asdf管理的解释器 (~/.asdf/installs/python/*)"""
+    root = os.environ.get("ASDF_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".asdf")
+    return _discover_version_dirs(os.path.join(root, "installs", "python"))
+
+
+def discover_pythonest():
+    """发现PythoNest从源码编译安装的解释器 (~/.pythonest/pythons/*)"""
+    return _discover_version_dirs(DEFAULT_PYTHONS_DIR)
+
+
+def _conda_prefix(prefix):
+    python_path = _find_bin_python(prefix)
+    if not python_path:
+        return []
+    version_info = _version_from_conda_meta(prefix)
+    if not version_info:
+        return [(python_path, None)]
+    return [(python_path, build_interpreter(python_path, prefix, version_info))]
+
+
+def discover_conda():
+    """发现conda的base环境和 envs/* 环境，版本号来自 conda-meta/python-*.json"""
+    home = os.path.expanduser("~")
+    roots = [os.path.join(home, name) for name in
+             ("miniconda3", "miniconda", "anaconda3", "miniforge3", "mambaforge")]
+    roots.append("/opt/conda")
+    if os.environ.get("CONDA_EXE"):
+        roots.append(os.path.dirname(os.path.dirname(os.environ["CONDA_EXE"])))
+
+    prefixes = []
+    for root in roots:
+        if os.path.isdir(os.path.join(root, "conda-meta")):
+            prefixes.append(root)
+            prefixes.extend(sorted(glob.glob(os.path.join(root, "envs", "*"))))
+
+    # conda记录的所有环境（包括创建在其他位置的环境）
+    try:
+        with open(os.path.join(home, ".conda", "environments.txt"), 'r', encoding='utf-8') as f:
+            prefixes.extend(line.strip() for line in f if line.strip())
+    except OSError:
+        pass
+
+    results = []
+    seen = set()
+    for prefix in prefixes:
+        key = os.path.realpath(prefix)
+        if key in seen or not os.path.isdir(os.path.join(prefix, "conda-meta")):
+            continue
+        seen.add(key)
+        results.extend(_conda_prefix(prefix))
+    return results
+
+
+def discover_uv():
+    """发现uv管理的解释器 (~/.local/share/uv/python/*)"""
+    root = os.environ.get("UV_PYTHON_INSTALL_DIR")
+    if not root:
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        root = os.path.join(data_home, "uv", "python")
+
+    results = []
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return results
+
+    for name in names:
+        match = UV_NAME_PATTERN.match(name)
+        prefix = os.path.join(root, name)
+        python_path = _find_bin_python(prefix)
+        if not match or not python_path:
+            continue
+        implementation = "PyPy" if match.group(1) == "pypy" else "CPython"
+        version_info = tuple(int(part) for part in match.group(2, 3, 4))
+        results.append((python_path, build_interpreter(python_path, prefix, version_info, implementation,
+                                                       free_threaded=bool(match.group(5)),
+                                                       debug=bool(match.group(6)))))
+    return results
+
+
+def discover_system():
+    """发现发行版安装的 /usr/bin/python3.X 和 /usr/local/bin/python3.X
+
+    补丁版本号来自对应的 include/python3.X/patchlevel.h。头文件属于单独的 -dev 包，
+    可能与解释器的版本不一致或未安装，因此只作为探测失败时的版本号，解释器仍需（按文件身份缓存的）探测确认。
+    """
+    results = []
+    for prefix in ("/usr", "/usr/local"):
+        for python_path in sorted(glob.glob(os.path.join(prefix, "bin", "python3.*"))):
+            name = os.path.basename(python_path)
+            match = re.match(r"^python(\d+)\.(\d+)(t)?$", name)
+            if not match or not os.access(python_path, os.X_OK):
+                continue
+            major_minor = f"{match.group(1)}.{match.group(2)}"
+            version_info = _version_from_patchlevel(prefix, major_minor + (match.group(3) or ""))
+            if version_info and f"{version_info[0]}.{version_info[1]}" == major_minor:
+                results.append((python_path, build_interpreter(python_path, prefix, version_info,
+                                                               free_threaded=bool(match.group(3)))))
+            else:
+                results.append((python_path, None))
+    return results
+
+
+# 所有发现方式，按优先级排列: (名称, 发现函数, 文件布局得到的版本号是否可信)
+# 不可信的结果只作为提示，仍需探测确认
+PROVIDERS = [
+    ("pythonest", discover_pythonest, True),
+    ("pyenv", discover_pyenv, True),
+    ("asdf", discover_asdf, True),
+    ("conda", discover_conda, True),
+    ("uv", discover_uv, True),
+    ("system", discover_system, False),
+]
+
+
+def discover_managed_interpreters():
+    """运行全部发现方式
+
+    Returns:
+        (解释器路径, Interpreter或None, 是否可信) 元组列表；Interpreter为None时表示无法从文件布局确定版本，
+        不可信时Interpreter只提供探测失败时使用的版本号，两种情况都需要探测
+    """
+    results = []
+    for name, provider, trusted in PROVIDERS:
+        try:
+            results.extend((python_path, interpreter, trusted) for python_path, interpreter in provider())
+        except Exception as e:
+            logging.warning(f"通过{name}发现Python解释器失败: {str(e)}")
+    return results
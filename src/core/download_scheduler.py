@@ -0,0 +1,410 @@
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+from src.core.progress import ProgressThrottle, DEFAULT_PROGRESS_RATE
+from src.core.downloader import CancellationToken, DownloadCancelled
+
+# 同时下载的默认任务数
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 2
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_DOWNLOADING = "downloading"
+JOB_PAUSED = "paused"                # 已停止下载，保留断点，可继续
+JOB_DOWNLOADED = "downloaded"        # 下载完成，等待用户确认安装
+JOB_WAITING_INSTALL = "waiting_install"
+JOB_INSTALLING = "installing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# 不再变化的状态
+FINISHED_STATES = (JOB_DOWNLOADED, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# 状态的显示名称
+JOB_STATE_NAMES = {
+    JOB_QUEUED: "排队中",
+    JOB_DOWNLOADING: "下载中",
+    JOB_PAUSED: "已暂停",
+    JOB_DOWNLOADED: "已下载",
+    JOB_WAITING_INSTALL: "等待安装",
+    JOB_INSTALLING: "安装中",
+    JOB_COMPLETED: "已完成",
+    JOB_FAILED: "失败",
+    JOB_CANCELLED: "已取消"
+}
+
+
+class DownloadJob:
+    """下载队列中的一个版本"""
+
+    def __init__(self, job_id, version, priority=0, install=True):
+        self.job_id = job_id
+        self.version = version
+        self.priority = priority
+        self.install = install
+        self.state = JOB_QUEUED
+        self.downloaded = 0
+        self.total = 0
+        self.speed = 0.0
+        self.eta = None
+        self.installer_path = None
+        self.error = None
+        self.token = None
+        self.paused = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def percentage(self):
+        return int(self.downloaded * 100 / self.total) if self.total > 0 else 0
+
+    def snapshot(self):
+        """返回任务当前状态的副本，可安全地传递给其他线程"""
+        return {
+            "job_id": self.job_id,
+            "version": self.version,
+            "priority": self.priority,
+            "install": self.install,
+            "state": self.state,
+            "downloaded": self.downloaded,
+            "total": self.total,
+            "percentage": self.percentage,
+            "speed": self.speed,
+            "eta": self.eta,
+            "installer_path": self.installer_path,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class BandwidthLimiter:
+    """令牌桶限速，所有下载任务共享；rate为0表示不限速"""
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = max(0, rate)
+            # 桶容量为半秒的流量，允许小的突发
+            self.capacity = self.rate / 2
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+
+    def consume(self, amount, token=None):
+        """消耗amount字节的配额，配额不足时阻塞调用的下载线程
+
+        传入token时等待可被取消，取消后立即返回，由下载线程在下一次检查时停止。
+        """
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # 允许令牌变为负数，单个大块数据也能通过，之后的调用相应等待更久
+                if self.tokens > 0:
+                    self.tokens -= amount
+                    return
+                wait = -self.tokens / self.rate + 0.01
+            if token is None:
+                time.sleep(min(wait, 1.0))
+            elif token.wait(min(wait, 1.0)):
+                return
+
+
+class DownloadScheduler:
+    """下载队列调度
+
+    任务按优先级（数值大的优先）和提交顺序排队，最多同时下载max_concurrent个版本，
+    所有下载共享一个可选的全局限速。下载完成后需要安装的任务进入安装队列，由单独的线程逐个安装，
+    避免多个安装程序同时运行。
+
+    listener(job_snapshot) 在任务状态变化时从工作线程中调用；下载进度经ProgressThrottle合并，
+    每个任务每秒最多通知progress_rate次。
+    """
+
+    def __init__(self, python_manager, max_concurrent=DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+                 bandwidth_limit=0, listener=None, progress_rate=DEFAULT_PROGRESS_RATE):
+        self.python_manager = python_manager
+        self.progress_rate = progress_rate
+        self.max_concurrent = max(1, max_concurrent)
+        self.limiter = BandwidthLimiter(bandwidth_limit)
+        self.listener = listener
+        self._lock = threading.Lock()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._running = 0
+        self._install_queue = []
+        self._install_thread = None
+        self._shutdown = False
+
+    def _notify(self, job):
+        if self.listener:
+            try:
+                self.listener(job.snapshot())
+            except Exception as e:
+                logging.error(f"下载任务回调失败: {str(e)}")
+
+    def submit(self, version, priority=0, install=True):
+        """添加下载任务，同一版本已在队列中时返回已有任务
+
+        Returns:
+            DownloadJob的状态快照
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.version == version and job.state not in FINISHED_STATES:
+                    return job.snapshot()
+            job = DownloadJob(next(self._sequence), version, priority, install)
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._queue, (-priority, job.job_id, job))
+        self._notify(job)
+        self._dispatch()
+        return job.snapshot()
+
+    def _keep_partial_on_cancel(self):
+        return self.python_manager.settings["download"].get("keep_partial_on_cancel", False)
+
+    def cancel(self, job_id):
+        """取消任务
+
+        排队中或已暂停的任务直接移除；下载中的任务在当前数据块结束时断开连接，
+        按keep_partial_on_cancel设置保留或删除已下载的部分。
+        """
+        keep_partial = self._keep_partial_on_cancel()
+        discard_partial = False
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES or job.state == JOB_INSTALLING:
+                return False
+            job.paused = False
+            if job.state == JOB_DOWNLOADING:
+                token = job.token
+            else:
+                token = None
+                discard_partial = job.state == JOB_PAUSED and not keep_partial
+                job.state = JOB_CANCELLED
+                job.finished_at = time.time()
+                if job in self._install_queue:
+                    self._install_queue.remove(job)
+        if token is not None:
+            # 状态由下载线程在停止后更新
+            token.cancel(keep_partial=keep_partial)
+            return True
+        if discard_partial:
+            self.python_manager.discard_partial_download(job.version)
+        self._notify(job)
+        return True
+
+    def pause(self, job_id):
+        """暂停排队中或下载中的任务，已下载的部分保留，resume后从断点继续"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in (JOB_QUEUED, JOB_DOWNLOADING) or \
+                    (job.token is not None and job.token.cancelled):
+                return False
+            job.paused = True
+            if job.state == JOB_DOWNLOADING:
+                token = job.token
+            else:
+                token = None
+                job.state = JOB_PAUSED
+        if token is not None:
+            token.cancel(keep_partial=True)
+        else:
+            self._notify(job)
+        return True
+
+    def resume(self, job_id):
+        """将暂停的任务重新加入队列"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != JOB_PAUSED:
+                return False
+            job.paused = False
+            job.state = JOB_QUEUED
+            heapq.heappush(self._queue, (-job.priority, job.job_id, job))
+        self._notify(job)
+        self._dispatch()
+        return True
+
+    def install(self, job_id):
+        """将已下载但未安装的任务加入安装队列"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != JOB_DOWNLOADED:
+                return False
+            self._enqueue_install(job)
+        self._notify(job)
+        return True
+
+    def set_max_concurrent(self, max_concurrent):
+        with self._lock:
+            self.max_concurrent = max(1, max_concurrent)
+        self._dispatch()
+
+    def set_bandwidth_limit(self, bandwidth_limit):
+        """设置全局限速（字节/秒），0表示不限速"""
+        self.limiter.set_rate(bandwidth_limit)
+
+    def get_jobs(self):
+        """所有任务的状态快照，按提交顺序排列"""
+        with self._lock:
+            return [job.snapshot() for _, job in sorted(self._jobs.items())]
+
+    def get_aggregate_progress(self):
+        """未结束任务的总进度 (已下载字节, 总字节)"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.state not in (JOB_CANCELLED, JOB_FAILED)]
+            return sum(job.downloaded for job in jobs), sum(job.total for job in jobs)
+
+    def is_idle(self):
+        """没有排队、下载中或安装中的任务（暂停的任务不计入）"""
+        with self._lock:
+            return all(job.state in FINISHED_STATES or job.state == JOB_PAUSED for job in self._jobs.values())
+
+    def clear_finished(self):
+        """移除已结束的任务"""
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.state in (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)]:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        """停止调度新任务，已在运行的下载和安装会继续完成"""
+        with self._lock:
+            self._shutdown = True
+
+    def _dispatch(self):
+        """在并发数允许的范围内启动排队的任务"""
+        to_start = []
+        with self._lock:
+            while self._queue and self._running < self.max_concurrent and not self._shutdown:
+                _, _, job = heapq.heappop(self._queue)
+                if job.state != JOB_QUEUED:
+                    continue
+                job.state = JOB_DOWNLOADING
+                job.token = CancellationToken()
+                job.started_at = time.time()
+                self._running += 1
+                to_start.append(job)
+        for job in to_start:
+            self._notify(job)
+            threading.Thread(target=self._run_download, args=(job,), daemon=True,
+                             name=f"download-{job.version}").start()
+
+    def _run_download(self, job):
+        throttle = ProgressThrottle(self.progress_rate)
+        token = job.token
+        # 已计入限速的字节数；首次回调时以已下载的字节为基准，断点续传时磁盘上已有的部分不计入限速
+        charged = None
+
+        def progress_callback(progress):
+            nonlocal charged
+            downloaded = progress.get('downloaded', 0)
+            total = progress.get('total', 0)
+            with self._lock:
+                if charged is None:
+                    charged = downloaded
+                    job.downloaded = downloaded
+                # 分段下载的各线程回调顺序不定，进度只增不减，同一部分不重复计入限速
+                delta = downloaded - charged
+                charged = max(charged, downloaded)
+                job.downloaded = max(job.downloaded, downloaded)
+                job.total = total
+            if delta > 0:
+                self.limiter.consume(delta, token)
+            event = throttle.update(downloaded, total)
+            if event is not None:
+                with self._lock:
+                    job.speed = event['speed']
+                    job.eta = event['eta']
+                self._notify(job)
+
+        # 预编译版本边下载边解压，下载完成即安装完成
+        streamed = False
+        try:
+            if job.install and self.python_manager.supports_stream_install(job.version):
+                streamed = True
+                installer_path = self.python_manager.install_standalone(job.version, progress_callback=progress_callback,
+                                                                        cancel_token=job.token)
+                error = None if installer_path else "下载安装预编译版本失败"
+            else:
+                installer_path = self.python_manager.download_version(job.version, progress_callback=progress_callback,
+                                                                      cancel_token=job.token)
+                error = None if installer_path else "下载失败，未获取到安装文件路径"
+        except DownloadCancelled:
+            installer_path = None
+            error = None
+        except Exception as e:
+            installer_path = None
+            error = str(e)
+            logging.error(f"下载Python {job.version}失败: {error}")
+
+        with self._lock:
+            self._running -= 1
+            job.speed = 0.0
+            job.eta = None
+            job.installer_path = installer_path
+            cancelled = job.token.cancelled and not installer_path
+            job.token = None
+            if cancelled and job.paused:
+                job.state = JOB_PAUSED
+            elif cancelled:
+                job.state = JOB_CANCELLED
+                job.error = "下载已取消"
+            elif error:
+                job.state = JOB_FAILED
+                job.error = error
+            elif streamed:
+                job.state = JOB_COMPLETED
+            elif job.install:
+                self._enqueue_install(job)
+            else:
+                job.state = JOB_DOWNLOADED
+            if job.state in FINISHED_STATES:
+                job.finished_at = time.time()
+        self._notify(job)
+        self._dispatch()
+
+    def _enqueue_install(self, job):
+        """加入安装队列，调用方需持有锁"""
+        job.state = JOB_WAITING_INSTALL
+        self._install_queue.append(job)
+        if self._install_thread is None or not self._install_thread.is_alive():
+            self._install_thread = threading.Thread(target=self._run_installs, daemon=True, name="installer")
+            self._install_thread.start()
+
+    def _run_installs(self):
+        """逐个执行安装，队列为空时线程退出"""
+        while True:
+            with self._lock:
+                if not self._install_queue or self._shutdown:
+                    self._install_thread = None
+                    return
+                job = self._install_queue.pop(0)
+                job.state = JOB_INSTALLING
+            self._notify(job)
+
+            try:
+                success = self.python_manager.install_version(job.version, job.installer_path)
+                error = None if success else "安装失败"
+            except Exception as e:
+                error = str(e)
+                logging.error(f"安装Python {job.version}时发生错误: {error}")
+
+            with self._lock:
+                job.state = JOB_FAILED if error else JOB_COMPLETED
+                job.error = error
+                job.finished_at = time.time()
+            self._notify(job)
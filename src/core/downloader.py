@@ -0,0 +1,570 @@
+import os
+import json
+import time
+import errno
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from src.core.http_session import get_session
+
+# 默认并发连接数
+DEFAULT_DOWNLOAD_CONNECTIONS = 4
+
+# 每个分段的最小大小（字节），文件较小时减少分段数
+DEFAULT_MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+
+# 读取响应的块大小范围（字节）：从DOWNLOAD_CHUNK_SIZE开始，读取很快且每次都能读满时逐步增大
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 一次读取少于该时间（秒）时增大块大小，超过CHUNK_SHRINK_TIME时减小
+CHUNK_GROW_TIME = 0.01
+CHUNK_SHRINK_TIME = 0.5
+
+# 无法获取文件系统块大小时使用的默认值（字节）
+DEFAULT_BLOCK_SIZE = 4096
+
+# 本地源每次复制的字节数，每复制一次检查取消并报告进度
+LOCAL_COPY_SIZE = 8 * 1024 * 1024
+
+# 建立连接和读取数据的超时时间（秒）
+DOWNLOAD_TIMEOUT = 30
+
+# 每个分段的最大重试次数，重试等待时间从RETRY_BACKOFF秒开始逐次翻倍
+DOWNLOAD_RETRIES = 5
+RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 30.0
+
+# 断点信息的最小保存间隔（秒）
+STATE_SAVE_INTERVAL = 1.0
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    # 直接读取原始响应数据写入文件，不接受压缩传输
+    "Accept-Encoding": "identity"
+}
+
+
+class RangeNotSupported(Exception):
+    """服务器未按请求返回分段内容"""
+
+
+class RemoteFileChanged(Exception):
+    """断点续传时服务器上的文件已发生变化"""
+
+
+class DownloadCancelled(Exception):
+    """下载被用户取消或暂停"""
+
+
+class CancellationToken:
+    """在下载线程之间传递的取消标记
+
+    下载线程每写入一个数据块检查一次，取消后在当前数据块结束时关闭连接并抛出DownloadCancelled。
+    keep_partial决定是否保留临时文件和断点信息以便之后继续下载。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.keep_partial = False
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, keep_partial=False):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.keep_partial = keep_partial
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """注册取消时调用的函数，已取消时立即调用"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise DownloadCancelled("下载已取消")
+
+    def wait(self, timeout=None):
+        """等待取消，最多timeout秒，返回是否已取消"""
+        return self._event.wait(timeout)
+
+
+class Segment:
+    """文件中的一个字节范围 [start, end]，offset为下一个待写入的位置"""
+
+    __slots__ = ("start", "end", "offset")
+
+    def __init__(self, start, end, offset=None):
+        self.start = start
+        self.end = end
+        self.offset = start if offset is None else offset
+
+    @property
+    def remaining(self):
+        return self.end + 1 - self.offset
+
+    @property
+    def done(self):
+        return self.offset > self.end
+
+
+def preallocate(path, size):
+    """创建大小为size的文件，支持posix_fallocate时预先分配磁盘空间，否则创建稀疏文件"""
+    with open(path, 'wb') as f:
+        if size > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+                return
+            except OSError:
+                # 部分文件系统不支持预分配
+                pass
+        f.truncate(size)
+
+
+def filesystem_block_size(path):
+    """文件所在文件系统的块大小，读取块大小按此对齐"""
+    try:
+        return getattr(os.stat(os.path.dirname(os.path.abspath(path))), "st_blksize", 0) or DEFAULT_BLOCK_SIZE
+    except OSError:
+        return DEFAULT_BLOCK_SIZE
+
+
+def local_source_path(url):
+    """file:// 地址或本地路径对应的文件路径，网络地址返回None"""
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    # 没有协议或Windows盘符（如 D:\mirror）
+    if not parsed.scheme or len(parsed.scheme) == 1:
+        return url
+    return None
+
+
+def write_all(f, data):
+    """向无缓冲文件写入全部数据"""
+    while data:
+        written = f.write(data)
+        data = data[written:]
+
+
+class ChunkReader:
+    """将响应数据读入可重复使用的缓冲区
+
+    读取块大小按文件系统块大小对齐，读取很快并且每次都读满时翻倍（不超过MAX_DOWNLOAD_CHUNK_SIZE），
+    读取缓慢时减半，在高速连接上减少每块的Python开销，在慢速连接上保持进度和取消的及时性。
+    read返回的memoryview在下次读取前有效。
+    """
+
+    def __init__(self, raw, block_size=DEFAULT_BLOCK_SIZE):
+        self.raw = raw
+        self.block_size = max(block_size, 512)
+        self.min_size = self._align(DOWNLOAD_CHUNK_SIZE)
+        self.max_size = self._align(MAX_DOWNLOAD_CHUNK_SIZE)
+        self.chunk_size = self.min_size
+        self._view = memoryview(bytearray(self.max_size))
+
+    def _align(self, size):
+        return max(self.block_size, size // self.block_size * self.block_size)
+
+    def read(self, limit=None):
+        """读取最多limit字节，数据结束时返回空的memoryview"""
+        size = self.chunk_size if limit is None else min(self.chunk_size, limit)
+        start = time.monotonic()
+        count = self.raw.readinto(self._view[:size])
+        elapsed = time.monotonic() - start
+        if count == self.chunk_size and elapsed < CHUNK_GROW_TIME:
+            self.chunk_size = min(self.chunk_size * 2, self.max_size)
+        elif elapsed > CHUNK_SHRINK_TIME:
+            self.chunk_size = max(self.chunk_size // 2, self.min_size)
+        return self._view[:count]
+
+
+def split_segments(size, connections, min_segment_size):
+    """将文件分为不超过connections个、每个不小于min_segment_size的分段"""
+    count = max(1, min(connections, size // max(min_segment_size, 1)))
+    segment_size = size // count
+    segments = []
+    for index in range(count):
+        start = index * segment_size
+        end = size - 1 if index == count - 1 else start + segment_size - 1
+        segments.append(Segment(start, end))
+    return segments
+
+
+class DownloadState:
+    """断点续传信息，保存在临时文件旁的 .json 文件中
+
+    记录下载地址、服务器返回的校验信息 (ETag/Last-Modified)、文件大小，
+    以及每个分段已写入临时文件的位置。
+    """
+
+    def __init__(self, temp_path):
+        self.path = temp_path + ".json"
+        self.temp_path = temp_path
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    def load(self):
+        """读取断点信息，临时文件不存在或内容无效时返回None"""
+        if not os.path.exists(self.temp_path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data["segments"] = [Segment(*item) for item in data["segments"]]
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"读取断点信息失败: {str(e)}")
+            return None
+
+    def save(self, url, size, etag, last_modified, segments, force=False):
+        """保存断点信息，force为False时按STATE_SAVE_INTERVAL限制写入频率"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_save < STATE_SAVE_INTERVAL:
+                return
+            self._last_save = now
+            data = {
+                "url": url,
+                "size": size,
+                "etag": etag,
+                "last_modified": last_modified,
+                "segments": [[segment.start, segment.end, segment.offset] for segment in segments]
+            }
+            try:
+                temp_file = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_file, self.path)
+            except Exception as e:
+                logging.warning(f"保存断点信息失败: {str(e)}")
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SegmentedDownloader:
+    """多连接分段下载，支持断点续传
+
+    先发送HEAD请求获取文件大小、Accept-Ranges和校验信息，服务器支持分段时把文件分成多个字节范围，
+    并行下载并直接写入预先分配好大小的临时文件的对应位置。
+    下载进度随时记录在断点信息文件中，失败时保留临时文件，下次调用（包括程序重启后）从已写入的位置继续；
+    每个分段失败后按指数退避重试。服务器不支持分段时使用单连接下载，无法续传。
+    数据由ChunkReader直接读入可重复使用的缓冲区并写入无缓冲的文件；file:// 地址或本地路径
+    （例如局域网共享的镜像目录）由操作系统在文件之间直接复制。
+    """
+
+    def __init__(self, connections=DEFAULT_DOWNLOAD_CONNECTIONS, min_segment_size=DEFAULT_MIN_SEGMENT_SIZE,
+                 verify_ssl=True, headers=None, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES,
+                 session=None):
+        self.session = session if session is not None else get_session()
+        self.connections = max(1, connections)
+        self.min_segment_size = min_segment_size
+        self.verify_ssl = verify_ssl
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.timeout = timeout
+        self.retries = retries
+        self._progress_lock = threading.Lock()
+
+    def download(self, url, temp_path, progress_callback=None, hasher=None, cancel_token=None):
+        """下载文件到temp_path
+
+        Args:
+            url: 下载地址
+            temp_path: 临时文件路径，已有断点信息时从断点继续
+            progress_callback: 进度回调函数，接收包含downloaded, total, percentage键的字典
+            hasher: 可选的StreamingHasher，写入的数据同时交给它计算摘要
+            cancel_token: 可选的CancellationToken，取消时抛出DownloadCancelled
+
+        Returns:
+            下载的字节数
+        """
+        try:
+            return self._download(url, temp_path, progress_callback, hasher, cancel_token)
+        except DownloadCancelled:
+            if not cancel_token.keep_partial:
+                DownloadState(temp_path).remove()
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            raise
+
+    def _download(self, url, temp_path, progress_callback, hasher, cancel_token):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        source_path = local_source_path(url)
+        if source_path is not None:
+            try:
+                return self._copy_local(source_path, temp_path, progress_callback, cancel_token)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+
+        size, final_url, accept_ranges, etag, last_modified = self._head(url)
+        state = DownloadState(temp_path)
+
+        if size and accept_ranges:
+            segments = self._resume_segments(state, url, size, etag, last_modified)
+            if segments is None:
+                segments = split_segments(size, self.connections, self.min_segment_size)
+                # 预先分配文件大小，各分段直接写入各自的位置
+                preallocate(temp_path, size)
+            try:
+                self._download_segments(final_url, temp_path, state, url, size, etag, last_modified,
+                                        segments, progress_callback, hasher, cancel_token)
+                state.remove()
+                return size
+            except RemoteFileChanged as e:
+                logging.info(f"服务器上的文件已变化，重新下载: {str(e)}")
+                state.remove()
+                if hasher is not None:
+                    hasher.reset()
+                return self._download(url, temp_path, progress_callback, hasher, cancel_token)
+            except RangeNotSupported as e:
+                logging.info(f"服务器不支持分段下载，改用单连接下载: {str(e)}")
+                state.remove()
+                if hasher is not None:
+                    hasher.reset()
+
+        # 单连接下载无法续传，失败时不保留临时文件
+        state.remove()
+        try:
+            return self._download_single(final_url, temp_path, progress_callback, hasher, cancel_token)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _head(self, url):
+        """获取文件大小、重定向后的地址、是否支持分段下载以及校验信息"""
+        try:
+            response = self.session.head(url, allow_redirects=True, headers=self.headers,
+                                         timeout=self.timeout, verify=self.verify_ssl)
+            response.raise_for_status()
+            size = int(response.headers.get("Content-Length", 0))
+            accept_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            return (size, response.url or url, accept_ranges,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except Exception as e:
+            # 部分镜像不支持HEAD请求，直接使用单连接下载
+            logging.info(f"HEAD请求失败，使用单连接下载: {str(e)}")
+            return 0, url, False, None, None
+
+    def _resume_segments(self, state, url, size, etag, last_modified):
+        """根据断点信息恢复分段，无法续传时返回None
+
+        同一地址要求校验信息一致；换用其他镜像时各镜像提供的是同名的同一安装包，只要求大小一致，
+        拼接结果由调用方在下载完成后校验摘要。
+        """
+        saved = state.load()
+        if not saved or saved.get("size") != size or os.path.getsize(state.temp_path) != size:
+            return None
+        if saved.get("url") == url:
+            if (saved.get("etag") and etag and saved["etag"] != etag) or \
+                    (saved.get("last_modified") and last_modified and saved["last_modified"] != last_modified):
+                return None
+        segments = saved["segments"]
+        downloaded = sum(segment.offset - segment.start for segment in segments)
+        logging.info(f"从断点继续下载: 已完成 {downloaded}/{size} 字节")
+        return segments
+
+    def _open_reader(self, response, temp_path):
+        if response.headers.get("Content-Encoding", "identity").lower() != "identity":
+            # 服务器忽略了Accept-Encoding时由urllib3解压
+            response.raw.decode_content = True
+        return ChunkReader(response.raw, filesystem_block_size(temp_path))
+
+    def _copy_local(self, source_path, temp_path, progress_callback, cancel_token=None):
+        """从本地文件复制，优先使用copy_file_range或sendfile在内核中复制，返回复制的字节数
+
+        复制的数据不经过Python，摘要由调用方在finish时从文件中读取计算。
+        """
+        size = os.path.getsize(source_path)
+        progress = [0]
+        methods = [name for name in ("copy_file_range", "sendfile") if hasattr(os, name)]
+        with open(source_path, 'rb') as src, open(temp_path, 'wb', buffering=0) as dst:
+            reader = None
+            while progress[0] < size:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                offset = progress[0]
+                count = min(LOCAL_COPY_SIZE, size - offset)
+                copied = None
+                while methods and copied is None:
+                    try:
+                        if methods[0] == "copy_file_range":
+                            copied = os.copy_file_range(src.fileno(), dst.fileno(), count, offset, offset)
+                        else:
+                            os.lseek(dst.fileno(), offset, os.SEEK_SET)
+                            copied = os.sendfile(dst.fileno(), src.fileno(), offset, count)
+                    except OSError as e:
+                        # 跨文件系统、内核或平台不支持时换用下一种方式
+                        if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                                           errno.ENOTSUP, errno.EBADF):
+                            raise
+                        logging.info(f"{methods.pop(0)} 不可用，改用其他复制方式: {str(e)}")
+                if copied is None:
+                    if reader is None:
+                        reader = ChunkReader(src, filesystem_block_size(temp_path))
+                        reader.chunk_size = reader.max_size
+                    src.seek(offset)
+                    dst.seek(offset)
+                    chunk = reader.read(count)
+                    write_all(dst, chunk)
+                    copied = len(chunk)
+                if copied == 0:
+                    raise IOError(f"本地文件 {source_path} 在 {offset} 处提前结束")
+                self._report(progress, size, progress_callback, copied)
+        logging.info(f"从本地文件复制完成: {source_path}, {size} 字节")
+        return size
+
+    def _report(self, progress, total, progress_callback, amount):
+        with self._progress_lock:
+            progress[0] += amount
+            downloaded = progress[0]
+        if progress_callback:
+            progress_callback({
+                'downloaded': downloaded,
+                'total': total,
+                'percentage': int(downloaded * 100 / total) if total > 0 else 0
+            })
+
+    def _download_segments(self, url, temp_path, state, source_url, size, etag, last_modified,
+                           segments, progress_callback, hasher=None, cancel_token=None):
+        progress = [sum(segment.offset - segment.start for segment in segments)]
+        resumed = progress[0] > 0
+        failed = threading.Event()
+        validator = etag if etag and not etag.startswith("W/") else last_modified
+
+        def save_state(force=False):
+            state.save(source_url, size, etag, last_modified, segments, force)
+
+        def fetch(segment):
+            headers = dict(self.headers)
+            headers["Range"] = f"bytes={segment.offset}-{segment.end}"
+            if validator:
+                # 文件已变化时服务器返回完整内容（200）而不是分段
+                headers["If-Range"] = validator
+            with self.session.get(url, headers=headers, stream=True,
+                                  timeout=self.timeout, verify=self.verify_ssl) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    if validator and resumed:
+                        raise RemoteFileChanged(f"HTTP状态码 {response.status_code}")
+                    raise RangeNotSupported(f"HTTP状态码 {response.status_code}")
+                reader = self._open_reader(response, temp_path)
+                # 无缓冲写入：每块数据直接交给操作系统，断点信息记录的位置之前的数据都已写入
+                with open(temp_path, 'r+b', buffering=0) as f:
+                    f.seek(segment.offset)
+                    while not segment.done:
+                        if failed.is_set():
+                            return
+                        chunk = reader.read(segment.remaining)
+                        if not chunk:
+                            break
+                        write_all(f, chunk)
+                        if hasher is not None:
+                            hasher.update(segment.offset, chunk)
+                        segment.offset += len(chunk)
+                        self._report(progress, size, progress_callback, len(chunk))
+                        save_state()
+            if not segment.done:
+                raise IOError(f"分段 {segment.start}-{segment.end} 提前结束于 {segment.offset}")
+
+        def fetch_with_retry(segment):
+            delay = RETRY_BACKOFF
+            for attempt in range(self.retries + 1):
+                try:
+                    fetch(segment)
+                    return
+                except (RangeNotSupported, RemoteFileChanged):
+                    raise
+                except Exception as e:
+                    if failed.is_set() or attempt >= self.retries:
+                        raise
+                    save_state(force=True)
+                    logging.warning(f"分段 {segment.start}-{segment.end} 下载失败，{delay:.0f}秒后从 "
+                                    f"{segment.offset} 重试 ({attempt + 1}/{self.retries}): {str(e)}")
+                    if failed.wait(delay):
+                        raise
+                    delay = min(delay * 2, MAX_RETRY_BACKOFF)
+
+        pending = [segment for segment in segments if not segment.done]
+        error = None
+        if cancel_token is not None:
+            # 取消时让所有分段在当前数据块结束后停止，并打断重试等待
+            cancel_token.add_callback(failed.set)
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending) or 1) as executor:
+                futures = [executor.submit(fetch_with_retry, segment) for segment in pending]
+                for future in futures:
+                    try:
+                        future.result()
+                    except BaseException as e:
+                        # 一个分段失败时通知其他分段停止
+                        failed.set()
+                        if error is None:
+                            error = e
+        finally:
+            # 无论成功与否都记录最终进度，失败后可从断点继续
+            save_state(force=True)
+            if cancel_token is not None:
+                cancel_token.remove_callback(failed.set)
+                cancel_token.raise_if_cancelled()
+        if error is not None:
+            raise error
+        logging.info(f"分段下载完成: {len(segments)} 个连接, {size} 字节")
+
+    def _download_single(self, url, temp_path, progress_callback, hasher=None, cancel_token=None):
+        with self.session.get(url, stream=True, headers=self.headers,
+                              timeout=self.timeout, verify=self.verify_ssl) as response:
+            response.raise_for_status()
+
+            # 获取文件大小
+            total_size = int(response.headers.get('content-length', 0))
+            progress = [0]
+
+            reader = self._open_reader(response, temp_path)
+            with open(temp_path, 'wb', buffering=0) as f:
+                while True:
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    chunk = reader.read()
+                    if not chunk:
+                        break
+                    write_all(f, chunk)
+                    if hasher is not None:
+                        hasher.update(progress[0], chunk)
+                    self._report(progress, total_size, progress_callback, len(chunk))
+        return progress[0]
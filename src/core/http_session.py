@@ -0,0 +1,75 @@
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 默认超时时间（秒）：(建立连接, 读取数据)
+DEFAULT_HTTP_TIMEOUT = (10, 30)
+
+# 连接失败或服务器返回以下状态码时的重试次数，等待时间从HTTP_RETRY_BACKOFF秒开始逐次翻倍
+HTTP_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 连接池：缓存连接的主机数，以及每个主机保持的连接数（需不少于分段下载的最大连接数）
+HTTP_POOL_HOSTS = 16
+HTTP_POOL_SIZE = 16
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class HttpSession(requests.Session):
+    """带连接池、重试策略和默认超时的会话
+
+    同一主机的请求复用已建立的TCP/TLS连接；只有GET和HEAD等幂等请求会自动重试，
+    并遵循服务器返回的Retry-After。未指定timeout的请求使用DEFAULT_HTTP_TIMEOUT。
+    """
+
+    def __init__(self, retries=HTTP_RETRIES, timeout=DEFAULT_HTTP_TIMEOUT, verify_ssl=True):
+        super().__init__()
+        self.timeout = timeout
+        self.verify = verify_ssl
+        self.headers["User-Agent"] = DEFAULT_USER_AGENT
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUS,
+            allowed_methods=frozenset(("GET", "HEAD", "OPTIONS")),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """获取所有模块共享的会话，首次调用时创建"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HttpSession()
+        return _session
+
+
+def set_verify_ssl(verify_ssl):
+    """设置共享会话默认是否验证SSL证书，单个请求仍可通过verify参数覆盖"""
+    session = get_session()
+    if session.verify != verify_ssl:
+        logging.info(f"HTTP会话SSL证书验证: {'开启' if verify_ssl else '关闭'}")
+    session.verify = verify_ssl
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+
+from src.core.checksums import file_digests, quarantine_file
+
+# 安装包缓存的默认大小上限（字节）
+DEFAULT_INSTALLER_CACHE_SIZE = 2 * 1024 * 1024 * 1024
+
+
+class InstallerCache:
+    """按内容摘要存储的安装包缓存
+
+    每个安装包按SHA-256只保存一份，位于 objects/<摘要>/<文件名>；文件名索引以下载地址中的真实文件名为键指向摘要，
+    因此从不同镜像下载的同一文件（例如清华和北外的同一个Miniconda安装包）只占一份空间。
+    每个对象记录来源的种类（python/miniconda），查找时种类不符的条目视为未命中。
+    记录每个对象的最近使用时间，总大小超过上限时按LRU淘汰，并统计命中率和节省的流量。
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_INSTALLER_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+
+    def _read_index(self):
+        index = {"names": {}, "objects": {}, "stats": {}}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key in index:
+                if isinstance(data.get(key), dict):
+                    index[key] = data[key]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"读取安装包缓存索引失败: {str(e)}")
+        for key in ("hits", "misses", "bytes_saved", "dedup_bytes"):
+            index["stats"].setdefault(key, 0)
+        return index
+
+    def _save(self):
+        """原子替换写入索引，调用方需持有锁"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, indent=1)
+            os.replace(temp_file, self.index_file)
+        except Exception as e:
+            logging.error(f"保存安装包缓存索引失败: {str(e)}")
+
+    def _object_path(self, digest):
+        """调用方需持有锁"""
+        entry = self._index["objects"].get(digest)
+        if not entry:
+            return None
+        return os.path.join(self.objects_dir, digest, entry["name"])
+
+    def _drop(self, digest):
+        """从索引中移除对象及指向它的文件名，调用方需持有锁"""
+        self._index["objects"].pop(digest, None)
+        for name in [name for name, d in self._index["names"].items() if d == digest]:
+            del self._index["names"][name]
+
+    def lookup(self, name, verify=True, kind=None):
+        """按文件名查找缓存的安装包
+
+        Args:
+            name: 安装包文件名
+            verify: 是否重新计算摘要确认文件未被修改，不一致时移入隔离目录
+            kind: 要求的来源种类，与记录不同（或旧版本缓存没有记录）时视为未命中并移除该文件名
+
+        Returns:
+            缓存中的文件路径，未命中时返回None
+        """
+        with self._lock:
+            digest = self._index["names"].get(name)
+            if digest and kind is not None and \
+                    self._index["objects"].get(digest, {}).get("kind") != kind:
+                logging.info(f"缓存中的 {name} 来自其他种类的源，不再使用")
+                del self._index["names"][name]
+                digest = None
+            path = self._object_path(digest) if digest else None
+
+        if path and os.path.exists(path) and verify:
+            try:
+                actual = file_digests(path, ("sha256",))["sha256"]
+            except OSError:
+                actual = None
+            if actual != digest:
+                quarantine_file(path, self.cache_dir, f"sha256 不匹配: 期望 {digest}, 实际 {actual}")
+                path = None
+        elif path and not os.path.exists(path):
+            path = None
+
+        with self._lock:
+            stats = self._index["stats"]
+            if path:
+                entry = self._index["objects"][digest]
+                entry["last_used"] = time.time()
+                stats["hits"] += 1
+                stats["bytes_saved"] += entry.get("size", 0)
+            else:
+                if digest:
+                    self._drop(digest)
+                stats["misses"] += 1
+            self._save()
+        return path
+
+    def add(self, source_path, name, digest, kind=None):
+        """将校验通过的文件移入缓存
+
+        Args:
+            source_path: 已下载的文件，移入缓存后原路径不再存在
+            name: 安装包文件名（下载地址中的真实文件名）
+            digest: 文件的SHA-256
+            kind: 来源的种类，例如 python、miniconda
+
+        Returns:
+            缓存中的文件路径
+        """
+        digest = digest.lower()
+        size = os.path.getsize(source_path)
+        with self._lock:
+            path = self._object_path(digest)
+            if path and os.path.exists(path):
+                # 内容相同的文件已存在，只增加文件名索引
+                os.remove(source_path)
+                self._index["stats"]["dedup_bytes"] += size
+                logging.info(f"{name} 与缓存中的 {os.path.basename(path)} 内容相同，不再重复保存")
+            else:
+                path = os.path.join(self.objects_dir, digest, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.move(source_path, path)
+                self._index["objects"][digest] = {"name": name, "size": size, "added_at": time.time()}
+            self._index["objects"][digest]["last_used"] = time.time()
+            if kind is not None:
+                self._index["objects"][digest]["kind"] = kind
+            self._index["names"][name] = digest
+            self._evict(keep=digest)
+            self._save()
+        return path
+
+    def _evict(self, keep=None):
+        """按最近使用时间淘汰对象，直到总大小不超过上限，调用方需持有锁"""
+        objects = self._index["objects"]
+        total = sum(entry.get("size", 0) for entry in objects.values())
+        for digest, entry in sorted(objects.items(), key=lambda item: item[1].get("last_used", 0)):
+            if total <= self.max_size:
+                break
+            if digest == keep:
+                continue
+            shutil.rmtree(os.path.join(self.objects_dir, digest), ignore_errors=True)
+            total -= entry.get("size", 0)
+            self._drop(digest)
+            logging.info(f"安装包缓存超出上限，已移除 {entry.get('name')}")
+
+    def set_max_size(self, max_size):
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+            self._save()
+
+    def clear(self):
+        """删除全部缓存的安装包，保留统计数据"""
+        with self._lock:
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+            self._index["names"].clear()
+            self._index["objects"].clear()
+            self._save()
+
+    def get_stats(self):
+        """缓存统计：文件数、总大小、命中率、节省的下载流量和重复数据"""
+        with self._lock:
+            stats = dict(self._index["stats"])
+            objects = self._index["objects"]
+            stats["count"] = len(objects)
+            stats["size"] = sum(entry.get("size", 0) for entry in objects.values())
+            stats["max_size"] = self.max_size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
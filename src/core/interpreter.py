@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import time
+import logging
+import subprocess
+
+from src.core.process_utils import run_command, DEFAULT_PROBE_TIMEOUT
+from src.core.version_catalog import make_variant
+
+# 在目标解释器中以隔离模式 (-I -S) 运行的探测脚本，一次性输出全部元数据
+PROBE_SCRIPT = r"""
+import json, os, platform, site, sys, sysconfig
+data = {
+    "version_info": list(sys.version_info[:5]),
+    "implementation": platform.python_implementation(),
+    "architecture": platform.machine(),
+    "bits": 64 if sys.maxsize > 2 ** 32 else 32,
+    "prefix": sys.prefix,
+    "base_prefix": getattr(sys, "base_prefix", sys.prefix),
+    "realpath": os.path.realpath(sys.executable),
+    "paths": sysconfig.get_paths(),
+    "site_packages": list(getattr(site, "getsitepackages", lambda: [])()),
+    "free_threaded": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+    "debug": hasattr(sys, "gettotalrefcount"),
+    "jit": bool(getattr(getattr(sys, "_jit", None), "is_available", lambda: False)())
+           or "--enable-experimental-jit" in (sysconfig.get_config_var("CONFIG_ARGS") or ""),
+}
+sys.stdout.write(json.dumps(data))
+"""
+
+
+class Interpreter:
+    """单个Python解释器的结构化元数据"""
+
+    def __init__(self, executable, version_info, implementation="CPython", architecture="",
+                 bits=0, prefix="", base_prefix="", realpath="", paths=None,
+                 free_threaded=False, debug=False, jit=False, probe_latency_ms=None, site_packages=None):
+        self.executable = executable
+        self.version_info = tuple(version_info)
+        self.implementation = implementation
+        self.architecture = architecture
+        self.bits = bits
+        self.prefix = prefix
+        self.base_prefix = base_prefix or prefix
+        self.realpath = realpath or os.path.realpath(executable)
+        self.paths = paths or {}
+        # site模块的全部site-packages目录（按sys.path中的顺序），发行版的解释器可能有多个
+        self.site_packages = site_packages or []
+        self.free_threaded = free_threaded
+        self.debug = debug
+        self.jit = jit
+        # 探测该解释器所用的时间（毫秒），从文件布局得到的记录为None
+        self.probe_latency_ms = probe_latency_ms
+        # 指向同一物理文件的所有已发现路径，只在本次搜索中有效，不写入缓存
+        self.aliases = [executable]
+
+    @property
+    def version(self):
+        """X.Y.Z 形式的版本号"""
+        return ".".join(str(part) for part in self.version_info[:3])
+
+    @property
+    def variant(self):
+        """构建变体后缀，标准构建为空字符串，例如自由线程的调试版本为 "td" """
+        return make_variant(self.free_threaded, self.debug, self.jit)
+
+    @property
+    def version_id(self):
+        """区分构建变体的版本标识，例如 3.13.1、3.13.1t、3.13.1+jit"""
+        return self.version + self.variant
+
+    @property
+    def is_venv(self):
+        """是否是虚拟环境中的解释器"""
+        return bool(self.prefix) and os.path.normcase(self.prefix) != os.path.normcase(self.base_prefix)
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典"""
+        return {
+            "executable": self.executable,
+            "version_info": list(self.version_info),
+            "implementation": self.implementation,
+            "architecture": self.architecture,
+            "bits": self.bits,
+            "prefix": self.prefix,
+            "base_prefix": self.base_prefix,
+            "realpath": self.realpath,
+            "paths": self.paths,
+            "site_packages": self.site_packages,
+            "free_threaded": self.free_threaded,
+            "debug": self.debug,
+            "jit": self.jit,
+            "probe_latency_ms": self.probe_latency_ms
+        }
+
+    @classmethod
+    def from_dict(cls, data, executable=None):
+        """从字典构建记录，数据不完整时返回None"""
+        try:
+            version_info = data["version_info"]
+            if len(version_info) < 3:
+                return None
+            return cls(
+                executable or data["executable"],
+                version_info,
+                implementation=data.get("implementation", "CPython"),
+                architecture=data.get("architecture", ""),
+                bits=data.get("bits", 0),
+                prefix=data.get("prefix", ""),
+                base_prefix=data.get("base_prefix", ""),
+                realpath=data.get("realpath", ""),
+                paths=data.get("paths", {}),
+                site_packages=data.get("site_packages"),
+                free_threaded=data.get("free_threaded", False),
+                debug=data.get("debug", False),
+                jit=data.get("jit", False),
+                probe_latency_ms=data.get("probe_latency_ms")
+            )
+        except (KeyError, TypeError):
+            return None
+
+    @classmethod
+    def probe(cls, executable, timeout=DEFAULT_PROBE_TIMEOUT):
+        """启动一次隔离的子进程获取解释器的全部元数据
+
+        Args:
+            executable: 解释器路径
+            timeout: 探测超时时间（秒）
+
+        Returns:
+            Interpreter对象，探测失败返回None
+
+        Raises:
+            subprocess.TimeoutExpired: 解释器在超时时间内没有响应（其进程组已被结束）
+        """
+        start = time.monotonic()
+        try:
+            result = run_command([executable, "-I", "-S", "-c", PROBE_SCRIPT], timeout=timeout)
+            if result.returncode == 0:
+                interpreter = cls.from_dict(json.loads(result.stdout), executable)
+                if interpreter:
+                    interpreter.probe_latency_ms = round((time.monotonic() - start) * 1000, 1)
+                return interpreter
+        except subprocess.TimeoutExpired:
+            raise
+        except Exception as e:
+            logging.warning(f"探测Python解释器 {executable} 失败: {str(e)}")
+            return None
+
+        # 不支持 -I 的旧版本解释器（如Python 2）退回到 --version
+        remaining = None if timeout is None else max(1, timeout - (time.monotonic() - start))
+        interpreter = cls.probe_version_only(executable, timeout=remaining)
+        if interpreter:
+            interpreter.probe_latency_ms = round((time.monotonic() - start) * 1000, 1)
+        return interpreter
+
+    @classmethod
+    def probe_version_only(cls, executable, timeout=DEFAULT_PROBE_TIMEOUT):
+        """运行 --version 获取只包含版本号的记录，失败返回None"""
+        try:
+            result = run_command([executable, "--version"], timeout=timeout)
+            if result.returncode == 0:
+                version_output = result.stdout or result.stderr
+                version_match = re.search(r"Python (\d+)\.(\d+)\.(\d+)", version_output)
+                if version_match:
+                    version_info = [int(part) for part in version_match.groups()]
+                    return cls(executable, version_info, implementation="")
+        except subprocess.TimeoutExpired:
+            raise
+        except Exception as e:
+            logging.warning(f"探测Python解释器 {executable} 失败: {str(e)}")
+        return None
+
+    def __repr__(self):
+        return f"Interpreter({self.version!r}, {self.executable!r})"
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import logging
+import threading
+
+# 超过该时间未再被发现的缓存条目会被清理（秒）
+STALE_ENTRY_AGE = 30 * 24 * 3600
+
+# 缓存格式版本，探测脚本输出新的字段时递增，旧版本的探测结果不再使用
+CACHE_FORMAT_VERSION = 3
+
+# 锁文件超过该时间未释放即视为持有者已异常退出（秒）
+STALE_LOCK_AGE = 10
+
+
+class _FileLock:
+    """基于独占创建锁文件的跨进程锁，兼容Windows和类Unix系统"""
+
+    def __init__(self, lock_path, timeout=5.0):
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self.acquired = False
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                self.acquired = True
+                return self
+            except FileExistsError:
+                # 清理异常退出的进程遗留的锁文件
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > STALE_LOCK_AGE:
+                        os.remove(self.lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() >= deadline:
+                    # 无法获得锁时仍继续写入，写入本身是原子替换，最多丢失一次合并
+                    logging.warning(f"等待缓存锁超时: {self.lock_path}")
+                    return self
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.acquired:
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+            self.acquired = False
+
+
+class InterpreterCache:
+    """解释器探测结果的持久化缓存
+
+    以解释器路径为键，记录文件身份 (realpath, inode, size, mtime) 和探测得到的元数据。
+    文件身份未变化的解释器直接使用缓存结果，无需再启动子进程。
+    探测超时的解释器记入隔离列表，在文件被修改之前不再探测。
+    缓存文件通过锁文件和原子替换写入，可在GUI和其他使用PythonManager的进程之间共享。
+    """
+
+    def __init__(self, cache_file=None):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser("~"), ".pythonest", "interpreter_cache.json")
+        self.cache_file = cache_file
+        self.lock_file = cache_file + ".lock"
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._removed = set()
+        self._quarantine = {}
+        self._released = set()
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def file_identity(path):
+        """获取文件身份信息，文件不存在时返回None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return {
+            "realpath": os.path.realpath(path),
+            "inode": st.st_ino,
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns
+        }
+
+    def _read_file(self):
+        """读取磁盘上的缓存条目和隔离列表"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = data.get("entries", {})
+            if data.get("version") != CACHE_FORMAT_VERSION:
+                entries = {}
+            quarantine = data.get("quarantine", {})
+            return (entries if isinstance(entries, dict) else {},
+                    quarantine if isinstance(quarantine, dict) else {})
+        except FileNotFoundError:
+            return {}, {}
+        except Exception as e:
+            logging.warning(f"读取解释器缓存失败: {str(e)}")
+            return {}, {}
+
+    def load(self):
+        """从磁盘加载缓存"""
+        entries, quarantine = self._read_file()
+        with self._lock:
+            self._entries = entries
+            self._quarantine = quarantine
+            self._removed.clear()
+            self._released.clear()
+            self._dirty = False
+
+    def lookup(self, path):
+        """查找路径对应的缓存元数据
+
+        Args:
+            path: 解释器路径
+
+        Returns:
+            文件身份未变化时返回缓存的元数据字典，否则返回None
+        """
+        identity = self.file_identity(path)
+        if identity is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if not entry or entry.get("identity") != identity:
+                return None
+            entry["last_seen"] = time.time()
+            self._dirty = True
+            return dict(entry.get("metadata", {}))
+
+    def store(self, path, metadata):
+        """记录路径对应的探测结果"""
+        identity = self.file_identity(path)
+        if identity is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[path] = {
+                "identity": identity,
+                "metadata": dict(metadata),
+                "probed_at": now,
+                "last_seen": now
+            }
+            self._removed.discard(path)
+            self._dirty = True
+
+    def quarantine(self, path, reason):
+        """将解释器加入隔离列表，文件被修改之前不再探测"""
+        identity = self.file_identity(path)
+        if identity is None:
+            return
+
+        with self._lock:
+            self._quarantine[path] = {
+                "identity": identity,
+                "reason": reason,
+                "quarantined_at": time.time()
+            }
+            self._entries.pop(path, None)
+            self._released.discard(path)
+            self._dirty = True
+
+    def is_quarantined(self, path):
+        """检查解释器是否处于隔离状态；文件已变化时自动解除隔离"""
+        with self._lock:
+            record = self._quarantine.get(path)
+        if record is None:
+            return False
+
+        if self.file_identity(path) == record.get("identity"):
+            return True
+
+        with self._lock:
+            self._quarantine.pop(path, None)
+            self._released.add(path)
+            self._dirty = True
+        return False
+
+    def get_quarantined(self):
+        """返回隔离列表 {路径: 隔离原因}"""
+        with self._lock:
+            return {path: record.get("reason", "") for path, record in self._quarantine.items()}
+
+    def prune(self):
+        """清理已失效的缓存条目：文件已删除、已被修改或长期未被发现"""
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.items())
+
+        stale = []
+        for path, entry in entries:
+            if now - entry.get("last_seen", 0) > STALE_ENTRY_AGE:
+                stale.append(path)
+            elif self.file_identity(path) != entry.get("identity"):
+                stale.append(path)
+
+        # 已删除的解释器同时移出隔离列表
+        for path in list(self.get_quarantined()):
+            if self.file_identity(path) is None:
+                with self._lock:
+                    self._quarantine.pop(path, None)
+                    self._released.add(path)
+                    self._dirty = True
+
+        if stale:
+            with self._lock:
+                for path in stale:
+                    self._entries.pop(path, None)
+                    self._removed.add(path)
+                self._dirty = True
+        return len(stale)
+
+    def save(self):
+        """将缓存写回磁盘，与其他进程写入的条目合并"""
+        with self._lock:
+            if not self._dirty:
+                return True
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with _FileLock(self.lock_file):
+                on_disk, quarantine = self._read_file()
+                with self._lock:
+                    for path in self._removed:
+                        on_disk.pop(path, None)
+                    for path in self._released:
+                        quarantine.pop(path, None)
+                    quarantine.update(self._quarantine)
+                    for path in quarantine:
+                        on_disk.pop(path, None)
+                    # 同一路径以最近探测的结果为准
+                    for path, entry in self._entries.items():
+                        current = on_disk.get(path)
+                        if current is None or current.get("probed_at", 0) <= entry.get("probed_at", 0):
+                            on_disk[path] = entry
+                        else:
+                            current["last_seen"] = max(current.get("last_seen", 0), entry.get("last_seen", 0))
+                    self._entries = on_disk
+                    self._quarantine = quarantine
+                    self._removed.clear()
+                    self._released.clear()
+                    self._dirty = False
+                    data = {"version": CACHE_FORMAT_VERSION, "entries": on_disk, "quarantine": quarantine}
+
+                temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=1)
+                os.replace(temp_file, self.cache_file)
+            return True
+        except Exception as e:
+            logging.error(f"保存解释器缓存失败: {str(e)}")
+            return False
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.http_session import HttpSession
+
+# 测速结果的默认有效期（秒），国内镜像的快慢随时段变化，不宜过长
+DEFAULT_HEALTH_TTL = 3600
+
+# 单个镜像测速的超时时间（秒）
+MIRROR_PROBE_TIMEOUT = 5
+
+# 测速时以Range请求读取的固定字节数
+PROBE_BYTES = 1024 * 1024
+
+# 评分时估算下载该大小文件所需的时间（字节），约为一个Windows安装包的大小
+REFERENCE_BYTES = 25 * 1024 * 1024
+
+# 缺少最新版本的镜像评分乘以该系数
+STALE_MIRROR_PENALTY = 4
+
+# 实际下载的吞吐量与测速结果的平滑系数
+THROUGHPUT_SMOOTHING = 0.5
+
+
+class MirrorHealth:
+    """下载源健康状态
+
+    并发测量各镜像的首字节时间 (TTFB)、吞吐量以及是否已同步最新版本，
+    换算为预计下载一个安装包所需的秒数作为评分（越小越好），保存在磁盘上。
+    吞吐量通过读取镜像上一个真实文件的固定长度范围测得，目录页面太小，只能反映延迟。
+    实际下载的结果会平滑更新吞吐量，失败会降低排名。
+    """
+
+    def __init__(self, health_file=None):
+        if health_file is None:
+            health_file = os.path.join(os.path.expanduser("~"), ".pythonest", "mirror_health.json")
+        self.health_file = health_file
+        # 测速不自动重试，否则失败的镜像会拖慢整轮测速，测得的时间也不准确
+        self.session = HttpSession(retries=0, timeout=MIRROR_PROBE_TIMEOUT)
+        self._lock = threading.Lock()
+        self._entries = self._read_file()
+        # 是否有后台测速正在进行
+        self._refreshing = False
+
+    def _read_file(self):
+        try:
+            with open(self.health_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get("mirrors", {})
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f"读取镜像测速结果失败: {str(e)}")
+            return {}
+
+    def _save(self):
+        """原子替换写入测速结果，调用方需持有锁"""
+        try:
+            os.makedirs(os.path.dirname(self.health_file), exist_ok=True)
+            temp_file = f"{self.health_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "mirrors": self._entries}, f, indent=1)
+            os.replace(temp_file, self.health_file)
+        except Exception as e:
+            logging.error(f"保存镜像测速结果失败: {str(e)}")
+
+    def probe(self, source, freshness_url=None, verify_ssl=True, timeout=MIRROR_PROBE_TIMEOUT):
+        """测量单个镜像
+
+        Args:
+            source: 源信息字典，需包含url，可选probe_url作为测速文件的地址
+            freshness_url: 最新版本安装包的地址，用于检查镜像是否已同步
+            verify_ssl: 是否验证SSL证书
+            timeout: 超时时间（秒）
+
+        Returns:
+            测速结果字典
+        """
+        probe_url = source.get("probe_url") or source["url"]
+        result = {"ok": False, "ttfb_ms": None, "throughput": None, "fresh": None,
+                  "checked_at": time.time()}
+        try:
+            start = time.monotonic()
+            headers = {"Range": f"bytes=0-{PROBE_BYTES - 1}"}
+            with self.session.get(probe_url, headers=headers, stream=True, timeout=timeout,
+                                  verify=verify_ssl) as response:
+                response.raise_for_status()
+                # 读取第一个数据块的时间作为首字节时间
+                received = 0
+                first_byte = None
+                deadline = start + timeout
+                for chunk in response.iter_content(chunk_size=16384):
+                    if first_byte is None:
+                        first_byte = time.monotonic()
+                    received += len(chunk)
+                    if received >= PROBE_BYTES or time.monotonic() >= deadline:
+                        break
+                end = time.monotonic()
+
+            if first_byte is None:
+                first_byte = end
+            result["ttfb_ms"] = round((first_byte - start) * 1000, 1)
+            # 首个数据块之后的传输速率；文件过小时以整个请求估算
+            transfer_time = end - first_byte
+            if transfer_time <= 0.001:
+                transfer_time = end - start
+            result["throughput"] = received / max(transfer_time, 0.001)
+            result["ok"] = True
+
+            if freshness_url:
+                head = self.session.head(freshness_url, allow_redirects=True, timeout=timeout, verify=verify_ssl)
+                result["fresh"] = head.status_code == 200
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def probe_all(self, targets, verify_ssl=True, timeout=MIRROR_PROBE_TIMEOUT):
+        """并发测量所有镜像并保存结果
+
+        Args:
+            targets: (源信息字典, 最新版本安装包地址或None) 元组列表
+        """
+        if not targets:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = [(source, executor.submit(self.probe, source, freshness_url, verify_ssl, timeout))
+                       for source, freshness_url in targets]
+            results = {source["url"]: future.result() for source, future in futures}
+
+        with self._lock:
+            for url, result in results.items():
+                previous = self._entries.get(url, {})
+                # 保留实际下载失败的计数，测速成功后减半
+                result["failures"] = previous.get("failures", 0) // 2 if result["ok"] else previous.get("failures", 0) + 1
+                self._entries[url] = result
+            self._save()
+
+        for url, result in results.items():
+            if result["ok"]:
+                logging.info(f"镜像测速 {url}: TTFB {result['ttfb_ms']}ms, "
+                             f"{result['throughput'] / 1024:.0f}KB/s, 最新版本: {result['fresh']}")
+            else:
+                logging.info(f"镜像测速 {url} 失败: {result.get('error', '')}")
+        return results
+
+    def refresh_in_background(self, targets, verify_ssl=True, timeout=MIRROR_PROBE_TIMEOUT):
+        """在后台线程中并发测速，已有测速正在进行时直接返回
+
+        Args:
+            targets: 与probe_all相同
+
+        Returns:
+            是否启动了新的测速
+        """
+        with self._lock:
+            if self._refreshing or not targets:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.probe_all(targets, verify_ssl, timeout)
+            except Exception as e:
+                logging.warning(f"后台镜像测速失败: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, daemon=True, name="mirror-health").start()
+        return True
+
+    def is_stale(self, urls, ttl=DEFAULT_HEALTH_TTL):
+        """任一镜像没有测速结果或结果已过期时返回True"""
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                entry = self._entries.get(url)
+                if not entry or now - entry.get("checked_at", 0) >= ttl:
+                    return True
+        return False
+
+    def score(self, url):
+        """镜像评分（预计下载一个安装包所需的秒数），没有可用结果时返回None"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if not entry or not entry.get("ok") or not entry.get("throughput"):
+                return None
+            score = entry["ttfb_ms"] / 1000 + REFERENCE_BYTES / entry["throughput"]
+            if entry.get("fresh") is False:
+                score *= STALE_MIRROR_PENALTY
+            return score * (2 ** entry.get("failures", 0))
+
+    def rank(self, sources):
+        """按评分排列源：有测速结果的在前，未测速的保持原顺序，测速失败的排在最后"""
+        def key(item):
+            index, source = item
+            score = self.score(source["url"])
+            if score is not None:
+                return (0, score, index)
+            with self._lock:
+                probed = source["url"] in self._entries
+            return (2 if probed else 1, 0, index)
+
+        return [source for _, source in sorted(enumerate(sources), key=key)]
+
+    def get_results(self):
+        """返回全部测速结果 {url: 结果字典}"""
+        with self._lock:
+            return {url: dict(entry) for url, entry in self._entries.items()}
+
+    def record_success(self, url, size, seconds):
+        """根据实际下载的结果平滑更新吞吐量，并清除失败计数"""
+        if size <= 0 or seconds <= 0:
+            return
+        throughput = size / seconds
+        with self._lock:
+            entry = self._entries.setdefault(url, {"ok": True, "ttfb_ms": 0, "fresh": None,
+                                                   "checked_at": time.time()})
+            previous = entry.get("throughput")
+            entry["throughput"] = (throughput if not previous
+                                   else THROUGHPUT_SMOOTHING * throughput + (1 - THROUGHPUT_SMOOTHING) * previous)
+            entry["ok"] = True
+            entry["failures"] = 0
+            self._save()
+
+    def record_failure(self, url):
+        """记录一次实际请求失败，每次失败评分翻倍"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                entry = self._entries[url] = {"ok": False, "checked_at": 0}
+            entry["failures"] = entry.get("failures", 0) + 1
+            self._save()
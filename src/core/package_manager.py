@@ -1,11 +1,14 @@
 import os
 import sys
-import subprocess
-import requests
 import re
 import json
+import logging
 from urllib.parse import urljoin
 
+from src.core.http_session import get_session
+from src.core.process_utils import run_command, DEFAULT_QUERY_TIMEOUT, DEFAULT_INSTALL_TIMEOUT
+from src.core.package_metadata import find_site_packages, read_installed_packages
+
 class PackageManager:
     def __init__(self):
         self.pypi_url = "https://pypi.org/pypi/"
@@ -26,7 +29,7 @@ class PackageManager:
         try:
             # 构建搜索URL
             params = {"q": query}
-            response = requests.get(self.pypi_search_url, params=params)
+            response = get_session().get(self.pypi_search_url, params=params)
             
             if response.status_code == 200:
                 # 使用正则表达式从HTML中提取包信息
@@ -59,7 +62,7 @@ class PackageManager:
         try:
             # 构建API URL
             url = urljoin(self.pypi_url, f"{package_name}/json")
-            response = requests.get(url)
+            response = get_session().get(url)
             
             if response.status_code == 200:
                 # 解析JSON响应
@@ -101,7 +104,7 @@ class PackageManager:
             
             # 执行pip install命令
             cmd = [python, "-m", "pip", "install", package_name]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
             
             # 检查结果
             return result.returncode == 0
@@ -124,7 +127,7 @@ class PackageManager:
             
             # 执行pip uninstall命令
             cmd = [python, "-m", "pip", "uninstall", "-y", package_name]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
             
             # 检查结果
             return result.returncode == 0
@@ -142,13 +145,21 @@ class PackageManager:
         """
         packages = []
         
+        try:
+            # 直接读取site-packages中的包元数据，无需启动解释器和pip
+            site_dirs = find_site_packages(python_path)
+            if site_dirs:
+                return read_installed_packages(site_dirs)
+        except Exception as e:
+            logging.warning(f"读取已安装包的元数据失败，改用pip: {str(e)}")
+        
         try:
             # 确定Python解释器
             python = python_path if python_path else sys.executable
             
             # 执行pip list命令
             cmd = [python, "-m", "pip", "list", "--format=json"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_QUERY_TIMEOUT)
             
             if result.returncode == 0:
                 # 解析JSON输出
@@ -180,7 +191,7 @@ class PackageManager:
             
             # 执行pip list --outdated命令
             cmd = [python, "-m", "pip", "list", "--outdated", "--format=json"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_QUERY_TIMEOUT)
             
             if result.returncode == 0:
                 # 解析JSON输出
@@ -212,7 +223,7 @@ class PackageManager:
             
             # 执行pip install --upgrade命令
             cmd = [python, "-m", "pip", "install", "--upgrade", package_name]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
             
             # 检查结果
             return result.returncode == 0
@@ -0,0 +1,258 @@
+import io
+import os
+import re
+import sys
+import site
+import logging
+import sysconfig
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.interpreter import Interpreter
+from src.core.interpreter_cache import InterpreterCache
+from src.core.venv_index import read_pyvenv_cfg, venv_site_packages
+
+# 并行读取多个site-packages目录时使用的线程数
+PACKAGE_SCAN_WORKERS = 8
+
+# 读取元数据文件头部的最大行数，Name和Version通常位于最前面几行
+METADATA_HEADER_LINES = 50
+
+# 已安装包的元数据，例如 requests-2.31.0.dist-info、six-1.16.0-py3.8.egg-info（目录或单个文件）、
+# setup.py develop 写入的不含版本号的 foo.egg-info、easy_install 安装的 foo-1.0-py3.8.egg（目录或zip文件）
+# 以及开发模式安装的 foo.egg-link
+METADATA_ENTRY_PATTERN = re.compile(r"^(.+?)(?:-([^-]+?))?(?:-py\d[\d.]*)?\.(dist-info|egg-info|egg|egg-link)$")
+
+# 需要读取的site-packages条目的扩展名
+METADATA_SUFFIXES = (".dist-info", ".egg-info", ".egg", ".egg-link")
+
+# 按目录缓存的读取结果 {真实路径: (目录修改时间, 包列表)}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def canonical_name(name):
+    """规范化的包名（PEP 503），用于去重和比较"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _parse_headers(lines):
+    """从元数据的行中读取Name和Version"""
+    headers = {}
+    for _ in range(METADATA_HEADER_LINES):
+        line = lines.readline()
+        # 空行之后是包的说明正文
+        if not line or not line.strip():
+            break
+        key, sep, value = line.partition(":")
+        key = key.strip().lower()
+        if sep and key in ("name", "version") and key not in headers:
+            headers[key] = value.strip()
+            if len(headers) == 2:
+                break
+    return headers
+
+
+def _read_headers(path):
+    """读取元数据文件头部的Name和Version，文件不存在时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return _parse_headers(f)
+    except OSError:
+        return None
+
+
+def _read_zip_headers(path, member):
+    """读取zip格式的 .egg 中元数据文件的Name和Version，无法读取时返回None"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(member) as raw:
+                text = raw.read().decode('utf-8', errors='replace')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    return _parse_headers(io.StringIO(text))
+
+
+def _entry_name(entry_name):
+    """条目名中的规范化包名，无法识别时返回空字符串"""
+    match = METADATA_ENTRY_PATTERN.match(entry_name)
+    return canonical_name(match.group(1)) if match else ""
+
+
+def _read_egg_link(site_dir, path, name):
+    """读取开发模式安装的 .egg-link：第一行是项目中 .egg-info 所在的目录"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            project_dir = f.readline().strip()
+    except OSError:
+        return None
+    project_dir = os.path.join(site_dir, project_dir)
+    try:
+        entries = [entry for entry in os.listdir(project_dir) if entry.endswith(".egg-info")]
+    except OSError:
+        return None
+    # 同一目录中可能有多个项目的 .egg-info，优先使用与 .egg-link 同名的
+    target = canonical_name(name)
+    entries.sort(key=lambda entry: _entry_name(entry) != target)
+    for entry in entries:
+        egg_info = os.path.join(project_dir, entry)
+        headers = _read_headers(os.path.join(egg_info, "PKG-INFO") if os.path.isdir(egg_info) else egg_info)
+        if headers:
+            return headers
+    return None
+
+
+def _read_entry(site_dir, entry_name):
+    """解析一个 .dist-info、.egg-info、.egg 或 .egg-link 条目，返回 {"name", "version"}，无法识别时返回None"""
+    match = METADATA_ENTRY_PATTERN.match(entry_name)
+    if not match:
+        return None
+    path = os.path.join(site_dir, entry_name)
+    kind = match.group(3)
+    if kind == "dist-info":
+        headers = _read_headers(os.path.join(path, "METADATA"))
+    elif kind == "egg-link":
+        headers = _read_egg_link(site_dir, path, match.group(1))
+    elif kind == "egg":
+        if os.path.isdir(path):
+            headers = _read_headers(os.path.join(path, "EGG-INFO", "PKG-INFO"))
+        else:
+            headers = _read_zip_headers(path, "EGG-INFO/PKG-INFO")
+    elif os.path.isdir(path):
+        headers = _read_headers(os.path.join(path, "PKG-INFO"))
+    else:
+        headers = _read_headers(path)
+    if headers is None:
+        return None
+    # 元数据缺少字段时退回到条目名中的名称和版本，都没有版本号时无法识别
+    version = headers.get("version") or match.group(2)
+    if not version:
+        return None
+    return {
+        "name": headers.get("name") or match.group(1),
+        "version": version
+    }
+
+
+def read_site_packages(site_dir):
+    """读取一个site-packages目录中已安装的包
+
+    结果按目录的修改时间缓存：安装、升级和卸载包都会增删元数据目录，从而改变修改时间。
+
+    Returns:
+        [{"name", "version"}, ...]，目录不存在时返回空列表
+    """
+    try:
+        mtime = os.stat(site_dir).st_mtime_ns
+    except OSError:
+        return []
+    key = os.path.realpath(site_dir)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
+
+    packages = []
+    try:
+        with os.scandir(site_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(METADATA_SUFFIXES):
+                    package = _read_entry(site_dir, entry.name)
+                    if package:
+                        packages.append(package)
+    except OSError as e:
+        logging.warning(f"读取 {site_dir} 失败: {str(e)}")
+        return []
+
+    with _cache_lock:
+        _cache[key] = (mtime, packages)
+    return list(packages)
+
+
+def read_installed_packages(site_dirs):
+    """读取一个环境的全部site-packages目录，同名包以排在前面的目录为准（与sys.path的顺序一致）"""
+    packages = {}
+    for directory_packages in read_many(site_dirs):
+        for package in directory_packages:
+            packages.setdefault(canonical_name(package["name"]), package)
+    return sorted(packages.values(), key=lambda package: canonical_name(package["name"]))
+
+
+def read_many(site_dirs):
+    """并行读取多个site-packages目录，返回与输入顺序一致的包列表"""
+    site_dirs = list(site_dirs)
+    if len(site_dirs) <= 1:
+        return [read_site_packages(directory) for directory in site_dirs]
+    workers = min(PACKAGE_SCAN_WORKERS, len(site_dirs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="package-scan") as executor:
+        return list(executor.map(read_site_packages, site_dirs))
+
+
+def find_site_packages(python_path=None, interpreter_cache=None):
+    """确定解释器的site-packages目录，无需启动pip
+
+    虚拟环境直接从 pyvenv.cfg 和目录布局得到；其他解释器使用解释器缓存中记录的sysconfig路径，
+    缓存中没有时探测一次并写入缓存。python_path为None时使用当前进程的路径。
+
+    Returns:
+        site-packages目录列表，无法确定时返回None（调用方应退回到pip）
+    """
+    if python_path is None:
+        if getattr(sys, "frozen", False):
+            # 打包后的程序没有自己的site-packages
+            return None
+        paths = sysconfig.get_paths()
+        user_site = site.getusersitepackages() if site.ENABLE_USER_SITE else None
+        return _unique([user_site, paths.get("purelib"), paths.get("platlib")])
+
+    prefix = os.path.dirname(os.path.dirname(os.path.abspath(python_path)))
+    cfg = read_pyvenv_cfg(prefix)
+    if cfg:
+        # 包含系统site-packages的虚拟环境还需要基础解释器的路径，交给pip处理
+        if cfg.get("include-system-site-packages", "false").lower() == "true":
+            return None
+        site_dir = venv_site_packages(prefix)
+        return [site_dir] if site_dir else None
+
+    cache = interpreter_cache if interpreter_cache is not None else InterpreterCache()
+    interpreter = None
+    metadata = cache.lookup(python_path)
+    if metadata:
+        interpreter = Interpreter.from_dict(metadata, python_path)
+    if interpreter is None or not interpreter.paths:
+        try:
+            interpreter = Interpreter.probe(python_path)
+        except Exception as e:
+            logging.warning(f"探测 {python_path} 的site-packages失败: {str(e)}")
+            return None
+        if interpreter is None or not interpreter.paths:
+            return None
+        cache.store(python_path, interpreter.to_dict())
+        cache.save()
+    paths = interpreter.paths
+    # 用户目录中的site-packages在sys.path中排在系统site-packages之前
+    site_dirs = interpreter.site_packages or [paths.get("purelib"), paths.get("platlib")]
+    return _unique([_user_site(interpreter)] + site_dirs)
+
+
+def _user_site(interpreter):
+    """解释器默认的用户site-packages目录（PEP 370）"""
+    major, minor = interpreter.version_info[:2]
+    suffix = "t" if interpreter.free_threaded else ""
+    if sys.platform == "win32":
+        appdata = os.environ.get("APPDATA")
+        if not appdata:
+            return None
+        return os.path.join(appdata, "Python", f"Python{major}{minor}{suffix}", "site-packages")
+    if sys.platform == "darwin" and "Python.framework" in interpreter.prefix:
+        return os.path.expanduser(f"~/Library/Python/{major}.{minor}{suffix}/lib/python/site-packages")
+    return os.path.expanduser(f"~/.local/lib/python{major}.{minor}{suffix}/site-packages")
+
+
+def _unique(paths):
+    result = []
+    for path in paths:
+        if path and path not in result and os.path.isdir(path):
+            result.append(path)
+    return result or None
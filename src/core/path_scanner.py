@@ -0,0 +1,134 @@
+import os
+import fnmatch
+import logging
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+# 默认最大搜索深度（根目录为第0层）
+DEFAULT_SCAN_MAX_DEPTH = 5
+
+# 默认跳过的目录名模式，这些目录中不会有独立的Python解释器
+DEFAULT_SCAN_SKIP_DIRS = [
+    "site-packages", "dist-packages", "node_modules", "__pycache__",
+    ".git", ".hg", ".svn", ".tox", ".nox", ".mypy_cache", ".cache",
+    "lib", "Lib", "lib64", "include", "man", "locale", "Doc", "tcl", "test", "tests",
+    "pkgs"  # conda的包缓存目录，其中的解释器副本并非独立安装
+]
+
+# 默认匹配的解释器文件名模式
+if platform.system() == "Windows":
+    DEFAULT_SCAN_NAME_PATTERNS = ["python.exe", "python3*.exe", "pypy3*.exe"]
+else:
+    DEFAULT_SCAN_NAME_PATTERNS = ["python", "python3", "python3.*", "pypy3*"]
+
+# 与解释器名称模式相似但不是解释器的文件
+EXCLUDED_NAME_PATTERNS = ["*-config", "*.py", "*.pyc", "*.pc", "*.so", "*.so.*", "*.dll", "*.pdb"]
+
+# 默认并行扫描目录的线程数
+DEFAULT_SCAN_WORKERS = 4
+
+
+class PathScanner:
+    """基于 os.scandir 的受限目录扫描器，用于在自定义路径中查找Python解释器
+
+    按层并行扫描目录，支持最大深度、跳过目录模式和文件名模式，
+    并记录已访问目录的 (设备号, inode) 以避免符号链接造成的循环。
+    """
+
+    def __init__(self, max_depth=DEFAULT_SCAN_MAX_DEPTH, skip_dirs=None, name_patterns=None,
+                 workers=DEFAULT_SCAN_WORKERS, follow_symlinks=True):
+        self.max_depth = max_depth
+        self.skip_dirs = list(DEFAULT_SCAN_SKIP_DIRS if skip_dirs is None else skip_dirs)
+        self.name_patterns = list(DEFAULT_SCAN_NAME_PATTERNS if name_patterns is None else name_patterns)
+        self.workers = max(1, workers)
+        self.follow_symlinks = follow_symlinks
+        self.require_exec_bit = platform.system() != "Windows"
+
+    @classmethod
+    def from_settings(cls, search_settings):
+        """根据 search 设置块创建扫描器"""
+        try:
+            max_depth = int(search_settings.get("scan_max_depth", DEFAULT_SCAN_MAX_DEPTH))
+            workers = int(search_settings.get("scan_workers", DEFAULT_SCAN_WORKERS))
+        except (TypeError, ValueError):
+            max_depth, workers = DEFAULT_SCAN_MAX_DEPTH, DEFAULT_SCAN_WORKERS
+        return cls(
+            max_depth=max_depth,
+            skip_dirs=search_settings.get("scan_skip_dirs"),
+            name_patterns=search_settings.get("scan_name_patterns"),
+            workers=workers,
+            follow_symlinks=search_settings.get("scan_follow_symlinks", True)
+        )
+
+    def _match_any(self, name, patterns):
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+    def _is_interpreter_name(self, name):
+        return (self._match_any(name, self.name_patterns)
+                and not self._match_any(name, EXCLUDED_NAME_PATTERNS))
+
+    def _scan_directory(self, path):
+        """扫描单个目录，返回 (子目录列表, 匹配的解释器路径列表)"""
+        subdirs = []
+        matches = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                            if not self._match_any(entry.name, self.skip_dirs):
+                                subdirs.append(entry.path)
+                        elif self._is_interpreter_name(entry.name) and entry.is_file():
+                            if not self.require_exec_bit or os.access(entry.path, os.X_OK):
+                                matches.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.debug(f"无法扫描目录 {path}: {str(e)}")
+        return subdirs, matches
+
+    def _directory_key(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_ino:
+            return (st.st_dev, st.st_ino)
+        return os.path.normcase(os.path.realpath(path))
+
+    def scan(self, roots):
+        """扫描多个根目录
+
+        Args:
+            roots: 根目录路径列表
+
+        Returns:
+            找到的解释器路径列表，按发现顺序排列
+        """
+        visited = set()
+        current_level = []
+        for root in roots:
+            key = self._directory_key(root)
+            if key is not None and key not in visited and os.path.isdir(root):
+                visited.add(key)
+                current_level.append(root)
+
+        results = []
+        depth = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="path-scan") as executor:
+            while current_level:
+                next_level = []
+                for subdirs, matches in executor.map(self._scan_directory, current_level):
+                    results.extend(matches)
+                    if depth >= self.max_depth:
+                        continue
+                    for subdir in subdirs:
+                        key = self._directory_key(subdir)
+                        if key is None or key in visited:
+                            continue  # 已访问过（符号链接循环或重复链接）
+                        visited.add(key)
+                        next_level.append(subdir)
+                current_level = next_level
+                depth += 1
+
+        return results
@@ -0,0 +1,74 @@
+import os
+import signal
+import logging
+import platform
+import subprocess
+
+# 探测解释器的默认超时时间（秒）
+DEFAULT_PROBE_TIMEOUT = 10
+
+# pip list / pip show 等查询命令的默认超时时间（秒）
+DEFAULT_QUERY_TIMEOUT = 120
+
+# pip install、创建虚拟环境等耗时操作的默认超时时间（秒）
+DEFAULT_INSTALL_TIMEOUT = 1800
+
+
+def _kill_process_tree(process):
+    """结束进程及其所在进程组中的全部子进程"""
+    try:
+        if platform.system() == "Windows":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           capture_output=True, timeout=10)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except Exception as e:
+        logging.warning(f"结束进程组 {process.pid} 失败: {str(e)}")
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def run_command(cmd, timeout=DEFAULT_QUERY_TIMEOUT, capture_output=True, text=True, **kwargs):
+    """带超时的 subprocess.run 替代实现
+
+    子进程在新的进程组中启动，超时后结束整个进程组，避免挂起的解释器或其子进程残留。
+
+    Args:
+        cmd: 命令参数列表
+        timeout: 超时时间（秒），None表示不限制
+        capture_output: 是否捕获标准输出和标准错误
+        text: 是否以文本模式读取输出
+
+    Returns:
+        subprocess.CompletedProcess
+
+    Raises:
+        subprocess.TimeoutExpired: 命令超时（进程组已被结束）
+    """
+    if capture_output:
+        kwargs.setdefault("stdout", subprocess.PIPE)
+        kwargs.setdefault("stderr", subprocess.PIPE)
+    # 防止等待输入的子进程挂起
+    kwargs.setdefault("stdin", subprocess.DEVNULL)
+
+    if platform.system() == "Windows":
+        kwargs["creationflags"] = kwargs.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs.setdefault("start_new_session", True)
+
+    with subprocess.Popen(cmd, text=text, **kwargs) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_tree(process)
+            try:
+                process.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+            raise
+        except BaseException:
+            _kill_process_tree(process)
+            raise
+        return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
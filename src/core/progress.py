@@ -0,0 +1,78 @@
+import time
+import threading
+
+# 每个下载任务每秒最多发出的进度事件数
+DEFAULT_PROGRESS_RATE = 10
+
+# 下载速度的指数加权平滑系数，越大越接近瞬时速度
+SPEED_SMOOTHING = 0.3
+
+
+class ProgressThrottle:
+    """合并高频的下载进度回调
+
+    下载线程每写入一个数据块都会调用update，只有距上次发出事件超过1/rate秒、
+    或者下载已完成时才返回进度事件，其余调用只记录最新的字节数。
+    事件中包含指数加权平均的下载速度和预计剩余时间，可由任意线程调用。
+    """
+
+    def __init__(self, rate=DEFAULT_PROGRESS_RATE, smoothing=SPEED_SMOOTHING):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._last_time = None
+        self._last_bytes = 0
+        self.speed = 0.0
+
+    def update(self, downloaded, total):
+        """记录进度，需要通知时返回进度事件，否则返回None
+
+        Returns:
+            包含downloaded, total, percentage, speed（字节/秒）, eta（秒，未知时为None）键的字典
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_time is None:
+                # 第一次回调作为测速起点，断点续传时已下载的部分不计入速度
+                self._last_time = now
+                self._last_bytes = downloaded
+            else:
+                elapsed = now - self._last_time
+                finished = total > 0 and downloaded >= total
+                if elapsed < self.interval and not finished:
+                    return None
+                if elapsed > 0:
+                    instant = (downloaded - self._last_bytes) / elapsed
+                    self.speed = (instant if not self.speed
+                                  else self.smoothing * instant + (1 - self.smoothing) * self.speed)
+                self._last_time = now
+                self._last_bytes = downloaded
+            speed = self.speed
+
+        eta = None
+        if total > 0 and speed > 0:
+            eta = max(0, total - downloaded) / speed
+        return {
+            'downloaded': downloaded,
+            'total': total,
+            'percentage': int(downloaded * 100 / total) if total > 0 else 0,
+            'speed': speed,
+            'eta': eta
+        }
+
+
+def format_speed(speed):
+    """格式化下载速度"""
+    if speed >= 1024 * 1024:
+        return f"{speed / (1024 * 1024):.1f} MB/s"
+    return f"{speed / 1024:.0f} KB/s"
+
+
+def format_eta(eta):
+    """格式化预计剩余时间，未知时返回空字符串"""
+    if eta is None:
+        return ""
+    eta = int(eta + 0.5)
+    if eta >= 3600:
+        return f"{eta // 3600}:{eta % 3600 // 60:02d}:{eta % 60:02d}"
+    return f"{eta // 60}:{eta % 60:02d}"
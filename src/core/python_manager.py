@@ -3,20 +3,93 @@ import sys
 import subprocess
 import platform
 import re
+import shlex
+import shutil
 import requests
 import json
 import logging
+import time
 import warnings
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from src.core.interpreter import Interpreter
+from src.core.http_session import get_session, set_verify_ssl
+from src.core.interpreter_cache import InterpreterCache
+from src.core.catalog_cache import CatalogCache, DEFAULT_CATALOG_TTL
+from src.core.version_catalog import (PythonVersion, VersionCatalog, version_sort_key, VARIANT_FREE_THREADED,
+                                      VARIANT_JIT)
+from src.core.mirror_health import MirrorHealth, DEFAULT_HEALTH_TTL
+from src.core.downloader import (SegmentedDownloader, DownloadState, DownloadCancelled,
+                                DEFAULT_DOWNLOAD_CONNECTIONS, DEFAULT_MIN_SEGMENT_SIZE)
+from src.core.checksums import (StreamingHasher, PublishedDigests, file_digests, find_mismatch,
+                                read_digest_file, quarantine_file)
+from src.core.download_scheduler import DEFAULT_MAX_CONCURRENT_DOWNLOADS
+from src.core.installer_cache import InstallerCache, DEFAULT_INSTALLER_CACHE_SIZE
+from src.core.source_builder import (SourceBuilder, BuildError, DEFAULT_PYTHONS_DIR, DEFAULT_BUILD_PROFILE,
+                                     find_python_executable)
+from src.core.speed_benchmark import BenchmarkStore, speedup
+from src.core.standalone_installer import StandaloneInstaller, StandaloneIndex
+from src.core.discovery_providers import discover_managed_interpreters
+from src.core.process_utils import run_command, DEFAULT_PROBE_TIMEOUT, DEFAULT_INSTALL_TIMEOUT
+from src.core.path_scanner import (PathScanner, DEFAULT_SCAN_MAX_DEPTH, DEFAULT_SCAN_SKIP_DIRS,
+                                   DEFAULT_SCAN_NAME_PATTERNS, DEFAULT_SCAN_WORKERS)
+
 # 禁用SSL不安全警告
 warnings.filterwarnings("ignore", category=requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
+# 卸载Python的超时时间（秒）
+UNINSTALL_TIMEOUT = 600
+
+# Windows安装程序表示成功的退出码（3010: 成功，需要重启）
+WINDOWS_INSTALL_SUCCESS_CODES = (0, 3010)
+
+# Windows安装程序被用户取消时的退出码
+WINDOWS_INSTALL_CANCELLED = 1602
+
+# 并行探测解释器时的默认线程数（探测主要在等待子进程，线程数可多于CPU核数）
+DEFAULT_PROBE_WORKERS = min(16, (os.cpu_count() or 1) + 4)
+
+# 预定义下载源，设置对话框中的下拉框与selected_source_index均按此顺序
+# kind相同的源提供相同的安装包，可以互相替代；probe_url为测速时读取的真实文件（只读取开头的固定长度）
+PREDEFINED_SOURCES = [
+    {"name": "Python官网", "url": "https://www.python.org/downloads/",
+     "kind": "python", "probe_url": "https://www.python.org/ftp/python/3.12.0/python-3.12.0-amd64.exe"},
+    {"name": "华为云镜像", "url": "https://repo.huaweicloud.com/python/",
+     "kind": "python", "probe_url": "https://repo.huaweicloud.com/python/3.12.0/python-3.12.0-amd64.exe"},
+    {"name": "淘宝镜像", "url": "https://registry.npmmirror.com/binary.html?path=python/",
+     "kind": "python", "probe_url": "https://npmmirror.com/mirrors/python/3.12.0/python-3.12.0-amd64.exe"},
+    {"name": "清华大学镜像", "url": "https://mirrors.tuna.tsinghua.edu.cn/anaconda/archive/",
+     "kind": "miniconda",
+     "probe_url": "https://mirrors.tuna.tsinghua.edu.cn/anaconda/miniconda/Miniconda3-py311_23.5.2-0-Windows-x86_64.exe"},
+    {"name": "北京外国语大学镜像", "url": "https://mirrors.bfsu.edu.cn/anaconda/archive/",
+     "kind": "miniconda",
+     "probe_url": "https://mirrors.bfsu.edu.cn/anaconda/miniconda/Miniconda3-py311_23.5.2-0-Windows-x86_64.exe"}
+]
+
 class PythonManager:
     def __init__(self):
         self.system = platform.system()
         self.python_releases_url = "https://www.python.org/downloads/"
         self.settings = self._load_settings()
+        set_verify_ssl(self.settings["download"].get("verify_ssl", True))
+        self.interpreter_cache = InterpreterCache()
+        # 最近一次搜索得到的解释器记录，按版本号索引
+        self.interpreters = {}
+        self.installed_versions = None
+        self.catalog_cache = CatalogCache()
+        self.version_catalog = None
+        # 界面线程和后台线程共享上面的搜索结果和版本目录，替换时需持有此锁
+        self._state_lock = threading.Lock()
+        # 同一时间只进行一次解释器搜索
+        self._discovery_lock = threading.Lock()
+        self.mirror_health = MirrorHealth()
+        self.published_digests = PublishedDigests()
+        self.installer_cache = None
+        self.standalone_index = StandaloneIndex()
+        self.benchmark_store = BenchmarkStore()
         
     def _load_settings(self):
         """从配置文件加载设置"""
@@ -26,19 +99,47 @@ class PythonManager:
                 "use_py_launcher": True,
                 "use_path": True,
                 "use_custom_paths": False,
-                "custom_paths": ""
+                "custom_paths": "",
+                "use_managed_providers": True,
+                "probe_workers": DEFAULT_PROBE_WORKERS,
+                "use_probe_cache": True,
+                "probe_timeout": DEFAULT_PROBE_TIMEOUT,
+                "scan_max_depth": DEFAULT_SCAN_MAX_DEPTH,
+                "scan_skip_dirs": list(DEFAULT_SCAN_SKIP_DIRS),
+                "scan_name_patterns": list(DEFAULT_SCAN_NAME_PATTERNS),
+                "scan_workers": DEFAULT_SCAN_WORKERS,
+                "scan_follow_symlinks": True
             },
             "source": {
                 "use_custom_source": False,
                 "custom_source_url": "",
                 "selected_source_index": 0,
-                "selected_source_url": "https://www.python.org/downloads/"
+                "selected_source_url": "https://www.python.org/downloads/",
+                "catalog_ttl": DEFAULT_CATALOG_TTL,
+                "auto_select_source": True,
+                "mirror_health_ttl": DEFAULT_HEALTH_TTL
             },
             "download": {
                 "download_dir": os.path.join(os.environ.get("TEMP", ""), "PythoNest"),
                 "auto_install": True,
                 "verify_ssl": True,
-                "version_select_mode": "direct"  # direct 或 two_step
+                "keep_partial_on_cancel": False,  # 取消下载时保留已下载的部分，下次从断点继续
+                "version_select_mode": "direct",  # direct 或 two_step
+                "connections": DEFAULT_DOWNLOAD_CONNECTIONS,
+                "min_segment_size": DEFAULT_MIN_SEGMENT_SIZE,
+                "cache_max_size": DEFAULT_INSTALLER_CACHE_SIZE,
+                "max_concurrent_downloads": DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+                "bandwidth_limit": 0  # KB/s，0表示不限速
+            },
+            "build": {
+                # Linux/macOS的安装方式: auto（有预编译版本时边下载边解压，否则源码编译）、standalone 或 source
+                "install_method": "auto",
+                "standalone_mirror": "",  # 替换预编译版本下载地址中的 https://github.com
+                "jobs": 0,  # make的并行任务数，0表示CPU核数
+                "use_ccache": True,
+                "configure_flags": "",  # 为空时使用默认的configure参数
+                "profile": DEFAULT_BUILD_PROFILE,  # 编译配置，见 source_builder.BUILD_PROFILES
+                "run_benchmark": True  # 编译完成后测速并与系统自带的Python比较
             }
         }
         
@@ -49,7 +150,15 @@ class PythonManager:
             config_file = os.path.join(config_dir, "config.json")
             if os.path.exists(config_file):
                 with open(config_file, 'r') as f:
-                    return json.load(f)
+                    settings = json.load(f)
+                # 旧版本配置文件可能缺少新增的设置项，使用默认值补齐
+                for section, defaults in default_settings.items():
+                    if isinstance(settings.get(section), dict):
+                        for key, value in defaults.items():
+                            settings[section].setdefault(key, value)
+                    else:
+                        settings[section] = defaults
+                return settings
             else:
                 # 创建默认配置文件
                 with open(config_file, 'w') as f:
@@ -69,14 +178,26 @@ class PythonManager:
             with open(config_file, 'w') as f:
                 json.dump(settings, f, indent=4)
             self.settings = settings
+            set_verify_ssl(settings["download"].get("verify_ssl", True))
             return True
         except Exception as e:
             logging.error(f"保存设置失败: {str(e)}")
             return False
         
     def get_installed_versions(self):
-        """获取已安装的Python版本列表"""
+        """获取已安装的Python版本列表
+        
+        搜索和探测可能耗时较长，只应在后台线程中调用；多个线程同时调用时依次执行。
+        """
+        with self._discovery_lock:
+            return self._discover_installed_versions()
+    
+    def _discover_installed_versions(self):
         installed_versions = []
+        # 待探测的候选解释器: (可执行文件路径, 探测失败时使用的版本号)
+        candidates = []
+        # 无需启动子进程即可确定元数据的解释器: {可执行文件路径: Interpreter}
+        known_interpreters = {}
         search_settings = self.settings["search"]
         
         if self.system == "Windows":
@@ -89,28 +210,19 @@ class PythonManager:
                         while True:
                             try:
                                 version = winreg.EnumKey(key, i)
-                                # 验证是否是有效版本号
-                                if re.match(r"^\d+\.\d+$", version):
+                                # 验证是否是有效版本号，自由线程构建注册为 3.13t
+                                if re.match(r"^\d+\.\d+t?$", version):
                                     # 检查InstallPath键是否存在
                                     try:
                                         with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"SOFTWARE\\Python\\PythonCore\\{version}\\InstallPath") as install_key:
                                             install_path = winreg.QueryValue(install_key, "")
                                             if os.path.exists(install_path):
-                                                # 尝试获取精确版本号
-                                                try:
-                                                    exe_path = os.path.join(install_path, "python.exe")
-                                                    if os.path.exists(exe_path):
-                                                        result = subprocess.run([exe_path, "--version"], 
-                                                                           capture_output=True, text=True)
-                                                        if result.returncode == 0:
-                                                            version_match = re.search(r"Python (\d+\.\d+\.\d+)", 
-                                                                                  result.stdout or result.stderr)
-                                                            if version_match:
-                                                                version = version_match.group(1)
-                                                except:
-                                                    pass  # 使用注册表中的版本号
-                                                
-                                                if version not in installed_versions:
+                                                # 精确版本号留到并行探测阶段获取
+                                                exe_name = f"python{version}.exe" if version.endswith("t") else "python.exe"
+                                                exe_path = os.path.join(install_path, exe_name)
+                                                if os.path.exists(exe_path):
+                                                    candidates.append((exe_path, version))
+                                                elif version not in installed_versions:
                                                     installed_versions.append(version)
                                     except:
                                         pass  # 安装路径不存在或无法访问
@@ -123,7 +235,7 @@ class PythonManager:
             # 使用py启动器
             if search_settings["use_py_launcher"]:
                 try:
-                    result = subprocess.run(["py", "-0"], capture_output=True, text=True)
+                    result = run_command(["py", "-0"], timeout=DEFAULT_PROBE_TIMEOUT)
                     if result.returncode == 0:
                         for line in result.stdout.splitlines():
                             if "-" in line:
@@ -140,133 +252,317 @@ class PythonManager:
                                         else:
                                             continue
                                             
+                                    # 自由线程构建显示为 -V:3.13t
+                                    if re.search(r"\d+\.\d+t\b", version_info):
+                                        version += VARIANT_FREE_THREADED
                                     if version and version not in installed_versions:
                                         installed_versions.append(version)
                 except Exception as e:
                     logging.warning(f"通过py启动器获取Python版本失败: {str(e)}")
         
+        # 通过pyenv、asdf、conda、uv和发行版目录布局发现解释器，无需启动子进程
+        if self.system != "Windows" and search_settings.get("use_managed_providers", True):
+            for python_path, interpreter, trusted in discover_managed_interpreters():
+                if interpreter and trusted:
+                    known_interpreters[python_path] = interpreter
+                # 不可信的版本号（如发行版的开发头文件）只在探测失败时使用，探测结果按文件身份缓存
+                candidates.append((python_path, interpreter.version_id if interpreter else None))
+        
         # 在PATH中搜索
         if search_settings["use_path"]:
             paths = os.environ["PATH"].split(os.pathsep)
-            for prefix in ["python", "python3", "python2"]:
+            for prefix in ["python", "python3", "python3t", "python2"]:
                 for path in paths:
                     python_path = os.path.join(path, prefix)
                     if self.system == "Windows":
                         python_path += ".exe"
                         
                     if os.path.isfile(python_path) and os.access(python_path, os.X_OK):
-                        try:
-                            result = subprocess.run([python_path, "--version"], 
-                                                   capture_output=True, text=True)
-                            if result.returncode == 0:
-                                version_output = result.stdout or result.stderr
-                                version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_output)
-                                if version_match:
-                                    version = version_match.group(1)
-                                    if version not in installed_versions:
-                                        installed_versions.append(version)
-                        except Exception as e:
-                            logging.warning(f"通过PATH获取Python版本失败: {str(e)}")
+                        candidates.append((python_path, None))
         
         # 在自定义路径中搜索
         if search_settings["use_custom_paths"] and search_settings["custom_paths"]:
-            custom_paths = search_settings["custom_paths"].split(";")
-            for base_path in custom_paths:
-                if not os.path.exists(base_path):
-                    continue
-                    
-                # 搜索目录中的Python可执行文件
-                for root, dirs, files in os.walk(base_path):
-                    python_exe = "python.exe" if self.system == "Windows" else "python"
-                    if python_exe in files:
-                        python_path = os.path.join(root, python_exe)
-                        try:
-                            result = subprocess.run([python_path, "--version"], 
-                                                   capture_output=True, text=True)
-                            if result.returncode == 0:
-                                version_output = result.stdout or result.stderr
-                                version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_output)
-                                if version_match:
-                                    version = version_match.group(1)
-                                    if version not in installed_versions:
-                                        installed_versions.append(version)
-                        except:
-                            pass
+            custom_paths = [p.strip() for p in search_settings["custom_paths"].split(";") if p.strip()]
+            
+            # 使用受限深度、跳过无关目录的并行扫描器搜索Python可执行文件
+            scanner = PathScanner.from_settings(search_settings)
+            for python_path in scanner.scan(custom_paths):
+                candidates.append((python_path, None))
+        
+        # 合并指向同一物理文件的候选，并行探测所有候选解释器
+        candidates = self._normalize_candidates(candidates)
+        interpreters = {}
+        for version, interpreter in self._probe_candidates(candidates, known_interpreters):
+            if interpreter and version not in interpreters:
+                interpreters[version] = interpreter
+            if version not in installed_versions:
+                installed_versions.append(version)
+        
+        # 清理失效的缓存条目，并将缓存和隔离列表写回磁盘
+        self.interpreter_cache.prune()
+        self.interpreter_cache.save()
         
         # 排序版本号
-        def version_key(v):
-            parts = v.split('.')
-            return [int(p) if p.isdigit() else p for p in parts]
-            
-        return sorted(installed_versions, key=version_key)
-    
-    def get_major_versions(self):
-        """获取所有可用的主要版本（例如3.12, 3.11等）及其对应的次版本列表"""
-        all_versions = self.get_available_versions()
-        
-        # 按主版本分组
-        major_versions = {}
-        for version in all_versions:
-            # 获取主版本号 (例如 "3.12.0" -> "3.12")
-            parts = version.split('.')
-            if len(parts) >= 2:
-                major_ver = f"{parts[0]}.{parts[1]}"
-                if major_ver not in major_versions:
-                    major_versions[major_ver] = []
-                major_versions[major_ver].append(version)
-        
-        # 将字典转换为列表，并按版本号降序排序
-        result = []
-        for major_ver, versions in sorted(major_versions.items(), 
-                                         key=lambda x: [int(p) for p in x[0].split('.')], 
-                                         reverse=True):
-            # 对每个主版本内的次版本也按降序排序
-            sorted_versions = sorted(versions, 
-                                   key=lambda x: [int(p) for p in x.split('.')], 
-                                   reverse=True)
-            result.append((major_ver, sorted_versions))
-        
-        return result
-        
-    def get_available_versions(self):
-        """获取可用的Python版本列表"""
-        versions = []
+        installed_versions = sorted(installed_versions, key=version_sort_key)
+        with self._state_lock:
+            self.interpreters = interpreters
+            self.installed_versions = installed_versions
+        return installed_versions
+    
+    def _normalize_candidates(self, candidates):
+        """按 (设备号, inode) 合并指向同一物理解释器的候选路径
         
-        # 根据选择的源获取版本列表
-        source = self.get_current_source()
-        source_url = source.get("url", "")
+        符号链接、硬链接以及merged-usr下 /bin 与 /usr/bin 的副本都只保留一个探测目标，
+        其余路径记录为别名。虚拟环境中的解释器虽然可能链接到同一文件，但sys.prefix不同，
+        因此按虚拟环境目录单独分组。
         
-        try:
-            # 根据不同的源使用不同的获取策略
-            if "python.org" in source_url:
-                versions = self._get_versions_from_python_org()
-            elif "huaweicloud.com" in source_url:
-                versions = self._get_versions_from_huaweicloud()
-            elif "npmmirror.com" in source_url or "taobao" in source_url:
-                versions = self._get_versions_from_taobao()
-            elif "tuna.tsinghua.edu.cn" in source_url:
-                versions = self._get_versions_from_tsinghua()
-            elif "bfsu.edu.cn" in source_url:
-                versions = self._get_versions_from_bfsu()
+        Args:
+            candidates: (可执行文件路径, 探测失败时使用的版本号) 元组列表
+            
+        Returns:
+            (可执行文件路径, 探测失败时使用的版本号, 别名路径列表) 元组列表
+        """
+        groups = {}
+        for python_path, fallback_version in candidates:
+            try:
+                st = os.stat(python_path)
+            except OSError:
+                continue
+            
+            if st.st_ino:
+                file_key = (st.st_dev, st.st_ino)
             else:
-                # 尝试通用方法
-                versions = self._get_versions_generic(source_url)
+                # 部分文件系统不提供inode，退回到规范化的真实路径
+                file_key = os.path.normcase(os.path.realpath(python_path))
             
-            # 如果没有获取到版本，使用预定义的版本列表
-            if not versions:
-                logging.warning(f"从 {source_url} 获取版本列表失败，使用预定义版本列表")
-                versions = self._get_predefined_versions()
-                
-        except Exception as e:
-            logging.error(f"获取Python版本列表失败: {str(e)}")
-            # 使用预定义的版本列表作为备选
+            venv_root = os.path.dirname(os.path.dirname(os.path.abspath(python_path)))
+            if not os.path.isfile(os.path.join(venv_root, "pyvenv.cfg")):
+                venv_root = None
+            
+            key = (file_key, venv_root)
+            if key not in groups:
+                groups[key] = [python_path, fallback_version, []]
+            group = groups[key]
+            if python_path not in group[2]:
+                group[2].append(python_path)
+            if not group[1]:
+                group[1] = fallback_version
+        
+        return [tuple(group) for group in groups.values()]
+    
+    def _probe_candidates(self, candidates, known_interpreters=None):
+        """使用有界线程池并行探测候选解释器
+        
+        Args:
+            candidates: (可执行文件路径, 探测失败时使用的版本号, 别名路径列表) 元组列表
+            known_interpreters: 已从文件布局得到元数据的解释器 {路径: Interpreter}，这些候选不再探测
+            
+        Returns:
+            与候选顺序一致的 (版本号, Interpreter或None) 列表（已跳过无法识别的候选）
+        """
+        if not candidates:
+            return []
+        
+        max_workers = self.settings["search"].get("probe_workers", DEFAULT_PROBE_WORKERS)
+        try:
+            max_workers = max(1, int(max_workers))
+        except (TypeError, ValueError):
+            max_workers = DEFAULT_PROBE_WORKERS
+        max_workers = min(max_workers, len(candidates))
+        
+        known_interpreters = known_interpreters or {}
+        
+        def probe(candidate):
+            python_path, fallback_version, aliases = candidate
+            interpreter = next((known_interpreters[path] for path in aliases if path in known_interpreters), None)
+            if interpreter is None:
+                interpreter = self._get_interpreter_record(python_path)
+            if interpreter:
+                interpreter.aliases = list(aliases)
+                return interpreter.version_id, interpreter
+            return fallback_version, None
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="python-probe") as executor:
+            return [result for result in executor.map(probe, candidates) if result[0]]
+    
+    def _get_interpreter_record(self, python_path):
+        """获取解释器的元数据记录，优先使用缓存，否则启动一次隔离子进程探测
+        
+        探测超时的解释器会被结束整个进程组并加入隔离列表，在文件被修改之前不再探测。
+        """
+        search_settings = self.settings["search"]
+        use_cache = search_settings.get("use_probe_cache", True)
+        
+        if self.interpreter_cache.is_quarantined(python_path):
+            logging.info(f"跳过已隔离的Python解释器: {python_path}")
+            return None
+        
+        # 文件身份未变化的解释器直接使用缓存结果
+        if use_cache:
+            cached = self.interpreter_cache.lookup(python_path)
+            if cached:
+                interpreter = Interpreter.from_dict(cached, python_path)
+                if interpreter:
+                    return interpreter
+        
+        timeout = search_settings.get("probe_timeout", DEFAULT_PROBE_TIMEOUT)
+        try:
+            interpreter = Interpreter.probe(python_path, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"探测Python解释器 {python_path} 超时（{timeout}秒），已加入隔离列表")
+            self.interpreter_cache.quarantine(python_path, f"探测超时（{timeout}秒）")
+            return None
+        
+        if interpreter:
+            logging.info(f"探测Python解释器 {python_path} 耗时 {interpreter.probe_latency_ms} ms")
+            if use_cache:
+                self.interpreter_cache.store(python_path, interpreter.to_dict())
+        return interpreter
+    
+    def _invalidate_installed_versions(self):
+        """安装或卸载后清除已安装版本列表，下次需要时重新搜索"""
+        with self._state_lock:
+            self.installed_versions = None
+    
+    def get_interpreter(self, version):
+        """获取最近一次搜索中指定版本的解释器记录，未找到返回None"""
+        with self._state_lock:
+            return self.interpreters.get(version)
+    
+    def get_default_interpreter(self):
+        """获取PATH中默认python命令对应的解释器记录，未找到返回None"""
+        python_path = shutil.which("python") or shutil.which("python3")
+        if not python_path:
+            return None
+        
+        interpreter = self._get_interpreter_record(python_path)
+        self.interpreter_cache.save()
+        return interpreter
+    
+    def get_quarantined_interpreters(self):
+        """获取因探测超时而被隔离的解释器 {路径: 隔离原因}"""
+        return self.interpreter_cache.get_quarantined()
+    
+    def get_major_versions(self, catalog=None):
+        """获取所有可用的主要版本（例如3.12, 3.11等）及其对应的次版本列表
+        
+        Args:
+            catalog: 已获取的VersionCatalog，为None时调用get_version_catalog获取
+        """
+        if catalog is None:
+            catalog = self.get_version_catalog()
+        return catalog.get_major_versions()
+    
+    def get_available_versions(self, force_refresh=False):
+        """获取可用的Python版本列表（升序）
+        
+        Args:
+            force_refresh: 忽略缓存有效期，立即向源重新验证
+        """
+        return self.get_version_catalog(force_refresh).to_list()
+        
+    def get_version_catalog(self, force_refresh=False):
+        """获取可用版本目录，已移除已安装的版本
+        
+        版本目录按源缓存在磁盘上，缓存过期后使用ETag/Last-Modified条件请求重新验证。
+        
+        Args:
+            force_refresh: 忽略缓存有效期，立即向源重新验证
+        """
+        versions = None
+        
+        # 按镜像排名依次尝试，当前源失败时自动切换到下一个
+        candidates = self.get_source_candidates(refresh_health=True)
+        for source in candidates:
+            source_url = source.get("url", "")
+            try:
+                versions = self._get_versions_from_source(source_url, force_refresh)
+            except Exception as e:
+                logging.error(f"从{source.get('name', source_url)}获取Python版本列表失败: {str(e)}")
+                versions = None
+            if versions:
+                break
+            self.mirror_health.record_failure(source_url)
+            logging.warning(f"从 {source_url} 获取版本列表失败，尝试下一个源")
+        
+        # 所有源都失败时使用过期的缓存，最后使用预定义的版本列表
+        if not versions:
+            versions = self._get_stale_catalog_versions(candidates)
+        if not versions:
+            logging.warning("所有源都无法获取版本列表，使用预定义版本列表")
             versions = self._get_predefined_versions()
         
-        # 过滤掉alpha, beta, rc版本（除非特别设置）
-        if not self.settings.get("include_dev_versions", False):
-            versions = [v for v in versions if not any(x in v for x in ['a', 'b', 'rc'])]
+        return self._build_available_catalog(versions)
+    
+    def _get_versions_from_source(self, source_url, force_refresh=False):
+        """根据不同的源使用不同的获取策略，失败时返回None"""
+        if "python.org" in source_url:
+            return self._get_versions_from_python_org(force_refresh)
+        elif "huaweicloud.com" in source_url:
+            return self._get_versions_from_huaweicloud(force_refresh)
+        elif "npmmirror.com" in source_url or "taobao" in source_url:
+            return self._get_versions_from_taobao()
+        elif "tuna.tsinghua.edu.cn" in source_url:
+            return self._get_versions_from_tsinghua()
+        elif "bfsu.edu.cn" in source_url:
+            return self._get_versions_from_bfsu()
+        # 尝试通用方法
+        return self._get_versions_generic(source_url, force_refresh)
+    
+    def _get_stale_catalog_versions(self, candidates):
+        """返回候选源中第一个存在的版本目录缓存（不检查有效期）"""
+        for source in candidates:
+            catalog_url = self._get_catalog_url(source.get("url", ""))
+            entry = self.catalog_cache.get(catalog_url) if catalog_url else None
+            if entry and entry.get("versions"):
+                logging.info(f"使用缓存的{source.get('name', catalog_url)}版本目录")
+                return entry["versions"]
+        return None
+    
+    def get_cached_version_catalog(self, installed=None):
+        """立即返回缓存中的可用版本目录（不检查有效期），没有缓存时返回None
+        
+        不发送网络请求、不测速也不搜索解释器，可在界面线程中调用；缓存未命中时由调用方在后台线程中
+        调用get_version_catalog。
         
-        return versions
+        Args:
+            installed: 调用方已有的已安装版本列表，为None时使用最近一次搜索的结果（尚未搜索过时不过滤）
+        """
+        candidates = self.get_source_candidates()
+        if self._get_catalog_url(candidates[0].get("url", "")) is None:
+            # 该源使用预定义版本列表，无需网络请求
+            versions = self._get_predefined_versions()
+        else:
+            versions = self._get_stale_catalog_versions(candidates)
+        if not versions:
+            return None
+        
+        if installed is None:
+            with self._state_lock:
+                installed = self.installed_versions
+        return self._filter_available_catalog(versions, installed or [])
+    
+    def get_cached_available_versions(self, installed=None):
+        """立即返回当前源缓存中的可用版本列表（不检查有效期），没有缓存时返回None"""
+        catalog = self.get_cached_version_catalog(installed)
+        return catalog.to_list() if catalog is not None else None
+    
+    def _build_available_catalog(self, versions):
+        """构建版本目录，移除已安装的版本，并过滤掉alpha, beta, rc版本（除非特别设置）"""
+        # 只在尚未搜索过已安装版本时执行一次搜索
+        with self._state_lock:
+            installed = self.installed_versions
+        if installed is None:
+            installed = self.get_installed_versions()
+        return self._filter_available_catalog(versions, installed)
+    
+    def _filter_available_catalog(self, versions, installed):
+        catalog = VersionCatalog(versions,
+                                 include_prereleases=self.settings.get("include_dev_versions", False))
+        catalog = catalog.without(installed)
+        with self._state_lock:
+            self.version_catalog = catalog
+        return catalog
     
     def _get_predefined_versions(self):
         """返回预定义的Python版本列表，确保即使在线获取失败也有可用选项"""
@@ -278,12 +574,13 @@ class PythonManager:
             "3.7.17", "3.7.16", "3.7.15", "3.7.14", "3.7.13", "3.7.12", "3.7.11", "3.7.10", "3.7.9", "3.7.8", "3.7.7", "3.7.6", "3.7.5", "3.7.4", "3.7.3", "3.7.2", "3.7.1", "3.7.0"
         ]
     
-    def download_version(self, version, progress_callback=None):
+    def download_version(self, version, progress_callback=None, cancel_token=None):
         """下载指定版本的Python安装包
         
         Args:
             version: 要下载的Python版本号，如"3.11.5"
             progress_callback: 进度回调函数，接收一个字典参数，包含downloaded, total, percentage键
+            cancel_token: 可选的CancellationToken，取消后停止下载并抛出DownloadCancelled，不再尝试其他源
             
         Returns:
             安装包的本地路径
@@ -295,167 +592,227 @@ class PythonManager:
         # 获取SSL验证设置
         verify_ssl = self.settings["download"].get("verify_ssl", True)
         
-        # 构建安装包名称
-        if sys.platform == "win32":
-            installer_name = f"python-{version}-amd64.exe"
-        elif sys.platform == "darwin":
-            installer_name = f"python-{version}-macos11.pkg"
-        else:
-            # Linux平台通常使用包管理器安装
-            installer_name = f"Python-{version}.tgz"
-        
-        # 本地安装包路径
-        local_path = os.path.join(download_dir, installer_name)
+        installer_name = self._get_installer_name(version)
+        release = self._get_release(version)
         
-        # 如果已经下载，直接返回
-        if os.path.exists(local_path):
-            logging.info(f"Python {version} 安装包已存在，跳过下载")
-            return local_path
+        # 各候选源的下载地址；Miniconda镜像提供的文件与Python官方安装包不同，缓存按下载地址中的真实文件名和源的种类区分
+        candidates = self.get_source_candidates(refresh_health=True)
+        targets = self._get_download_targets(candidates, version)
         
-        # 获取下载URL
-        source = self.get_current_source()
-        source_url = source.get("url", "")
-        download_url = self._get_download_url(source_url, version)
+        # 缓存中已有校验通过的同种类安装包时直接使用
+        installer_cache = self.get_installer_cache()
+        for name, kind in dict.fromkeys((name, source.get("kind")) for source, _, name in targets):
+            cached_path = installer_cache.lookup(name, kind=kind)
+            if cached_path:
+                logging.info(f"Python {version} 安装包 {name} 已在缓存中，跳过下载")
+                return cached_path
         
-        if not download_url:
-            logging.error(f"无法获取Python {version}的下载链接")
-            return None
+        # 早期版本直接保存在下载目录中的Python官方安装包，校验通过后移入缓存
+        local_path = os.path.join(download_dir, installer_name)
+        if os.path.exists(local_path) and \
+                any(source.get("kind") == "python" and name == installer_name for source, _, name in targets):
+            digest = self._verify_existing_installer(release, local_path, verify_ssl)
+            if digest:
+                logging.info(f"Python {version} 安装包已存在，移入安装包缓存")
+                try:
+                    os.remove(local_path + ".sha256")
+                except OSError:
+                    pass
+                return installer_cache.add(local_path, installer_name, digest, "python")
         
-        logging.info(f"开始下载Python {version} 从 {download_url}")
+        # python.org公布的摘要，只用于校验提供Python官方安装包的源（kind为python）下载的同名安装包；
+        # Miniconda等其他种类的源下载的是不同的文件，只记录下载文件的摘要
+        published = {}
+        if any(source.get("kind") == "python" for source in candidates):
+            published = self.published_digests.get(release, installer_name, verify_ssl)
+            if not published:
+                logging.info(f"没有找到Python {version} 安装包的发布摘要，只记录下载文件的摘要")
         
-        try:
-            # 创建临时文件
-            temp_path = local_path + ".tmp"
-            
-            # 根据源设置特定的请求头和参数
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            
-            # 对于淘宝镜像，禁用SSL验证
-            if "npmmirror.com" in source_url or "taobao" in source_url:
-                verify_ssl = False
+        # 按镜像排名依次尝试下载，失败时自动切换到下一个源
+        for source, download_url, name in targets:
+            source_url = source.get("url", "")
+            # 同名文件的不同镜像共用临时文件，可以互相续传
+            temp_path = os.path.join(download_dir, name + ".tmp")
             
-            # 使用requests下载文件，支持进度回调
-            with requests.get(download_url, stream=True, verify=verify_ssl, headers=headers, timeout=30) as response:
-                response.raise_for_status()
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            logging.info(f"开始下载Python {version} 从 {download_url}")
+            try:
+                # 对于淘宝镜像，禁用SSL验证
+                source_verify_ssl = verify_ssl and not ("npmmirror.com" in source_url or "taobao" in source_url)
+                start_time = time.monotonic()
+                hasher = StreamingHasher()
+                size = self._download_file(download_url, temp_path, source_verify_ssl, progress_callback, hasher,
+                                           cancel_token)
+                
+                # 摘要在下载过程中已计算，只需补读断点续传之前写入的部分
+                digests = hasher.finish(temp_path, os.path.getsize(temp_path))
+                mismatch = find_mismatch(published if source.get("kind") == "python" and name == installer_name else {},
+                                         digests)
+                if mismatch:
+                    quarantine_file(temp_path, download_dir,
+                                    f"{mismatch} 不匹配: 期望 {published[mismatch]}, 实际 {digests[mismatch]}, 来源 {download_url}")
+                    self.mirror_health.record_failure(source_url)
+                    continue
+                self.mirror_health.record_success(source_url, size, time.monotonic() - start_time)
                 
-                # 获取文件大小
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded_size = 0
+                # 下载完成后按摘要存入缓存，再次使用时以此校验
+                cached_path = installer_cache.add(temp_path, name, digests["sha256"], source.get("kind"))
+                logging.info(f"Python {version} 从{source.get('name', source_url)}下载完成: {cached_path}")
+                return cached_path
                 
-                # 写入文件
-                with open(temp_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                            
-                            # 计算进度百分比
-                            percentage = int(downloaded_size * 100 / total_size) if total_size > 0 else 0
-                            
-                            # 调用进度回调
-                            if progress_callback:
-                                progress_info = {
-                                    'downloaded': downloaded_size,
-                                    'total': total_size,
-                                    'percentage': percentage
-                                }
-                                progress_callback(progress_info)
-            
-            # 下载完成后重命名文件
-            os.rename(temp_path, local_path)
-            logging.info(f"Python {version} 下载完成: {local_path}")
-            return local_path
-            
-        except Exception as e:
-            logging.error(f"下载Python {version}失败: {str(e)}")
-            # 清理临时文件
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
-                    
-            # 如果是淘宝镜像失败，尝试使用Python官网
-            if "npmmirror.com" in source_url or "taobao" in source_url:
-                logging.info("尝试从Python官网下载")
-                try:
-                    # 使用Python官网URL
-                    download_url = f"https://www.python.org/ftp/python/{version}/python-{version}-amd64.exe"
-                    
-                    # 使用requests下载文件
-                    with requests.get(download_url, stream=True, verify=True, headers=headers, timeout=30) as response:
-                        response.raise_for_status()
-                        
-                        # 获取文件大小
-                        total_size = int(response.headers.get('content-length', 0))
-                        downloaded_size = 0
-                        
-                        # 写入文件
-                        with open(temp_path, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                                    downloaded_size += len(chunk)
-                                    
-                                    # 计算进度百分比
-                                    percentage = int(downloaded_size * 100 / total_size) if total_size > 0 else 0
-                                    
-                                    # 调用进度回调
-                                    if progress_callback:
-                                        progress_info = {
-                                            'downloaded': downloaded_size,
-                                            'total': total_size,
-                                            'percentage': percentage
-                                        }
-                                        progress_callback(progress_info)
-                        
-                        # 下载完成后重命名文件
-                        os.rename(temp_path, local_path)
-                        logging.info(f"Python {version} 从官网下载完成: {local_path}")
-                        return local_path
-                        
-                except Exception as e2:
-                    logging.error(f"从Python官网下载失败: {str(e2)}")
-                    # 清理临时文件
-                    if os.path.exists(temp_path):
-                        try:
-                            os.remove(temp_path)
-                        except:
-                            pass
-            
+            except DownloadCancelled:
+                # 取消不是镜像的问题，不记录失败；临时文件由下载器按keep_partial处理
+                logging.info(f"Python {version} 的下载已取消")
+                raise
+            except Exception as e:
+                logging.error(f"从{source.get('name', source_url)}下载Python {version}失败: {str(e)}")
+                self.mirror_health.record_failure(source_url)
+                # 保留临时文件和断点信息，下一个源或下次下载从断点继续
+        
+        logging.error(f"无法从任何源下载Python {version}")
+        return None
+    
+    def _get_release(self, version):
+        """去掉构建变体后缀的版本号，同一版本的各变体使用同一个安装包或源码包"""
+        parsed = PythonVersion.parse(version)
+        return parsed.release if parsed else version
+    
+    def _get_installer_name(self, version):
+        """当前平台的安装包文件名"""
+        release = self._get_release(version)
+        if sys.platform == "win32":
+            machine = platform.machine().lower()
+            if machine == "arm64":
+                return f"python-{release}-arm64.exe"
+            if machine in ("amd64", "x86_64"):
+                return f"python-{release}-amd64.exe"
+            return f"python-{release}.exe"
+        elif sys.platform == "darwin":
+            return f"python-{release}-macos11.pkg"
+        # Linux平台通常使用包管理器安装
+        return f"Python-{release}.tgz"
+    
+    def get_supported_variants(self, version):
+        """当前平台可以安装的构建变体后缀列表（含表示标准构建的空字符串）
+        
+        Windows上自由线程和调试版本是官方安装包的可选组件，官方安装包从3.14开始包含JIT；
+        其他平台从源码编译，或者安装python-build-standalone的自由线程构建。
+        """
+        parsed = PythonVersion.parse(version)
+        if parsed is None:
+            return [""]
+        variants = parsed.supported_variants()
+        if self.system == "Windows" and (parsed.major, parsed.minor) < (3, 14):
+            variants = [variant for variant in variants if variant != VARIANT_JIT]
+        return variants
+    
+    def _get_download_targets(self, candidates, version):
+        """候选源的下载目标列表 [(源, 下载地址, 下载地址中的文件名)]，跳过不提供该版本的源"""
+        targets = []
+        for source in candidates:
+            download_url = self._get_download_url(source.get("url", ""), version)
+            if download_url:
+                name = os.path.basename(urlsplit(download_url).path) or self._get_installer_name(version)
+                targets.append((source, download_url, name))
+        return targets
+    
+    def discard_partial_download(self, version):
+        """删除暂停或取消后保留的临时文件和断点信息"""
+        download_dir = self.settings["download"]["download_dir"]
+        names = {name for _, _, name in self._get_download_targets(self.get_source_candidates(), version)}
+        names.add(self._get_installer_name(version))
+        for name in names:
+            temp_path = os.path.join(download_dir, name + ".tmp")
+            DownloadState(temp_path).remove()
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    
+    def get_installer_cache(self):
+        """获取下载目录对应的安装包缓存，下载目录或大小上限变化时重新打开"""
+        download_settings = self.settings["download"]
+        cache_dir = os.path.join(download_settings["download_dir"], "installers")
+        max_size = download_settings.get("cache_max_size", DEFAULT_INSTALLER_CACHE_SIZE)
+        if self.installer_cache is None or self.installer_cache.cache_dir != cache_dir:
+            self.installer_cache = InstallerCache(cache_dir, max_size)
+        elif self.installer_cache.max_size != max_size:
+            self.installer_cache.set_max_size(max_size)
+        return self.installer_cache
+    
+    def _verify_existing_installer(self, version, local_path, verify_ssl=True):
+        """校验下载目录中已有的安装包，返回SHA-256；与摘要不一致时移入隔离目录并返回None
+        
+        优先与安装包旁的 .sha256 文件比较，没有时与发布摘要比较。
+        """
+        try:
+            digests = file_digests(local_path)
+        except OSError as e:
+            logging.error(f"读取安装包失败: {str(e)}")
+            return None
+        
+        stored = read_digest_file(local_path)
+        if stored:
+            expected = {"sha256": stored}
+        else:
+            expected = self.published_digests.get(version, os.path.basename(local_path), verify_ssl)
+        
+        mismatch = find_mismatch(expected, digests)
+        if mismatch:
+            quarantine_file(local_path, os.path.dirname(local_path),
+                            f"{mismatch} 不匹配: 期望 {expected[mismatch]}, 实际 {digests[mismatch]}")
             return None
+        return digests["sha256"]
+    
+    def _download_file(self, download_url, temp_path, verify_ssl, progress_callback=None, hasher=None,
+                       cancel_token=None):
+        """下载文件到临时路径，服务器支持时使用多连接分段下载，返回下载的字节数"""
+        download_settings = self.settings["download"]
+        downloader = SegmentedDownloader(
+            connections=download_settings.get("connections", DEFAULT_DOWNLOAD_CONNECTIONS),
+            min_segment_size=download_settings.get("min_segment_size", DEFAULT_MIN_SEGMENT_SIZE),
+            verify_ssl=verify_ssl
+        )
+        return downloader.download(download_url, temp_path, progress_callback, hasher, cancel_token)
     
     def _get_download_url(self, source_url, version):
         """根据源URL和版本号构建下载URL"""
+        # 预发布版本位于正式版本号的目录下，例如 3.13.0/python-3.13.0rc2-amd64.exe
+        parsed = PythonVersion.parse(version)
+        directory = parsed.base_version if parsed else version
+        # 各平台的安装包（Linux为源码包）与python.org的目录结构相同
+        installer_name = self._get_installer_name(version)
+        
         if "python.org" in source_url:
             # Python官网格式
-            major, minor, patch = version.split('.')
-            return f"https://www.python.org/ftp/python/{version}/python-{version}-amd64.exe"
+            return f"https://www.python.org/ftp/python/{directory}/{installer_name}"
         
         elif "huaweicloud.com" in source_url:
             # 华为云镜像格式
-            return f"https://repo.huaweicloud.com/python/{version}/python-{version}-amd64.exe"
+            return f"https://repo.huaweicloud.com/python/{directory}/{installer_name}"
         
         elif "npmmirror.com" in source_url or "taobao" in source_url:
             # 淘宝镜像格式 - 修正为正确的下载URL
-            return f"https://npmmirror.com/mirrors/python/{version}/python-{version}-amd64.exe"
+            return f"https://npmmirror.com/mirrors/python/{directory}/{installer_name}"
+        
+        elif (self.system != "Windows" or parsed is None or parsed.variant) \
+                and ("tuna.tsinghua.edu.cn" in source_url or "bfsu.edu.cn" in source_url):
+            # Miniconda镜像只提供Windows的标准构建，安装包名需要主次版本号
+            return None
         
         elif "tuna.tsinghua.edu.cn" in source_url:
             # 清华镜像格式 (使用Anaconda)
-            major, minor, _ = version.split('.')
-            return f"https://mirrors.tuna.tsinghua.edu.cn/anaconda/miniconda/Miniconda3-py{major}{minor}_23.5.2-0-Windows-x86_64.exe"
+            return f"https://mirrors.tuna.tsinghua.edu.cn/anaconda/miniconda/Miniconda3-py{parsed.major}{parsed.minor}_23.5.2-0-Windows-x86_64.exe"
         
         elif "bfsu.edu.cn" in source_url:
             # 北外镜像格式 (使用Anaconda)
-            major, minor, _ = version.split('.')
-            return f"https://mirrors.bfsu.edu.cn/anaconda/miniconda/Miniconda3-py{major}{minor}_23.5.2-0-Windows-x86_64.exe"
+            return f"https://mirrors.bfsu.edu.cn/anaconda/miniconda/Miniconda3-py{parsed.major}{parsed.minor}_23.5.2-0-Windows-x86_64.exe"
         
         else:
             # 通用格式，尝试构建URL
             base_url = source_url.rstrip('/')
-            return f"{base_url}/{version}/python-{version}-amd64.exe"
+            return f"{base_url}/{directory}/{installer_name}"
     
     def install_version(self, version, installer_path=None, silent=False):
         """安装指定版本的Python
@@ -466,8 +823,12 @@ class PythonManager:
             silent: 是否静默安装
             
         Returns:
-            安装是否成功
+            安装是否成功；Windows上等待安装程序退出后根据退出码判断
         """
+        # 预编译版本边下载边安装，不需要安装包
+        if not installer_path and self.supports_stream_install(version):
+            return self.install_standalone(version) is not None
+        
         # 如果未提供安装包路径，则下载
         if not installer_path:
             installer_path = self.download_version(version)
@@ -490,24 +851,140 @@ class PythonManager:
                 else:
                     # 交互式安装
                     install_args = [installer_path]
+                # 自由线程和调试版本是安装包中的可选组件；交互式安装时作为界面中预先勾选的选项
+                parsed = PythonVersion.parse(version)
+                if parsed and parsed.free_threaded:
+                    install_args.append("Include_freethreaded=1")
+                if parsed and parsed.debug:
+                    install_args.append("Include_debug=1")
                 
-                # 执行安装
-                subprocess.Popen(install_args)
+                # 执行安装并等待安装程序退出，队列中的下一个安装在此之后才开始；
+                # 交互式安装由用户操作向导，不设超时，以免在安装过程中被强制结束
+                result = run_command(install_args, timeout=DEFAULT_INSTALL_TIMEOUT if silent else None,
+                                     capture_output=False)
+                if result.returncode in WINDOWS_INSTALL_SUCCESS_CODES:
+                    self._invalidate_installed_versions()
+                    return True
+                if result.returncode == WINDOWS_INSTALL_CANCELLED:
+                    logging.warning(f"Python {version} 的安装已被取消")
+                else:
+                    logging.error(f"Python {version} 安装程序退出码: {result.returncode}")
+                return False
+            elif self.system == "Linux":
+                # 从源码编译安装，已有相同参数的编译产物时直接解压
+                builder = self.get_source_builder()
+                profile = self.settings.get("build", {}).get("profile", DEFAULT_BUILD_PROFILE)
+                prefix = builder.install(version, installer_path, self._get_configure_flags(), profile)
+                self._invalidate_installed_versions()
+                executable = find_python_executable(prefix)
+                if not executable:
+                    return False
+                if self.settings.get("build", {}).get("run_benchmark", True):
+                    self._benchmark_build(builder, version, executable)
                 return True
             else:
                 # 其他操作系统的安装逻辑
                 return False
+        except BuildError as e:
+            logging.error(f"编译安装Python {version}失败: {str(e)}")
+            return False
         except Exception as e:
             logging.error(f"安装Python版本失败: {str(e)}")
             return False
     
+    def supports_stream_install(self, version):
+        """当前平台和设置下是否安装预编译的独立版本（边下载边解压）"""
+        if self.system == "Windows":
+            return False
+        method = self.settings.get("build", {}).get("install_method", "auto")
+        if method == "source":
+            return False
+        if method == "standalone":
+            return True
+        verify_ssl = self.settings["download"].get("verify_ssl", True)
+        return self.standalone_index.get(version, verify_ssl) is not None
+    
+    def install_standalone(self, version, progress_callback=None, cancel_token=None):
+        """下载并解压预编译的独立版本
+        
+        Returns:
+            安装目录，失败时返回None
+            
+        Raises:
+            DownloadCancelled: 已取消
+        """
+        installer = StandaloneInstaller(index=self.standalone_index,
+                                        mirror=self.settings.get("build", {}).get("standalone_mirror", ""))
+        verify_ssl = self.settings["download"].get("verify_ssl", True)
+        try:
+            prefix = installer.install(version, verify_ssl, progress_callback, cancel_token)
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            logging.error(f"安装预编译的Python {version}失败: {str(e)}")
+            return None
+        if prefix:
+            self._invalidate_installed_versions()
+        return prefix
+    
+    def get_source_builder(self):
+        """按当前设置创建源码编译器"""
+        build_settings = self.settings.get("build", {})
+        return SourceBuilder(jobs=build_settings.get("jobs", 0),
+                             use_ccache=build_settings.get("use_ccache", True))
+    
+    def _benchmark_build(self, builder, version, executable):
+        """为编译好的解释器测速，结果写入编译信息，并与系统自带的Python 3比较"""
+        result = self.benchmark_store.benchmark(executable, force=True)
+        if result is None:
+            return
+        try:
+            builder.record_benchmark(version, result)
+        except OSError as e:
+            logging.warning(f"保存Python {version}的测速结果失败: {str(e)}")
+
+        baseline_path = self._get_system_python3()
+        if not baseline_path:
+            return
+        ratio = speedup(result, self.benchmark_store.benchmark(baseline_path))
+        if ratio is not None:
+            logging.info(f"Python {version} 的速度是系统Python ({baseline_path}) 的 {ratio:.2f} 倍")
+    
+    def _get_system_python3(self):
+        """PATH中不属于本工具安装目录的python3，用作测速比较的基准"""
+        pythons_dir = os.path.realpath(DEFAULT_PYTHONS_DIR) + os.sep
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            path = os.path.join(directory, "python3")
+            if os.path.isfile(path) and os.access(path, os.X_OK) \
+                    and not os.path.realpath(path).startswith(pythons_dir):
+                return path
+        return None
+    
+    def benchmark_interpreter(self, executable, force=False):
+        """获取解释器的测速结果 {"score", "tests", ...}，没有有效结果或force为True时运行测速"""
+        return self.benchmark_store.benchmark(executable, force)
+    
+    def get_benchmark(self, executable):
+        """获取已保存的测速结果，未测速时返回None"""
+        return self.benchmark_store.get(executable)
+    
+    def _get_configure_flags(self):
+        """设置中的configure参数，未设置时返回None使用默认参数"""
+        flags = self.settings.get("build", {}).get("configure_flags", "")
+        return shlex.split(flags) if flags.strip() else None
+    
     def uninstall_version(self, version):
         """卸载指定版本的Python"""
         try:
             if self.system == "Windows":
                 # 在Windows上使用控制面板卸载程序
-                uninstall_cmd = f"wmic product where \"name like 'Python {version}%'\" call uninstall /nointeractive"
-                subprocess.run(uninstall_cmd, shell=True)
+                uninstall_cmd = f"wmic product where \"name like 'Python {self._get_release(version)}%'\" call uninstall /nointeractive"
+                run_command(uninstall_cmd, timeout=UNINSTALL_TIMEOUT, shell=True)
+                return True
+            elif os.path.isdir(os.path.join(DEFAULT_PYTHONS_DIR, version)):
+                # 源码编译安装的版本直接删除安装目录
+                shutil.rmtree(os.path.join(DEFAULT_PYTHONS_DIR, version))
+                self._invalidate_installed_versions()
                 return True
             else:
                 # 其他操作系统的卸载逻辑
@@ -554,7 +1031,7 @@ class PythonManager:
                         )
                     except:
                         # 如果无法导入win32api，使用subprocess调用setx
-                        subprocess.run(f'setx PATH "{new_path}"', shell=True)
+                        run_command(f'setx PATH "{new_path}"', timeout=DEFAULT_PROBE_TIMEOUT, shell=True)
                     
                     return True
             else:
@@ -566,12 +1043,20 @@ class PythonManager:
     
     def _get_python_install_path(self, version):
         """获取指定版本Python的安装路径"""
+        # 优先使用搜索时记录的解释器元数据，无需再查询注册表
+        interpreter = self.get_interpreter(version)
+        if interpreter:
+            return os.path.dirname(interpreter.executable)
+        
         if self.system == "Windows":
             try:
                 import winreg
-                # 提取主要版本号 (3.9.1 -> 3.9)
+                # 提取主要版本号 (3.9.1 -> 3.9，自由线程构建 3.13.1t -> 3.13t)
                 version_parts = version.split(".")
                 major_minor = ".".join(version_parts[:2])
+                parsed = PythonVersion.parse(version)
+                if parsed and parsed.free_threaded:
+                    major_minor += VARIANT_FREE_THREADED
                 
                 with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
                                   f"SOFTWARE\\Python\\PythonCore\\{major_minor}\\InstallPath") as key:
@@ -582,116 +1067,161 @@ class PythonManager:
     
     def _version_sort_key(self, version):
         """版本排序键函数"""
-        parts = version.split('.')
-        return [int(p) if p.isdigit() else p for p in parts]
+        return version_sort_key(version)
     
     def get_current_source(self):
-        """获取当前选择的源信息"""
+        """获取当前使用的源信息（开启自动选择时为测速排名最高的源）"""
+        return self.get_source_candidates()[0]
+    
+    def get_selected_source(self):
+        """获取设置中选择的源信息"""
         source_settings = self.settings["source"]
         
         if source_settings["use_custom_source"] and source_settings["custom_source_url"]:
             return {
                 "name": "自定义源",
-                "url": source_settings["custom_source_url"]
+                "url": source_settings["custom_source_url"],
+                "kind": "python"
             }
-        else:
-            # 预定义源列表
-            sources = [
-                {"name": "Python官网", "url": "https://www.python.org/downloads/"},
-                {"name": "华为云镜像", "url": "https://repo.huaweicloud.com/python/"},
-                {"name": "淘宝镜像", "url": "https://registry.npmmirror.com/binary.html?path=python/"},
-                {"name": "清华大学镜像", "url": "https://mirrors.tuna.tsinghua.edu.cn/anaconda/archive/"},
-                {"name": "北京外国语大学镜像", "url": "https://mirrors.bfsu.edu.cn/anaconda/archive/"}
-            ]
-            
-            index = source_settings.get("selected_source_index", 0)
-            if 0 <= index < len(sources):
-                return sources[index]
-            return sources[0]  # 默认使用Python官网
-
-    def _get_versions_from_python_org(self):
-        """从Python官网获取版本列表"""
-        url = "https://www.python.org/downloads/"
-        verify_ssl = self.settings["download"].get("verify_ssl", True)
         
-        try:
-            response = requests.get(url, timeout=15, verify=verify_ssl)
-            if response.status_code == 200:
-                # 使用正则表达式提取版本号
-                version_pattern = r"Python (\d+\.\d+\.\d+)"
-                versions = re.findall(version_pattern, response.text)
-                versions = sorted(set(versions), key=lambda v: [int(x) for x in v.split('.')])
-                
-                # 移除已安装的版本
-                installed = self.get_installed_versions()
-                versions = [v for v in versions if v not in installed]
-                
-                logging.info(f"从Python官网找到 {len(versions)} 个版本")
-                return versions
-            else:
-                logging.warning(f"从Python官网获取版本列表失败，HTTP状态码: {response.status_code}")
-        except Exception as e:
-            logging.error(f"从Python官网获取版本列表失败: {str(e)}")
+        index = source_settings.get("selected_source_index", 0)
+        if 0 <= index < len(PREDEFINED_SOURCES):
+            return PREDEFINED_SOURCES[index]
+        return PREDEFINED_SOURCES[0]  # 默认使用Python官网
+    
+    def get_source_candidates(self, refresh_health=False):
+        """按优先级排列的候选源列表，前一个源失败时依次使用后面的源
         
-        # 如果获取失败，使用预定义版本列表
-        logging.info("使用预定义的Python版本列表作为备选")
-        versions = self._get_predefined_versions()
+        只包含与所选源提供相同安装包的源（kind相同）。自定义源始终排在第一位；
+        开启自动选择时其余源按测速评分排列，否则所选源排在第一位。
+        
+        Args:
+            refresh_health: 测速结果过期时在后台并发测速所有候选源，本次仍按已有结果排列，不等待测速完成
+        """
+        source_settings = self.settings["source"]
+        selected = self.get_selected_source()
+        mirrors = [source for source in PREDEFINED_SOURCES if source["kind"] == selected["kind"]]
         
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
+        if refresh_health and self.mirror_health.is_stale(
+                [source["url"] for source in mirrors],
+                source_settings.get("mirror_health_ttl", DEFAULT_HEALTH_TTL)):
+            self.refresh_mirror_health(mirrors, background=True)
         
-        return versions
+        if selected in mirrors:
+            # 所选源在评分相同或没有测速结果时优先
+            mirrors.remove(selected)
+            mirrors.insert(0, selected)
+        ranked = self.mirror_health.rank(mirrors)
+        
+        if selected not in PREDEFINED_SOURCES or not source_settings.get("auto_select_source", True):
+            return [selected] + [source for source in ranked if source is not selected]
+        return ranked
     
-    def _get_versions_from_huaweicloud(self):
-        """从华为云镜像获取版本列表"""
-        url = "https://repo.huaweicloud.com/python/"
+    def refresh_mirror_health(self, sources=None, background=False):
+        """并发测速下载源，并检查各镜像是否已同步最新版本
+        
+        Args:
+            background: 在后台线程中测速并立即返回（已有测速正在进行时不重复启动）
+        """
+        if sources is None:
+            sources = PREDEFINED_SOURCES
+        latest = self._get_latest_known_version()
+        targets = []
+        for source in sources:
+            # 只有提供Python官方安装包的镜像才检查是否已同步最新版本
+            freshness_url = self._get_download_url(source["url"], latest) \
+                if latest and source.get("kind") == "python" else None
+            targets.append((source, freshness_url))
         verify_ssl = self.settings["download"].get("verify_ssl", True)
+        if background:
+            return self.mirror_health.refresh_in_background(targets, verify_ssl=verify_ssl)
+        return self.mirror_health.probe_all(targets, verify_ssl=verify_ssl)
+    
+    def _get_latest_known_version(self):
+        """版本目录缓存中最新的正式版本号，没有缓存时返回None"""
         versions = []
+        for source in PREDEFINED_SOURCES:
+            catalog_url = self._get_catalog_url(source["url"])
+            entry = self.catalog_cache.get(catalog_url) if catalog_url else None
+            if entry:
+                versions.extend(entry.get("versions", []))
+        catalog = VersionCatalog(versions)
+        return catalog.versions[-1].text if len(catalog) else None
+
+    def _get_catalog_url(self, source_url):
+        """获取源的版本目录页面地址，使用预定义版本列表的源返回None"""
+        if "python.org" in source_url:
+            return "https://www.python.org/downloads/"
+        elif "huaweicloud.com" in source_url:
+            return "https://repo.huaweicloud.com/python/"
+        elif ("npmmirror.com" in source_url or "taobao" in source_url
+              or "tuna.tsinghua.edu.cn" in source_url or "bfsu.edu.cn" in source_url):
+            return None
+        return source_url.rstrip('/')
+    
+    def _fetch_catalog(self, url, parser, source_name, force_refresh=False):
+        """获取并解析版本目录页面，结果按源缓存
+        
+        Args:
+            url: 版本目录页面地址
+            parser: 从页面文本中解析版本列表的函数
+            source_name: 用于日志的源名称
+            force_refresh: 忽略缓存有效期，立即重新验证
+            
+        Returns:
+            解析得到的版本列表，获取失败时返回None（过期缓存由调用方在所有源都失败后使用）
+        """
+        ttl = self.settings["source"].get("catalog_ttl", DEFAULT_CATALOG_TTL)
+        entry = self.catalog_cache.get(url)
+        if entry and not force_refresh and self.catalog_cache.is_fresh(url, ttl):
+            return entry["versions"]
         
+        verify_ssl = self.settings["download"].get("verify_ssl", True)
         try:
-            response = requests.get(url, timeout=15, verify=verify_ssl)
-            if response.status_code == 200:
-                # 使用正则表达式提取版本号
-                version_pattern = r'href="(\d+\.\d+\.\d+)/'
-                versions = re.findall(version_pattern, response.text)
-                versions = sorted(set(versions), key=lambda v: [int(x) for x in v.split('.')])
-                
-                # 移除已安装的版本
-                installed = self.get_installed_versions()
-                versions = [v for v in versions if v not in installed]
-                
-                logging.info(f"从华为云镜像找到 {len(versions)} 个版本")
-                return versions
+            headers = self.catalog_cache.conditional_headers(url) if entry else {}
+            response = get_session().get(url, headers=headers, timeout=15, verify=verify_ssl)
+            
+            if response.status_code == 304 and entry:
+                # 目录未变化，只刷新有效期
+                self.catalog_cache.touch(url)
+                logging.info(f"{source_name}版本目录未变化，使用缓存的 {len(entry['versions'])} 个版本")
+                return entry["versions"]
+            elif response.status_code == 200:
+                versions = parser(response.text)
+                if versions:
+                    self.catalog_cache.put(url, versions,
+                                           etag=response.headers.get("ETag"),
+                                           last_modified=response.headers.get("Last-Modified"))
+                    logging.info(f"从{source_name}找到 {len(versions)} 个版本")
+                    return versions
             else:
-                logging.warning(f"从华为云镜像获取版本列表失败，HTTP状态码: {response.status_code}")
+                logging.warning(f"从{source_name}获取版本列表失败，HTTP状态码: {response.status_code}")
         except Exception as e:
-            logging.error(f"从华为云镜像获取版本列表失败: {str(e)}")
-        
-        # 如果获取失败，使用预定义版本列表
-        logging.info("使用预定义的Python版本列表作为备选")
-        versions = self._get_predefined_versions()
+            logging.error(f"从{source_name}获取版本列表失败: {str(e)}")
+        return None
+    
+    def _get_versions_from_python_org(self, force_refresh=False):
+        """从Python官网获取版本列表"""
+        def parse(text):
+            # 使用正则表达式提取版本号
+            versions = re.findall(r"Python (\d+\.\d+\.\d+(?:(?:a|b|rc)\d+)?)", text)
+            return list(dict.fromkeys(versions))
         
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
+        return self._fetch_catalog("https://www.python.org/downloads/", parse, "Python官网", force_refresh)
+    
+    def _get_versions_from_huaweicloud(self, force_refresh=False):
+        """从华为云镜像获取版本列表"""
+        def parse(text):
+            # 使用正则表达式提取版本号
+            versions = re.findall(r'href="(\d+\.\d+\.\d+)/', text)
+            return list(dict.fromkeys(versions))
         
-        return versions
+        return self._fetch_catalog("https://repo.huaweicloud.com/python/", parse, "华为云镜像", force_refresh)
     
     def _get_versions_from_taobao(self):
         """从淘宝镜像获取版本列表"""
-        # 淘宝镜像经常有SSL证书问题，所以默认不验证
-        verify_ssl = False
-        versions = []
-        
         # 直接使用预定义的版本列表，因为淘宝镜像API不稳定
-        logging.info("使用预定义的Python版本列表")
         versions = self._get_predefined_versions()
-        
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
-        
         logging.info(f"为淘宝镜像预设了 {len(versions)} 个Python版本")
         return versions
     
@@ -700,11 +1230,6 @@ class PythonManager:
         # 清华镜像主要提供Anaconda，不是纯Python
         # 我们返回预定义版本列表
         versions = self._get_predefined_versions()
-        
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
-        
         logging.info(f"为清华大学镜像预设了 {len(versions)} 个Python版本")
         return versions
     
@@ -713,66 +1238,34 @@ class PythonManager:
         # 北外镜像主要提供Anaconda，不是纯Python
         # 我们返回预定义版本列表
         versions = self._get_predefined_versions()
-        
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
-        
         logging.info(f"为北京外国语大学镜像预设了 {len(versions)} 个Python版本")
         return versions
     
-    def _get_versions_generic(self, url):
+    def _get_versions_generic(self, url, force_refresh=False):
         """从通用镜像源获取版本列表"""
-        verify_ssl = self.settings["download"].get("verify_ssl", True)
-        versions = []
-        
-        try:
-            base_url = url.rstrip('/')
-            response = requests.get(base_url, timeout=15, verify=verify_ssl)
+        def parse(text):
+            versions = []
+            # 从HTML中提取版本目录
+            dir_pattern = r'href="(\d+\.\d+\.\d+)/?"|href="\./(\d+\.\d+\.\d+)/?"|href="\.\./(\d+\.\d+\.\d+)/?"|href="python-(\d+\.\d+\.\d+)'
+            matches = re.findall(dir_pattern, text)
             
-            if response.status_code == 200:
-                # 从HTML中提取版本目录
-                dir_pattern = r'href="(\d+\.\d+\.\d+)/?"|href="\./(\d+\.\d+\.\d+)/?"|href="\.\./(\d+\.\d+\.\d+)/?"|href="python-(\d+\.\d+\.\d+)'
-                matches = re.findall(dir_pattern, response.text)
-                
-                # 处理匹配结果
-                for match in matches:
-                    # 找到第一个非空的组
-                    for group in match:
-                        if group:
-                            versions.append(group)
-                            break
-                
-                # 如果没有找到版本号，尝试其他格式
-                if not versions:
-                    # 尝试获取所有链接并分析
-                    link_pattern = r'href="([^"]+)"'
-                    links = re.findall(link_pattern, response.text)
-                    
-                    for link in links:
-                        version_match = re.search(r'(\d+\.\d+\.\d+)', link)
-                        if version_match:
-                            versions.append(version_match.group(1))
-                
-                versions = sorted(set(versions), key=lambda v: [int(x) for x in v.split('.')])
-                
-                # 移除已安装的版本
-                installed = self.get_installed_versions()
-                versions = [v for v in versions if v not in installed]
-                
-                logging.info(f"从通用镜像找到 {len(versions)} 个版本")
-                return versions
-            else:
-                logging.warning(f"从通用镜像获取版本列表失败，HTTP状态码: {response.status_code}")
-        except Exception as e:
-            logging.error(f"从通用镜像获取版本列表失败: {str(e)}")
-        
-        # 如果获取失败，使用预定义版本列表
-        logging.info("使用预定义的Python版本列表作为备选")
-        versions = self._get_predefined_versions()
-        
-        # 移除已安装的版本
-        installed = self.get_installed_versions()
-        versions = [v for v in versions if v not in installed]
+            # 处理匹配结果
+            for match in matches:
+                # 找到第一个非空的组
+                for group in match:
+                    if group:
+                        versions.append(group)
+                        break
+            
+            # 如果没有找到版本号，尝试其他格式
+            if not versions:
+                # 尝试获取所有链接并分析
+                links = re.findall(r'href="([^"]+)"', text)
+                for link in links:
+                    version_match = re.search(r'(\d+\.\d+\.\d+)', link)
+                    if version_match:
+                        versions.append(version_match.group(1))
+            
+            return list(dict.fromkeys(versions))
         
-        return versions 
\ No newline at end of file
+        return self._fetch_catalog(url.rstrip('/'), parse, "通用镜像", force_refresh)
@@ -0,0 +1,393 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tarfile
+import platform
+import tempfile
+
+from src.core.process_utils import run_command
+from src.core.version_catalog import (PythonVersion, split_variant, VARIANT_FREE_THREADED, VARIANT_DEBUG,
+                                      VARIANT_JIT)
+
+# 源码编译安装的Python所在目录，每个版本位于 <目录>/<版本号>
+DEFAULT_PYTHONS_DIR = os.path.join(os.path.expanduser("~"), ".pythonest", "pythons")
+
+# 编译产物缓存目录，保存已编译好的安装目录打包文件
+DEFAULT_BUILD_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pythonest", "build_cache")
+
+# configure的默认参数
+DEFAULT_CONFIGURE_FLAGS = ["--with-ensurepip=install"]
+
+# 编译配置：在DEFAULT_CONFIGURE_FLAGS之后追加的configure参数、说明以及支持的最低版本
+# optimized 启用PGO和LTO，编译时间是默认配置的数倍；native 针对本机CPU优化，编译结果不能在其他CPU上使用
+OPTIMIZED_CONFIGURE_FLAGS = ["--enable-optimizations", "--with-lto"]
+BUILD_PROFILES = {
+    "default": {"flags": [], "description": "默认配置，编译最快", "min_version": (3, 0)},
+    "optimized": {"flags": OPTIMIZED_CONFIGURE_FLAGS,
+                  "description": "PGO + LTO 优化", "min_version": (3, 0)},
+    "native": {"flags": OPTIMIZED_CONFIGURE_FLAGS + ["CFLAGS=-march=native -mtune=native"],
+               "description": "PGO + LTO，并针对本机CPU优化（不可移植）", "min_version": (3, 0)},
+    "freethreaded": {"flags": OPTIMIZED_CONFIGURE_FLAGS + ["--disable-gil"],
+                     "description": "PGO + LTO，自由线程（无GIL）", "min_version": (3, 13)},
+    "jit": {"flags": OPTIMIZED_CONFIGURE_FLAGS + ["--enable-experimental-jit"],
+            "description": "PGO + LTO，实验性JIT", "min_version": (3, 13)},
+}
+DEFAULT_BUILD_PROFILE = "default"
+
+# 版本号中的构建变体后缀对应的configure参数，例如安装 3.13.1t 时追加 --disable-gil
+VARIANT_CONFIGURE_FLAGS = {
+    VARIANT_FREE_THREADED: ["--disable-gil"],
+    VARIANT_DEBUG: ["--with-pydebug"],
+    VARIANT_JIT: ["--enable-experimental-jit"],
+}
+
+# configure、make、make install 各步骤的超时时间（秒）
+CONFIGURE_TIMEOUT = 600
+MAKE_TIMEOUT = 3 * 3600
+
+# 安装目录中记录编译信息的文件，重定位时据此找到原安装路径
+BUILD_INFO_FILE = ".pythonest-build.json"
+
+# 重定位时检查是否为文本文件所读取的字节数
+TEXT_PROBE_SIZE = 1024
+
+
+class BuildError(Exception):
+    """源码编译失败"""
+
+
+def host_cpu_model():
+    """本机CPU型号，用于区分针对本机CPU优化的编译产物"""
+    try:
+        with open("/proc/cpuinfo", 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.startswith(("model name", "Model", "cpu model")):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+def build_cache_key(version, configure_flags):
+    """编译产物的缓存键：版本号、平台和configure参数相同的编译结果可以互相替代
+
+    参数中包含 -march=native 时编译结果只适用于同型号的CPU，缓存键中同时记录CPU型号。
+    """
+    libc = "-".join(part for part in platform.libc_ver() if part) or "unknown"
+    identity = list(configure_flags)
+    if any("-march=native" in flag for flag in configure_flags):
+        identity.append(host_cpu_model())
+    flags = hashlib.sha256("\0".join(identity).encode("utf-8")).hexdigest()[:16]
+    return f"{version}-{platform.system().lower()}-{platform.machine()}-{libc}-{flags}"
+
+
+def find_python_executable(prefix):
+    """安装目录中的解释器路径，不存在时返回None
+
+    标准构建安装 bin/python3，自由线程构建只安装 bin/python3t 和 bin/python3.Xt。
+    """
+    for name in ("python3", "python3t"):
+        path = os.path.join(prefix, "bin", name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def profile_configure_flags(profile, version, configure_flags=None):
+    """组合编译配置的完整configure参数
+
+    Args:
+        profile: BUILD_PROFILES中的名称
+        version: 版本号，用于检查该配置是否支持此版本；带变体后缀时追加对应的参数
+        configure_flags: 基础参数，None表示使用DEFAULT_CONFIGURE_FLAGS
+
+    Raises:
+        BuildError: 未知的编译配置或版本过低
+    """
+    if profile not in BUILD_PROFILES:
+        raise BuildError(f"未知的编译配置: {profile}")
+    settings = BUILD_PROFILES[profile]
+    parsed = PythonVersion.parse(version)
+    if parsed is None:
+        raise BuildError(f"无效的版本号: {version}")
+    if (parsed.major, parsed.minor) < settings["min_version"]:
+        required = ".".join(str(part) for part in settings["min_version"])
+        raise BuildError(f"编译配置 {profile} 需要Python {required}及以上版本")
+    variants = split_variant(parsed.variant)
+    for variant in variants:
+        if variant not in parsed.supported_variants():
+            raise BuildError(f"Python {parsed.release} 不支持 {variant} 构建")
+
+    flags = DEFAULT_CONFIGURE_FLAGS if configure_flags is None else list(configure_flags)
+    extra = list(settings["flags"])
+    for variant in variants:
+        extra.extend(VARIANT_CONFIGURE_FLAGS[variant])
+    for flag in extra:
+        if flag not in flags:
+            flags = flags + [flag]
+    return flags
+
+
+def _safe_extract(archive, target_dir):
+    """解压tar包，拒绝指向目标目录之外的成员"""
+    if hasattr(tarfile, "data_filter"):
+        # Python 3.12+ 及打了安全补丁的版本使用内置的过滤器
+        archive.extractall(target_dir, filter="tar")
+        return
+    root = os.path.realpath(target_dir)
+    for member in archive.getmembers():
+        path = os.path.realpath(os.path.join(target_dir, member.name))
+        if path != root and not path.startswith(root + os.sep):
+            raise BuildError(f"压缩包中的文件路径无效: {member.name}")
+    archive.extractall(target_dir)
+
+
+class SourceBuilder:
+    """Linux上从源码编译安装Python
+
+    解压源码包后执行 configure、make -j<CPU核数> 和 make install，安装到独立的目录
+    <pythons_dir>/<版本号>；系统中有ccache时用它缓存编译结果。
+    安装完成的目录打包保存到编译产物缓存中，按版本号、平台和configure参数索引，
+    重新安装或其他机器共享该缓存时直接解压并重定位，无需重新编译。
+    """
+
+    def __init__(self, pythons_dir=DEFAULT_PYTHONS_DIR, cache_dir=DEFAULT_BUILD_CACHE_DIR,
+                 jobs=0, use_ccache=True):
+        self.pythons_dir = pythons_dir
+        self.cache_dir = cache_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.use_ccache = use_ccache
+
+    def get_prefix(self, version):
+        return os.path.join(self.pythons_dir, version)
+
+    def get_cached_archive(self, version, configure_flags=None, profile=DEFAULT_BUILD_PROFILE):
+        """已缓存的编译产物路径，不存在时返回None"""
+        flags = profile_configure_flags(profile, version, configure_flags)
+        path = os.path.join(self.cache_dir, build_cache_key(version, flags) + ".tar.gz")
+        return path if os.path.exists(path) else None
+
+    def install(self, version, source_archive, configure_flags=None, profile=DEFAULT_BUILD_PROFILE):
+        """编译或从缓存安装指定版本
+
+        Args:
+            version: 版本号
+            source_archive: 源码包 Python-X.Y.Z.tgz 的路径，编译产物缓存命中时不使用
+            configure_flags: configure参数列表，None表示使用DEFAULT_CONFIGURE_FLAGS
+            profile: 编译配置名称，其参数追加在configure_flags之后
+
+        Returns:
+            安装目录
+
+        Raises:
+            BuildError: 编译或安装失败
+        """
+        flags = profile_configure_flags(profile, version, configure_flags)
+        prefix = self.get_prefix(version)
+        cached = self.get_cached_archive(version, flags)
+        if cached:
+            try:
+                self._extract_artifact(cached, prefix)
+                logging.info(f"从编译产物缓存安装Python {version}: {prefix}")
+                return prefix
+            except Exception as e:
+                logging.warning(f"编译产物缓存 {cached} 无法使用，重新编译: {str(e)}")
+                try:
+                    os.remove(cached)
+                except OSError:
+                    pass
+
+        if not source_archive or not os.path.exists(source_archive):
+            raise BuildError(f"没有找到Python {version}的源码包")
+        if not (shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")):
+            raise BuildError("没有找到C编译器，请先安装 gcc 或 clang 以及 make")
+
+        start = time.monotonic()
+        # 编译安装到暂存目录，成功后才替换已有的安装，失败时原来的解释器和依赖它的虚拟环境不受影响
+        staging = f"{prefix}.{os.getpid()}.staging"
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            with tempfile.TemporaryDirectory(prefix=f"pythonest-build-{version}-") as work_dir:
+                source_dir = self._extract_source(source_archive, work_dir)
+                staged = self._build(source_dir, prefix, flags, staging)
+            self._write_build_info(staged, prefix, version, flags, profile)
+            _replace_dir(staged, prefix)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        logging.info(f"Python {version} ({profile}) 编译安装完成，用时 {time.monotonic() - start:.0f} 秒: {prefix}")
+
+        try:
+            self._store_artifact(prefix, build_cache_key(version, flags))
+        except Exception as e:
+            logging.warning(f"保存编译产物缓存失败: {str(e)}")
+        return prefix
+
+    def _extract_source(self, source_archive, work_dir):
+        with tarfile.open(source_archive, "r:*") as archive:
+            _safe_extract(archive, work_dir)
+        entries = [os.path.join(work_dir, name) for name in os.listdir(work_dir)]
+        directories = [path for path in entries if os.path.isfile(os.path.join(path, "configure"))]
+        if not directories:
+            raise BuildError(f"源码包中没有configure脚本: {source_archive}")
+        return directories[0]
+
+    def _build_env(self):
+        env = dict(os.environ)
+        ccache = shutil.which("ccache") if self.use_ccache else None
+        if ccache:
+            env["CC"] = f"{ccache} {env.get('CC', 'cc')}"
+            logging.info("使用ccache缓存编译结果")
+        return env
+
+    def _run_step(self, name, cmd, cwd, env, timeout):
+        logging.info(f"{name}: {' '.join(cmd)}")
+        try:
+            result = run_command(cmd, timeout=timeout, cwd=cwd, env=env)
+        except Exception as e:
+            raise BuildError(f"{name}失败: {str(e)}")
+        if result.returncode != 0:
+            # 错误信息通常在输出的末尾
+            output = (result.stderr or result.stdout or "").strip().splitlines()
+            raise BuildError(f"{name}失败 (返回码 {result.returncode}): " + "\n".join(output[-20:]))
+
+    def _build(self, source_dir, prefix, configure_flags, staging):
+        """以prefix为安装路径编译，通过 make install DESTDIR=staging 安装到暂存目录
+
+        Returns:
+            暂存目录中对应prefix的目录
+        """
+        env = self._build_env()
+        self._run_step("配置", ["./configure", f"--prefix={prefix}"] + configure_flags,
+                       source_dir, env, CONFIGURE_TIMEOUT)
+        self._run_step("编译", ["make", f"-j{self.jobs}"], source_dir, env, MAKE_TIMEOUT)
+        self._run_step("安装", ["make", "install", f"DESTDIR={staging}"], source_dir, env, MAKE_TIMEOUT)
+        staged = os.path.join(staging, os.path.abspath(prefix).lstrip(os.sep))
+        if not os.path.isdir(staged):
+            raise BuildError(f"make install 没有生成安装目录: {staged}")
+        return staged
+
+    def _write_build_info(self, target_dir, prefix, version, configure_flags, profile):
+        info = {
+            "version": version,
+            "prefix": prefix,
+            "profile": profile,
+            "configure_flags": configure_flags,
+            "built_at": time.time()
+        }
+        with open(os.path.join(target_dir, BUILD_INFO_FILE), 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=1)
+
+    def read_build_info(self, version):
+        """读取已安装版本的编译信息，不是源码编译安装的版本返回None"""
+        try:
+            with open(os.path.join(self.get_prefix(version), BUILD_INFO_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def record_benchmark(self, version, result):
+        """将测速结果写入安装目录的编译信息，与编译参数放在一起便于比较不同配置"""
+        info = self.read_build_info(version)
+        if info is None:
+            return
+        info["benchmark"] = result
+        path = os.path.join(self.get_prefix(version), BUILD_INFO_FILE)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=1)
+        os.replace(temp_file, path)
+
+    def _store_artifact(self, prefix, key):
+        """将安装目录打包保存到编译产物缓存"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = os.path.join(self.cache_dir, key + ".tar.gz")
+        temp_file = f"{target}.{os.getpid()}.tmp"
+        try:
+            with tarfile.open(temp_file, "w:gz") as archive:
+                archive.add(prefix, arcname=".")
+            os.replace(temp_file, target)
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        logging.info(f"已保存编译产物缓存: {target}")
+
+    def _extract_artifact(self, archive_path, prefix):
+        """解压编译产物到安装目录，安装路径与编译时不同时重写其中记录的路径"""
+        temp_prefix = f"{prefix}.{os.getpid()}.tmp"
+        shutil.rmtree(temp_prefix, ignore_errors=True)
+        os.makedirs(temp_prefix)
+        try:
+            with tarfile.open(archive_path, "r:*") as archive:
+                _safe_extract(archive, temp_prefix)
+            with open(os.path.join(temp_prefix, BUILD_INFO_FILE), 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            if info["prefix"] != prefix:
+                relocate(temp_prefix, info["prefix"], prefix)
+                info["prefix"] = prefix
+                with open(os.path.join(temp_prefix, BUILD_INFO_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(info, f, indent=1)
+            _replace_dir(temp_prefix, prefix)
+        except BaseException:
+            shutil.rmtree(temp_prefix, ignore_errors=True)
+            raise
+
+    def clear_cache(self):
+        """删除全部编译产物缓存"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def _replace_dir(source, prefix):
+    """用source目录替换prefix，先把旧的安装移开再替换，两次重命名都在同一文件系统内完成"""
+    backup = None
+    if os.path.exists(prefix):
+        backup = f"{prefix}.{os.getpid()}.old"
+        shutil.rmtree(backup, ignore_errors=True)
+        os.replace(prefix, backup)
+    try:
+        os.replace(source, prefix)
+    except BaseException:
+        if backup:
+            os.replace(backup, prefix)
+        raise
+    if backup:
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def relocate(root, old_prefix, new_prefix):
+    """将安装目录中文本文件记录的原安装路径替换为新路径
+
+    解释器本身根据可执行文件的位置确定安装目录，需要处理的是脚本的 #! 行、
+    python3-config、_sysconfigdata 和 Makefile 等记录了编译时路径的文本文件。
+    """
+    old = old_prefix.encode("utf-8")
+    new = new_prefix.encode("utf-8")
+    pattern = re.compile(re.escape(old) + rb"(?=[/\s\"':]|$)", re.MULTILINE)
+    count = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if os.path.islink(path) or name.endswith((".pyc", ".so", ".a", ".o")):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    head = f.read(TEXT_PROBE_SIZE)
+                    if b"\0" in head:
+                        continue
+                    data = head + f.read()
+            except OSError:
+                continue
+            if old not in data:
+                continue
+            mode = os.stat(path).st_mode
+            with open(path, 'wb') as f:
+                f.write(pattern.sub(new, data))
+            os.chmod(path, mode)
+            count += 1
+    logging.info(f"重定位 {old_prefix} -> {new_prefix}: 更新了 {count} 个文件")
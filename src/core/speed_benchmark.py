@@ -0,0 +1,207 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+
+from src.core.process_utils import run_command
+
+# 测速脚本的超时时间（秒）
+BENCHMARK_TIMEOUT = 180
+
+# 每项测试重复的次数，取最快一次以减少系统负载带来的波动
+BENCHMARK_REPEATS = 3
+
+# 在被测解释器中运行的测速脚本，只使用内置功能，兼容 Python 3.4 及之后的版本
+# 各项测试覆盖函数调用、循环、字典、字符串、浮点运算、对象属性和排序，输出每项最快一次的用时（秒）
+BENCHMARK_SCRIPT = r"""
+import sys, json, time
+clock = getattr(time, "perf_counter", time.time)
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+def bench_calls():
+    fib(25)
+
+def bench_loops():
+    total = 0
+    for i in range(400000):
+        total += i * i % 7
+
+def bench_dict():
+    d = {}
+    for i in range(150000):
+        d["k%d" % (i % 5000)] = i
+    for i in range(150000):
+        d.get("k%d" % (i % 7000))
+
+def bench_str():
+    for i in range(20000):
+        s = "-".join(["abc", str(i), "xyz"]) * 3
+        s.upper().split("-")
+        s.replace("abc", "d").find("xyz")
+
+def bench_float():
+    x, y, vx, vy = 0.1, 0.2, 0.3, 0.4
+    for i in range(200000):
+        d = (x * x + y * y) ** 0.5 + 0.01
+        vx -= x / (d * d * d) * 0.001
+        vy -= y / (d * d * d) * 0.001
+        x += vx * 0.01
+        y += vy * 0.01
+
+class Point(object):
+    __slots__ = ("x", "y")
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+    def moved(self, dx):
+        return Point(self.x + dx, self.y)
+
+def bench_objects():
+    p = Point(0, 0)
+    for i in range(150000):
+        p = p.moved(1)
+
+def bench_sort():
+    seed = 12345
+    values = []
+    for i in range(60000):
+        seed = (seed * 1103515245 + 12345) % 2147483648
+        values.append(seed)
+    sorted(values)
+    sorted(values, key=lambda v: -v)
+
+tests = {}
+repeats = int(sys.argv[1])
+for name, func in sorted(globals().items()):
+    if name.startswith("bench_"):
+        best = None
+        for _ in range(repeats):
+            start = clock()
+            func()
+            elapsed = clock() - start
+            best = elapsed if best is None or elapsed < best else best
+        tests[name[6:]] = best
+print(json.dumps({"version": "%d.%d.%d" % sys.version_info[:3], "tests": tests}))
+"""
+
+
+def compute_score(tests):
+    """根据各项用时计算速度评分：用时几何平均数的倒数乘以1000，分数越高越快"""
+    times = [max(value, 1e-9) for value in tests.values()]
+    if not times:
+        return 0.0
+    mean = math.exp(sum(math.log(value) for value in times) / len(times))
+    return round(1000.0 / mean, 1)
+
+
+def run_benchmark(executable, repeats=BENCHMARK_REPEATS, timeout=BENCHMARK_TIMEOUT):
+    """用指定的解释器运行测速脚本
+
+    以隔离模式 (-I) 运行，不加载site以排除第三方包的影响。同一台机器上不同解释器的分数可以直接比较。
+
+    Returns:
+        {"score", "tests", "version", "benchmarked_at"}，运行失败时返回None
+    """
+    start = time.monotonic()
+    try:
+        result = run_command([executable, "-I", "-S", "-c", BENCHMARK_SCRIPT, str(repeats)], timeout=timeout)
+    except Exception as e:
+        logging.warning(f"解释器 {executable} 测速失败: {str(e)}")
+        return None
+    if result.returncode != 0:
+        logging.warning(f"解释器 {executable} 测速失败: {(result.stderr or '').strip()[-500:]}")
+        return None
+    try:
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        logging.warning(f"解释器 {executable} 的测速结果无法解析: {result.stdout[-200:]}")
+        return None
+    data["score"] = compute_score(data.get("tests", {}))
+    data["benchmarked_at"] = time.time()
+    logging.info(f"解释器 {executable} 测速完成，评分 {data['score']}，用时 {time.monotonic() - start:.1f} 秒")
+    return data
+
+
+class BenchmarkStore:
+    """解释器测速结果的持久化存储
+
+    以解释器的真实路径为键，同时记录文件大小和修改时间，解释器被替换或重新编译后旧的结果自动失效。
+    """
+
+    def __init__(self, store_file=None):
+        if store_file is None:
+            store_file = os.path.join(os.path.expanduser("~"), ".pythonest", "benchmarks.json")
+        self.store_file = store_file
+        self._lock = threading.Lock()
+        self._results = self._load()
+
+    def _load(self):
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"读取测速结果失败: {str(e)}")
+        return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.store_file), exist_ok=True)
+            temp_file = f"{self.store_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._results, f, indent=1)
+            os.replace(temp_file, self.store_file)
+        except Exception as e:
+            logging.error(f"保存测速结果失败: {str(e)}")
+
+    @staticmethod
+    def _identity(executable):
+        path = os.path.realpath(executable)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+        return path, [stat.st_size, stat.st_mtime]
+
+    def get(self, executable):
+        """获取解释器的测速结果，没有结果或解释器已变化时返回None"""
+        path, stamp = self._identity(executable)
+        with self._lock:
+            entry = self._results.get(path)
+        if not entry or stamp is None or entry.get("stamp") != stamp:
+            return None
+        return entry["result"]
+
+    def put(self, executable, result):
+        path, stamp = self._identity(executable)
+        if stamp is None:
+            return
+        with self._lock:
+            self._results[path] = {"stamp": stamp, "result": result}
+            self._save()
+
+    def benchmark(self, executable, force=False):
+        """获取测速结果，没有有效结果或force为True时重新测速"""
+        if not force:
+            cached = self.get(executable)
+            if cached is not None:
+                return cached
+        result = run_benchmark(executable)
+        if result is not None:
+            self.put(executable, result)
+        return result
+
+
+def speedup(result, baseline):
+    """result相对于baseline的速度倍数，任一结果无效时返回None"""
+    if not result or not baseline or not baseline.get("score"):
+        return None
+    return round(result["score"] / baseline["score"], 3)
+
@@ -0,0 +1,282 @@
+import io
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tarfile
+import platform
+import threading
+
+from src.core.http_session import get_session
+from src.core.downloader import DEFAULT_HEADERS, DOWNLOAD_TIMEOUT
+from src.core.source_builder import DEFAULT_PYTHONS_DIR
+from src.core.version_catalog import VARIANT_FREE_THREADED
+
+try:
+    import zstandard
+except ImportError:
+    # 未安装zstandard时只使用 .tar.gz 格式的压缩包
+    zstandard = None
+
+# python-build-standalone 的发布列表
+STANDALONE_RELEASES_API = "https://api.github.com/repos/astral-sh/python-build-standalone/releases"
+
+# 读取发布列表的页数（每页STANDALONE_RELEASES_PER_PAGE个发布），覆盖较早的版本
+STANDALONE_RELEASES_PAGES = 3
+STANDALONE_RELEASES_PER_PAGE = 30
+
+# 发布列表缓存的有效期（秒）
+DEFAULT_STANDALONE_INDEX_TTL = 24 * 3600
+
+# 从响应中读取数据的缓冲区大小（字节）
+STREAM_BUFFER_SIZE = 1024 * 1024
+
+# 安装包文件名，例如 cpython-3.12.7+20241016-x86_64-unknown-linux-gnu-install_only_stripped.tar.gz，
+# 自由线程构建为 cpython-3.13.1+20250115-x86_64-unknown-linux-gnu-freethreaded-install_only.tar.gz
+STANDALONE_ASSET_PATTERN = re.compile(
+    r"^cpython-(\d+\.\d+\.\d+(?:(?:a|b|rc)\d+)?)\+(\d+)-(.+?)(-freethreaded)?-install_only(_stripped)?\.tar\.(gz|zst)$")
+
+
+def host_triple():
+    """当前平台在 python-build-standalone 中的目标名称，不支持的平台返回None"""
+    machine = platform.machine().lower()
+    arch = {"amd64": "x86_64", "x86_64": "x86_64", "arm64": "aarch64", "aarch64": "aarch64"}.get(machine)
+    if arch is None:
+        return None
+    system = platform.system()
+    if system == "Linux":
+        libc = "gnu" if platform.libc_ver()[0] == "glibc" else "musl"
+        return f"{arch}-unknown-linux-{libc}"
+    if system == "Darwin":
+        return f"{arch}-apple-darwin"
+    if system == "Windows":
+        return f"{arch}-pc-windows-msvc"
+    return None
+
+
+class StandaloneIndex:
+    """python-build-standalone 各版本在当前平台的下载地址
+
+    从GitHub发布列表中为每个版本选出最新一次发布的 install_only 压缩包（优先去除调试符号的版本），
+    自由线程构建以 3.13.1t 形式的版本号记录。结果缓存在磁盘上。
+    """
+
+    def __init__(self, cache_file=None, triple=None):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser("~"), ".pythonest", "standalone_index.json")
+        self.cache_file = cache_file
+        self.triple = triple or host_triple()
+        self._lock = threading.Lock()
+        self._index = self._read_file()
+
+    def _read_file(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("triple") == self.triple and isinstance(data.get("versions"), dict):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"读取独立版本列表缓存失败: {str(e)}")
+        return {"triple": self.triple, "fetched_at": 0, "versions": {}}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, indent=1)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logging.error(f"保存独立版本列表缓存失败: {str(e)}")
+
+    def get(self, version, verify_ssl=True, ttl=DEFAULT_STANDALONE_INDEX_TTL):
+        """获取版本的下载信息 {"url", "name", "sha256"}，没有该版本时返回None"""
+        with self._lock:
+            entry = self._index["versions"].get(version)
+            fresh = time.time() - self._index.get("fetched_at", 0) < ttl
+        if entry is None and not fresh:
+            self.refresh(verify_ssl)
+            with self._lock:
+                entry = self._index["versions"].get(version)
+        return dict(entry) if entry else None
+
+    def refresh(self, verify_ssl=True):
+        """重新读取发布列表"""
+        if not self.triple:
+            return
+        versions = {}
+        session = get_session()
+        try:
+            for page in range(1, STANDALONE_RELEASES_PAGES + 1):
+                response = session.get(STANDALONE_RELEASES_API, timeout=15, verify=verify_ssl,
+                                       params={"per_page": STANDALONE_RELEASES_PER_PAGE, "page": page})
+                response.raise_for_status()
+                releases = response.json()
+                for release in releases:
+                    for asset in release.get("assets", []):
+                        self._add_asset(versions, asset)
+                if len(releases) < STANDALONE_RELEASES_PER_PAGE:
+                    break
+        except Exception as e:
+            logging.warning(f"获取python-build-standalone发布列表失败: {str(e)}")
+            if not versions:
+                return
+
+        with self._lock:
+            self._index = {"triple": self.triple, "fetched_at": time.time(), "versions": versions}
+            self._save()
+        logging.info(f"python-build-standalone 提供 {len(versions)} 个 {self.triple} 版本")
+
+    def _add_asset(self, versions, asset):
+        match = STANDALONE_ASSET_PATTERN.match(asset.get("name", ""))
+        if not match or match.group(3) != self.triple:
+            return
+        version, tag, _, free_threaded, stripped, compression = match.groups()
+        if free_threaded:
+            version += VARIANT_FREE_THREADED
+        if compression == "zst" and zstandard is None:
+            return
+        # 同一版本取最新的发布，同一发布中优先去除调试符号的版本
+        rank = (int(tag), bool(stripped), compression == "gz")
+        current = versions.get(version)
+        if current and tuple(current["rank"]) >= rank:
+            return
+        digest = asset.get("digest") or ""
+        versions[version] = {
+            "url": asset.get("browser_download_url"),
+            "name": asset["name"],
+            "size": asset.get("size", 0),
+            "sha256": digest[7:] if digest.startswith("sha256:") else None,
+            "rank": list(rank)
+        }
+
+
+class _ResponseReader(io.RawIOBase):
+    """从响应中读取数据，同时计算摘要、报告进度并检查取消"""
+
+    def __init__(self, raw, total, progress_callback=None, cancel_token=None):
+        self.raw = raw
+        self.total = total
+        self.downloaded = 0
+        self.sha256 = hashlib.sha256()
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+        count = self.raw.readinto(buffer)
+        if count:
+            self.sha256.update(memoryview(buffer)[:count])
+            self.downloaded += count
+            if self.progress_callback:
+                self.progress_callback({
+                    'downloaded': self.downloaded,
+                    'total': self.total,
+                    'percentage': int(self.downloaded * 100 / self.total) if self.total > 0 else 0
+                })
+        return count
+
+
+def stream_install(url, prefix, expected_sha256=None, verify_ssl=True, progress_callback=None,
+                   cancel_token=None, session=None):
+    """边下载边解压独立版本压缩包，完成后原子地移动到安装目录
+
+    压缩包中的 python/ 目录解压到安装目录旁的临时目录，下载和解压同时进行，不在磁盘上保存压缩包。
+    全部数据校验通过后才替换安装目录，失败或取消时删除临时目录，已有的安装不受影响。
+
+    Returns:
+        压缩包的SHA-256
+
+    Raises:
+        ValueError: 摘要不匹配或压缩包内容无效
+        DownloadCancelled: 已取消
+    """
+    session = session if session is not None else get_session()
+    parent = os.path.dirname(prefix)
+    os.makedirs(parent, exist_ok=True)
+    staging = f"{prefix}.{os.getpid()}.staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    try:
+        with session.get(url, stream=True, headers=DEFAULT_HEADERS,
+                         timeout=DOWNLOAD_TIMEOUT, verify=verify_ssl) as response:
+            response.raise_for_status()
+            total = int(response.headers.get("Content-Length", 0))
+            reader = _ResponseReader(response.raw, total, progress_callback, cancel_token)
+            stream = io.BufferedReader(reader, buffer_size=STREAM_BUFFER_SIZE)
+            if url.endswith(".zst"):
+                stream = zstandard.ZstdDecompressor().stream_reader(stream)
+                archive = tarfile.open(fileobj=stream, mode="r|")
+            else:
+                archive = tarfile.open(fileobj=stream, mode="r|gz")
+            with archive:
+                if hasattr(tarfile, "data_filter"):
+                    archive.extractall(staging, filter="tar")
+                else:
+                    archive.extractall(staging)
+            # 读完压缩包末尾的填充数据，保证摘要覆盖完整文件
+            remainder = bytearray(STREAM_BUFFER_SIZE)
+            while reader.readinto(remainder):
+                pass
+
+        digest = reader.sha256.hexdigest()
+        if expected_sha256 and digest != expected_sha256.lower():
+            raise ValueError(f"sha256 不匹配: 期望 {expected_sha256}, 实际 {digest}")
+        source = os.path.join(staging, "python")
+        if not os.path.isdir(source):
+            raise ValueError("压缩包中没有 python 目录")
+
+        # 先把旧的安装移开再替换，两次重命名都在同一文件系统内完成
+        backup = None
+        if os.path.exists(prefix):
+            backup = f"{prefix}.{os.getpid()}.old"
+            os.replace(prefix, backup)
+        os.replace(source, prefix)
+        if backup:
+            shutil.rmtree(backup, ignore_errors=True)
+        return digest
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+class StandaloneInstaller:
+    """安装 python-build-standalone 提供的预编译可重定位解释器
+
+    安装到与源码编译相同的 <pythons_dir>/<版本号> 目录，两种方式安装的解释器用同样的方式发现和卸载。
+    mirror不为空时替换下载地址中的 https://github.com 前缀，以便使用GitHub的镜像或代理。
+    """
+
+    def __init__(self, pythons_dir=DEFAULT_PYTHONS_DIR, index=None, mirror=""):
+        self.pythons_dir = pythons_dir
+        self.index = index if index is not None else StandaloneIndex()
+        self.mirror = mirror.rstrip('/')
+
+    def is_available(self, version, verify_ssl=True):
+        return self.index.get(version, verify_ssl) is not None
+
+    def install(self, version, verify_ssl=True, progress_callback=None, cancel_token=None):
+        """下载并安装指定版本，返回安装目录；没有当前平台的预编译版本时返回None"""
+        entry = self.index.get(version, verify_ssl)
+        if entry is None:
+            logging.info(f"python-build-standalone 没有 Python {version} 的 {self.index.triple} 版本")
+            return None
+        url = entry["url"]
+        if self.mirror and url.startswith("https://github.com"):
+            url = self.mirror + url[len("https://github.com"):]
+
+        prefix = os.path.join(self.pythons_dir, version)
+        start = time.monotonic()
+        logging.info(f"开始下载并解压 {entry['name']} 到 {prefix}")
+        stream_install(url, prefix, entry.get("sha256"), verify_ssl, progress_callback, cancel_token)
+        logging.info(f"Python {version} 安装完成，用时 {time.monotonic() - start:.1f} 秒: {prefix}")
+        return prefix
@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 重新统计虚拟环境大小和包数量时使用的线程数
+VENV_SCAN_WORKERS = 8
+
+# 已安装包的元数据，例如 requests-2.31.0.dist-info、six-1.16.0-py3.8.egg-info、foo-1.0-py3.8.egg、foo.egg-link
+PACKAGE_METADATA_PATTERN = re.compile(r"\.(dist-info|egg-info|egg|egg-link)$")
+
+
+def read_pyvenv_cfg(venv_path):
+    """读取 pyvenv.cfg 中的键值对，文件不存在时返回空字典"""
+    values = {}
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), 'r', encoding='utf-8') as f:
+            for line in f:
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    values[key.strip().lower()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+
+def venv_site_packages(venv_path):
+    """虚拟环境的site-packages目录，不存在时返回None
+
+    Windows为 Lib/site-packages，其他系统为 lib/pythonX.Y[t]/site-packages。
+    """
+    windows_path = os.path.join(venv_path, "Lib", "site-packages")
+    if os.path.isdir(windows_path):
+        return windows_path
+    try:
+        names = sorted(os.listdir(os.path.join(venv_path, "lib")), reverse=True)
+    except OSError:
+        return None
+    for name in names:
+        if name.startswith("python"):
+            path = os.path.join(venv_path, "lib", name, "site-packages")
+            if os.path.isdir(path):
+                return path
+    return None
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _directory_size(path):
+    """目录下全部文件的大小之和（字节），不跟随符号链接"""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def _count_packages(site_packages):
+    if not site_packages:
+        return 0
+    try:
+        return sum(1 for name in os.listdir(site_packages) if PACKAGE_METADATA_PATTERN.search(name))
+    except OSError:
+        return 0
+
+
+class VenvIndex:
+    """虚拟环境元数据的持久化索引
+
+    记录每个虚拟环境的名称、基础解释器版本（来自 pyvenv.cfg）、创建和最近使用时间、
+    占用空间和已安装包数量，列出虚拟环境时无需遍历目录或启动pip。
+    VenvManager在创建、删除虚拟环境和安装、卸载包后更新对应条目；
+    在VenvManager之外发生的变化通过比较虚拟环境目录和site-packages目录的修改时间发现，
+    只重新统计发生变化的条目。
+    """
+
+    def __init__(self, base_dir, index_file=None):
+        if index_file is None:
+            index_file = os.path.join(os.path.expanduser("~"), ".pythonest", "venv_index.json")
+        self.base_dir = base_dir
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("base_dir") == self.base_dir and isinstance(data.get("venvs"), dict):
+                return data["venvs"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"读取虚拟环境索引失败: {str(e)}")
+        return {}
+
+    def _save(self):
+        """调用方需持有self._lock"""
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            temp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"base_dir": self.base_dir, "venvs": self._entries}, f, indent=1)
+            os.replace(temp_file, self.index_file)
+        except Exception as e:
+            logging.error(f"保存虚拟环境索引失败: {str(e)}")
+
+    def _scan(self, name, previous=None):
+        """统计单个虚拟环境的元数据，不是有效的虚拟环境时返回None"""
+        path = os.path.join(self.base_dir, name)
+        cfg = read_pyvenv_cfg(path)
+        if not cfg:
+            return None
+        site_packages = venv_site_packages(path)
+        previous = previous or {}
+        now = time.time()
+        return {
+            "name": name,
+            "python_version": cfg.get("version_info") or cfg.get("version", ""),
+            "home": cfg.get("home", ""),
+            "created_at": previous.get("created_at") or _mtime(os.path.join(path, "pyvenv.cfg")) or now,
+            # 在VenvManager之外创建或从未使用过的虚拟环境没有最近使用时间
+            "last_used": previous.get("last_used"),
+            "size": _directory_size(path),
+            "package_count": _count_packages(site_packages),
+            "mtime": _mtime(path),
+            "site_packages": site_packages,
+            "site_mtime": _mtime(site_packages) if site_packages else None
+        }
+
+    def _is_stale(self, name, entry):
+        """目录或site-packages的修改时间与记录不同时需要重新统计"""
+        path = os.path.join(self.base_dir, name)
+        if _mtime(path) != entry.get("mtime"):
+            return True
+        site_packages = entry.get("site_packages") or venv_site_packages(path)
+        return (_mtime(site_packages) if site_packages else None) != entry.get("site_mtime")
+
+    def reconcile(self):
+        """与磁盘上的虚拟环境目录同步：移除已删除的条目，并行统计新增和发生变化的条目
+
+        Returns:
+            重新统计的虚拟环境数量
+        """
+        try:
+            names = [entry.name for entry in os.scandir(self.base_dir) if entry.is_dir()]
+        except OSError:
+            names = []
+
+        with self._lock:
+            entries = dict(self._entries)
+        removed = [name for name in entries if name not in names]
+        changed = [name for name in names if name not in entries or self._is_stale(name, entries[name])]
+        if not removed and not changed:
+            return 0
+
+        start = time.monotonic()
+        if changed:
+            workers = min(VENV_SCAN_WORKERS, len(changed))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="venv-scan") as executor:
+                results = list(executor.map(lambda name: self._scan(name, entries.get(name)), changed))
+        else:
+            results = []
+
+        with self._lock:
+            for name in removed:
+                self._entries.pop(name, None)
+            for name, entry in zip(changed, results):
+                if entry is None:
+                    self._entries.pop(name, None)
+                else:
+                    self._entries[name] = entry
+            self._save()
+        logging.info(f"虚拟环境索引已同步: 更新 {len(changed)} 个，移除 {len(removed)} 个，"
+                     f"用时 {(time.monotonic() - start) * 1000:.0f} ms")
+        return len(changed)
+
+    def refresh(self, name):
+        """单个虚拟环境的修改时间与记录不同时重新统计，目录已删除时移除条目
+
+        Returns:
+            最新的元数据，不存在时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+        if not os.path.isdir(os.path.join(self.base_dir, name)):
+            if entry is not None:
+                self.remove(name)
+            return None
+        if entry is None or self._is_stale(name, entry):
+            return self.update(name, used=False)
+        return dict(entry)
+
+    def update(self, name, used=True):
+        """重新统计单个虚拟环境，used为True时同时更新最近使用时间"""
+        with self._lock:
+            previous = self._entries.get(name)
+        entry = self._scan(name, previous)
+        with self._lock:
+            if entry is None:
+                self._entries.pop(name, None)
+            else:
+                if used:
+                    entry["last_used"] = time.time()
+                self._entries[name] = entry
+            self._save()
+        return dict(entry) if entry else None
+
+    def touch(self, name):
+        """只更新最近使用时间"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry["last_used"] = time.time()
+            self._save()
+
+    def remove(self, name):
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def get(self, name):
+        """获取虚拟环境的元数据，不存在时返回None"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return dict(entry) if entry else None
+
+    def get_all(self):
+        """全部虚拟环境的元数据，按名称排序"""
+        with self._lock:
+            return [dict(self._entries[name]) for name in sorted(self._entries)]
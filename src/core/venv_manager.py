@@ -1,14 +1,19 @@
 import os
 import sys
-import subprocess
 import platform
 import re
-from pathlib import Path
+import logging
+
+from src.core.process_utils import run_command, DEFAULT_QUERY_TIMEOUT, DEFAULT_INSTALL_TIMEOUT
+from src.core.version_catalog import PythonVersion
+from src.core.venv_index import VenvIndex
+from src.core.package_metadata import find_site_packages, read_installed_packages, read_many
 
 class VenvManager:
     def __init__(self):
         self.system = platform.system()
         self.venv_base_dir = self._get_venv_base_dir()
+        self.index = VenvIndex(self.venv_base_dir)
     
     def _get_venv_base_dir(self):
         """获取存储虚拟环境的基础目录"""
@@ -19,37 +24,41 @@ class VenvManager:
     
     def get_venvs(self):
         """获取已创建的虚拟环境列表"""
-        venvs = []
+        return [info["name"] for info in self.get_venvs_info()]
+    
+    def get_venvs_info(self):
+        """获取全部虚拟环境的元数据，按名称排序
+        
+        每次调用都与磁盘同步索引：只比较目录的修改时间，在应用之外创建、删除或修改的虚拟环境
+        会被发现，只有发生变化的条目才重新统计。
         
+        返回:
+            字典列表，包含 name、python_version、created_at、last_used、size、package_count 等键
+        """
         try:
             # 确保基础目录存在
             os.makedirs(self.venv_base_dir, exist_ok=True)
-            
-            # 列出基础目录下的所有子目录
-            for entry in os.listdir(self.venv_base_dir):
-                venv_path = os.path.join(self.venv_base_dir, entry)
-                if os.path.isdir(venv_path):
-                    # 检查是否是虚拟环境
-                    if self._is_valid_venv(venv_path):
-                        venvs.append(entry)
-        except:
-            pass
-        
-        return sorted(venvs)
+            self.index.reconcile()
+        except Exception as e:
+            logging.warning(f"同步虚拟环境索引失败: {str(e)}")
+        return self.index.get_all()
     
-    def _is_valid_venv(self, path):
-        """检查指定路径是否是有效的虚拟环境"""
-        if self.system == "Windows":
-            return os.path.isfile(os.path.join(path, "Scripts", "python.exe"))
-        else:
-            return os.path.isfile(os.path.join(path, "bin", "python"))
+    def get_venv_info(self, name):
+        """获取单个虚拟环境的元数据，不存在时返回None"""
+        try:
+            return self.index.refresh(name)
+        except Exception as e:
+            logging.warning(f"同步虚拟环境 {name} 的索引失败: {str(e)}")
+            return self.index.get(name)
     
-    def create_venv(self, name, python_version=None):
+    def create_venv(self, name, python_version=None, python_path=None):
         """创建新的虚拟环境
         
         参数:
             name: 虚拟环境名称
-            python_version: 要使用的Python版本（可选）
+            python_version: 要使用的Python版本（可选），可以带构建变体后缀，例如 3.13t、3.13.1t、3.12d
+            python_path: 要使用的解释器路径（可选），优先于python_version；
+                JIT构建没有单独的命令名，需要通过路径指定
         
         返回:
             成功返回True，失败返回False
@@ -68,24 +77,40 @@ class VenvManager:
             # 构建创建虚拟环境的命令
             cmd = []
             
-            if python_version:
+            if python_path:
+                cmd = [python_path, "-m", "venv", venv_path]
+            elif python_version:
                 # 如果指定了Python版本，使用该版本的Python解释器
-                if self.system == "Windows":
-                    cmd = [f"py -{python_version}", "-m", "venv", venv_path]
-                else:
-                    cmd = [f"python{python_version}", "-m", "venv", venv_path]
+                cmd = [*self._get_version_command(python_version), "-m", "venv", venv_path]
             else:
                 # 否则使用当前Python解释器
                 cmd = [sys.executable, "-m", "venv", venv_path]
             
             # 执行命令
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
             
             # 检查结果
-            return result.returncode == 0
+            if result.returncode != 0:
+                return False
+            self.index.update(name)
+            return True
         except:
             return False
     
+    def _get_version_command(self, python_version):
+        """指定版本的解释器命令：Windows上为 py -3.13t，其他系统为 python3.13t"""
+        parsed = PythonVersion.parse(python_version)
+        if parsed is None:
+            major_minor = python_version
+        else:
+            # py启动器和命令名只区分到主版本；自由线程和调试构建分别带 t 和 d 后缀
+            major_minor = parsed.major_minor + ("t" if parsed.free_threaded else "")
+            if parsed.debug and self.system != "Windows":
+                major_minor += "d"
+        if self.system == "Windows":
+            return ["py", f"-{major_minor}"]
+        return [f"python{major_minor}"]
+    
     def delete_venv(self, name):
         """删除指定的虚拟环境
         
@@ -106,6 +131,7 @@ class VenvManager:
             # 递归删除目录
             import shutil
             shutil.rmtree(venv_path)
+            self.index.remove(name)
             
             return True
         except:
@@ -157,10 +183,16 @@ class VenvManager:
             # 获取虚拟环境Python解释器路径
             python_path = self.get_venv_python(name)
             
+            # 直接读取site-packages中的包元数据，无需启动pip
+            site_dirs = find_site_packages(python_path) if python_path else None
+            if site_dirs:
+                return sorted(f"{package['name']}=={package['version']}"
+                              for package in read_installed_packages(site_dirs))
+            
             if python_path:
                 # 执行pip list命令
                 cmd = [python_path, "-m", "pip", "list", "--format=json"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_command(cmd, timeout=DEFAULT_QUERY_TIMEOUT)
                 
                 if result.returncode == 0:
                     # 解析JSON输出
@@ -173,6 +205,30 @@ class VenvManager:
         
         return sorted(packages)
     
+    def get_all_venv_packages(self):
+        """并行读取全部虚拟环境中已安装的包
+        
+        返回:
+            {虚拟环境名称: ["name==version", ...]}
+        """
+        site_dirs = {}
+        for info in self.get_venvs_info():
+            python_path = self.get_venv_python(info["name"])
+            site_dirs[info["name"]] = (find_site_packages(python_path) if python_path else None) or []
+        
+        # 所有虚拟环境的目录一起并行读取，读取结果按目录缓存
+        all_dirs = [directory for dirs in site_dirs.values() for directory in dirs]
+        results = dict(zip(all_dirs, read_many(all_dirs)))
+        packages = {}
+        for name, dirs in site_dirs.items():
+            if not dirs:
+                # 无法直接确定site-packages（例如包含系统包的虚拟环境）时退回到pip
+                packages[name] = self.get_venv_packages(name)
+                continue
+            packages[name] = sorted({f"{package['name']}=={package['version']}"
+                                     for directory in dirs for package in results[directory]})
+        return packages
+    
     def install_package(self, venv_name, package_name):
         """在指定虚拟环境中安装包
         
@@ -190,10 +246,13 @@ class VenvManager:
             if python_path:
                 # 执行pip install命令
                 cmd = [python_path, "-m", "pip", "install", package_name]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
                 
-                # 检查结果
-                return result.returncode == 0
+                # 检查结果，成功后重新统计大小和包数量
+                if result.returncode != 0:
+                    return False
+                self.index.update(venv_name)
+                return True
             else:
                 return False
         except:
@@ -216,10 +275,13 @@ class VenvManager:
             if python_path:
                 # 执行pip uninstall命令
                 cmd = [python_path, "-m", "pip", "uninstall", "-y", package_name]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_command(cmd, timeout=DEFAULT_INSTALL_TIMEOUT)
                 
-                # 检查结果
-                return result.returncode == 0
+                # 检查结果，成功后重新统计大小和包数量
+                if result.returncode != 0:
+                    return False
+                self.index.update(venv_name)
+                return True
             else:
                 return False
         except:
@@ -0,0 +1,217 @@
+import re
+import threading
+
+# 版本号格式，例如 3.12.1、3.13.0rc2、3.14.0a1，以及带构建变体后缀的 3.13.1t、3.12.8d、3.13.1+jit
+VERSION_PATTERN = re.compile(r"^(\d+)\.(\d+)(?:\.(\d+))?(?:(a|b|rc)(\d+))?(t?d?(?:\+jit)?)$")
+
+# 预发布类型的排序权重，正式版排在同一补丁号的所有预发布版本之后
+PRERELEASE_RANK = {"a": 0, "b": 1, "rc": 2, None: 3}
+
+# 构建变体后缀：t 自由线程（无GIL），d 调试版本，+jit 启用实验性JIT；与CPython的ABI标记一致，可以组合
+VARIANT_FREE_THREADED = "t"
+VARIANT_DEBUG = "d"
+VARIANT_JIT = "+jit"
+VARIANT_NAMES = {"": "标准", VARIANT_FREE_THREADED: "自由线程", VARIANT_DEBUG: "调试", VARIANT_JIT: "JIT"}
+
+# 自由线程和JIT构建从Python 3.13开始提供
+VARIANT_MIN_VERSION = {VARIANT_FREE_THREADED: (3, 13), VARIANT_DEBUG: (2, 0), VARIANT_JIT: (3, 13)}
+
+
+def make_variant(free_threaded=False, debug=False, jit=False):
+    """按固定顺序组合变体后缀，例如 (True, True, False) -> "td" """
+    return (VARIANT_FREE_THREADED if free_threaded else "") + (VARIANT_DEBUG if debug else "") \
+        + (VARIANT_JIT if jit else "")
+
+
+def split_variant(variant):
+    """拆分组合的变体后缀，例如 "td+jit" -> ["t", "d", "+jit"]"""
+    parts = []
+    if variant.endswith(VARIANT_JIT):
+        variant = variant[:-len(VARIANT_JIT)]
+        parts.append(VARIANT_JIT)
+    return [part for part in (VARIANT_FREE_THREADED, VARIANT_DEBUG) if part in variant] + parts
+
+
+def variant_name(variant):
+    """变体后缀的显示名称，例如 "td" -> "自由线程、调试" """
+    if not variant:
+        return VARIANT_NAMES[""]
+    return "、".join(VARIANT_NAMES[part] for part in split_variant(variant))
+
+
+class PythonVersion:
+    """解析后的Python版本号
+
+    同一版本字符串只会解析一次，相同文本返回同一个对象，可直接用 is 比较和作为字典键。
+    """
+
+    __slots__ = ("text", "major", "minor", "micro", "pre_type", "pre_num", "variant", "key")
+
+    _interned = {}
+    _intern_lock = threading.Lock()
+
+    def __init__(self, text, major, minor, micro, pre_type=None, pre_num=0, variant=""):
+        self.text = text
+        self.major = major
+        self.minor = minor
+        self.micro = micro
+        self.pre_type = pre_type
+        self.pre_num = pre_num
+        self.variant = variant
+        # 同一版本号的标准构建排在各变体之前
+        self.key = (major, minor, micro, PRERELEASE_RANK[pre_type], pre_num, variant)
+
+    @classmethod
+    def parse(cls, text):
+        """解析版本字符串，格式无效时返回None"""
+        version = cls._interned.get(text)
+        if version is not None:
+            return version
+
+        match = VERSION_PATTERN.match(text.strip())
+        if not match:
+            return None
+        major, minor, micro, pre_type, pre_num, variant = match.groups()
+        version = cls(text, int(major), int(minor), int(micro or 0), pre_type, int(pre_num or 0), variant)
+        with cls._intern_lock:
+            return cls._interned.setdefault(text, version)
+
+    @property
+    def is_prerelease(self):
+        """是否是alpha、beta或rc版本"""
+        return self.pre_type is not None
+
+    @property
+    def major_minor(self):
+        """主版本号，例如 "3.12" """
+        return f"{self.major}.{self.minor}"
+
+    @property
+    def base_version(self):
+        """不含预发布标记的版本号，例如 3.13.0rc2 -> "3.13.0" """
+        return f"{self.major}.{self.minor}.{self.micro}"
+
+    @property
+    def release(self):
+        """不含变体后缀的版本号，例如 3.13.0rc2t -> "3.13.0rc2"，下载的安装包和源码包以此命名"""
+        return self.text[:len(self.text) - len(self.variant)] if self.variant else self.text
+
+    @property
+    def free_threaded(self):
+        return VARIANT_FREE_THREADED in split_variant(self.variant)
+
+    @property
+    def debug(self):
+        return VARIANT_DEBUG in split_variant(self.variant)
+
+    @property
+    def jit(self):
+        return VARIANT_JIT in split_variant(self.variant)
+
+    def with_variant(self, variant):
+        """同一版本号的指定变体"""
+        return PythonVersion.parse(self.release + variant)
+
+    def supported_variants(self):
+        """该版本可以构建的全部单一变体后缀（含表示标准构建的空字符串）"""
+        return [""] + [variant for variant, minimum in VARIANT_MIN_VERSION.items()
+                       if (self.major, self.minor) >= minimum]
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __eq__(self, other):
+        return isinstance(other, PythonVersion) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"PythonVersion({self.text!r})"
+
+
+def version_sort_key(text):
+    """版本字符串的排序键，无法解析的版本按各段文本排序并排在最后"""
+    version = PythonVersion.parse(text)
+    if version is not None:
+        return (0, version.key)
+    return (1, tuple(int(p) if p.isdigit() else 0 for p in text.split('.')), text)
+
+
+class VersionCatalog:
+    """一次获取得到的可用版本目录
+
+    构建时解析并排序一次，之后按主版本建立索引，
+    供版本列表、两步选择对话框和已安装版本过滤直接查询。
+    """
+
+    def __init__(self, versions, include_prereleases=False):
+        parsed = {}
+        for text in versions:
+            version = PythonVersion.parse(text)
+            if version is not None and (include_prereleases or not version.is_prerelease):
+                parsed[version.key] = version
+        # 升序排列，只排序一次
+        self.versions = sorted(parsed.values())
+
+        # 按主版本索引，每个主版本内按降序排列
+        self.by_major_minor = {}
+        for version in reversed(self.versions):
+            self.by_major_minor.setdefault(version.major_minor, []).append(version)
+
+    def __len__(self):
+        return len(self.versions)
+
+    def __contains__(self, text):
+        version = PythonVersion.parse(text)
+        return version is not None and version.major_minor in self.by_major_minor \
+            and version.with_variant("") in self.by_major_minor[version.major_minor]
+
+    def to_list(self):
+        """升序排列的版本字符串列表"""
+        return [version.text for version in self.versions]
+
+    def without(self, installed, variant=""):
+        """返回移除已安装版本后的新目录
+
+        目录中只有标准构建的版本号，variant不为空时移除的是已安装了该变体的版本。
+        """
+        installed_keys = set()
+        for text in installed:
+            version = PythonVersion.parse(text)
+            if version is not None and version.variant == variant:
+                installed_keys.add(version.with_variant("").key)
+
+        catalog = VersionCatalog([], include_prereleases=True)
+        catalog.versions = [v for v in self.versions if v.key not in installed_keys]
+        for version in reversed(catalog.versions):
+            catalog.by_major_minor.setdefault(version.major_minor, []).append(version)
+        return catalog
+
+    def supported_variants(self, text):
+        """目录中的版本可以安装的变体后缀列表"""
+        version = PythonVersion.parse(text)
+        return version.supported_variants() if version is not None else [""]
+
+    def get_versions(self, major_minor):
+        """指定主版本的全部版本号，按降序排列"""
+        return [version.text for version in self.by_major_minor.get(major_minor, [])]
+
+    def latest(self, major_minor):
+        """指定主版本的最新版本号，不存在时返回None"""
+        versions = self.by_major_minor.get(major_minor)
+        return versions[0].text if versions else None
+
+    def get_major_versions(self):
+        """按主版本分组的版本列表，主版本和次版本均按降序排列
+
+        Returns:
+            [("3.12", ["3.12.1", "3.12.0"]), ("3.11", [...]), ...]
+        """
+        return [(major_minor, [version.text for version in versions])
+                for major_minor, versions in sorted(self.by_major_minor.items(),
+                                                    key=lambda item: item[1][0].key,
+                                                    reverse=True)]
@@ -1,23 +1,39 @@
 from PyQt6.QtWidgets import (QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
                          QLabel, QPushButton, QListWidget, QMessageBox,
                          QHBoxLayout, QLineEdit, QComboBox, QGroupBox, QFormLayout,
-                         QMenuBar, QMenu, QDialog, QTextEdit, QTextBrowser, QSplitter, QApplication, QFileDialog,QCheckBox, QListWidgetItem, QProgressBar
+                         QMenuBar, QMenu, QDialog, QTextEdit, QTextBrowser, QSplitter, QApplication, QFileDialog,QCheckBox, QListWidgetItem, QProgressBar, QSpinBox,
+                         QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
                          )
-from PyQt6.QtCore import Qt, QSize, QUrl, QThread, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, QSize, QUrl, QThread, QObject, pyqtSignal, QTimer
 from PyQt6.QtGui import QIcon, QAction, QFont, QColor, QPalette, QDesktopServices
 
 import sys
 import os
+import copy
 from pathlib import Path
-import subprocess
 import re
-import time
 import logging
 
-from src.core.python_manager import PythonManager
+from src.core.python_manager import PythonManager, PREDEFINED_SOURCES
+from src.core.download_scheduler import (DownloadScheduler, DEFAULT_MAX_CONCURRENT_DOWNLOADS, JOB_STATE_NAMES,
+                                         JOB_DOWNLOADING, JOB_PAUSED, JOB_DOWNLOADED, JOB_COMPLETED, JOB_FAILED,
+                                         FINISHED_STATES)
+from src.core.progress import format_speed, format_eta
+from src.core.version_catalog import PythonVersion, VARIANT_NAMES, variant_name
 from src.core.venv_manager import VenvManager
 from src.core.package_manager import PackageManager
 
+# 版本列表项中的版本标识，包含构建变体后缀，例如 "Python 3.13.1t (自由线程)" -> 3.13.1t
+VERSION_ITEM_PATTERN = re.compile(r"Python (\d+\.\d+\.\d+\S*)")
+
+
+def create_variant_combo():
+    """构建变体选择框，选项的数据为变体后缀"""
+    combo = QComboBox()
+    for variant, name in VARIANT_NAMES.items():
+        combo.addItem(f"{name} ({variant})" if variant else name, variant)
+    return combo
+
 
 class AboutDialog(QDialog):
     def __init__(self, parent=None):
@@ -178,6 +194,20 @@ class SettingsDialog(QDialog):
         self.custom_paths_input.setStyleSheet("color: #333333;")
         search_options_layout.addWidget(self.custom_paths_input)
         
+        # 并行探测线程数
+        probe_workers_layout = QHBoxLayout()
+        probe_workers_label = QLabel("并行探测线程数:")
+        probe_workers_layout.addWidget(probe_workers_label)
+        
+        self.probe_workers_spin = QSpinBox()
+        self.probe_workers_spin.setRange(1, 64)
+        self.probe_workers_spin.setValue(8)
+        self.probe_workers_spin.setStyleSheet("color: #333333;")
+        probe_workers_layout.addWidget(self.probe_workers_spin)
+        probe_workers_layout.addStretch()
+        
+        search_options_layout.addLayout(probe_workers_layout)
+        
         search_group.setLayout(search_options_layout)
         search_layout.addWidget(search_group)
         
@@ -212,11 +242,9 @@ class SettingsDialog(QDialog):
         source_options_layout.addWidget(source_label)
         
         self.source_combo = QComboBox()
-        self.source_combo.addItem("Python官方源 (python.org)", "https://www.python.org/downloads/")
-        self.source_combo.addItem("淘宝Python镜像", "https://npm.taobao.org/mirrors/python/")
-        self.source_combo.addItem("华为云镜像", "https://mirrors.huaweicloud.com/python/")
-        self.source_combo.addItem("清华大学镜像", "https://mirrors.tuna.tsinghua.edu.cn/anaconda/archive/")
-        self.source_combo.addItem("北京外国语大学镜像", "https://mirrors.bfsu.edu.cn/anaconda/archive/")
+        # 与PythonManager使用同一份源列表，保证selected_source_index对应同一个源
+        for source in PREDEFINED_SOURCES:
+            self.source_combo.addItem(source["name"], source["url"])
         self.source_combo.currentIndexChanged.connect(self.on_source_changed)
         self.source_combo.setStyleSheet("""
             QComboBox {
@@ -235,6 +263,11 @@ class SettingsDialog(QDialog):
         """)
         source_options_layout.addWidget(self.source_combo)
         
+        # 自动选择最快的镜像
+        self.auto_select_source_check = QCheckBox("自动选择最快的镜像（定期测速，失败时自动切换）")
+        self.auto_select_source_check.setToolTip("在提供相同安装包的镜像之间按测速结果排序，所选源在没有测速结果时优先")
+        source_options_layout.addWidget(self.auto_select_source_check)
+        
         # 自定义源URL
         custom_source_layout = QHBoxLayout()
         self.custom_source_check = QCheckBox("使用自定义源:")
@@ -332,6 +365,75 @@ class SettingsDialog(QDialog):
         self.verify_ssl_check.setChecked(True)
         download_layout.addWidget(self.verify_ssl_check)
         
+        # 取消下载时是否保留已下载的部分
+        self.keep_partial_check = QCheckBox("取消下载时保留已下载的部分，下次从断点继续")
+        self.keep_partial_check.setChecked(False)
+        download_layout.addWidget(self.keep_partial_check)
+        
+        # 并发下载连接数
+        connections_layout = QHBoxLayout()
+        connections_label = QLabel("并发下载连接数:")
+        connections_layout.addWidget(connections_label)
+        
+        self.connections_spin = QSpinBox()
+        self.connections_spin.setRange(1, 16)
+        self.connections_spin.setValue(4)
+        self.connections_spin.setToolTip("服务器支持分段下载时，将安装包分成多段并行下载")
+        self.connections_spin.setStyleSheet("color: #333333;")
+        connections_layout.addWidget(self.connections_spin)
+        connections_layout.addStretch()
+        
+        download_layout.addLayout(connections_layout)
+        
+        # 同时下载的版本数和总速度限制
+        queue_layout = QHBoxLayout()
+        queue_layout.addWidget(QLabel("同时下载版本数:"))
+        
+        self.max_downloads_spin = QSpinBox()
+        self.max_downloads_spin.setRange(1, 8)
+        self.max_downloads_spin.setValue(DEFAULT_MAX_CONCURRENT_DOWNLOADS)
+        self.max_downloads_spin.setToolTip("选择多个版本时，同时下载的版本数，其余版本排队等待")
+        self.max_downloads_spin.setStyleSheet("color: #333333;")
+        queue_layout.addWidget(self.max_downloads_spin)
+        
+        queue_layout.addWidget(QLabel("总速度限制 (KB/s):"))
+        
+        self.bandwidth_limit_spin = QSpinBox()
+        self.bandwidth_limit_spin.setRange(0, 1024 * 1024)
+        self.bandwidth_limit_spin.setSingleStep(256)
+        self.bandwidth_limit_spin.setValue(0)
+        self.bandwidth_limit_spin.setSpecialValueText("不限速")
+        self.bandwidth_limit_spin.setToolTip("所有下载任务共享的速度上限，0表示不限速")
+        self.bandwidth_limit_spin.setStyleSheet("color: #333333;")
+        queue_layout.addWidget(self.bandwidth_limit_spin)
+        queue_layout.addStretch()
+        
+        download_layout.addLayout(queue_layout)
+        
+        # 安装包缓存
+        cache_layout = QHBoxLayout()
+        cache_label = QLabel("安装包缓存上限 (MB):")
+        cache_layout.addWidget(cache_label)
+        
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(100, 102400)
+        self.cache_size_spin.setSingleStep(512)
+        self.cache_size_spin.setValue(2048)
+        self.cache_size_spin.setToolTip("超过上限时删除最久未使用的安装包")
+        self.cache_size_spin.setStyleSheet("color: #333333;")
+        cache_layout.addWidget(self.cache_size_spin)
+        
+        clear_cache_btn = QPushButton("清空缓存")
+        clear_cache_btn.clicked.connect(self.clear_installer_cache)
+        cache_layout.addWidget(clear_cache_btn)
+        cache_layout.addStretch()
+        
+        download_layout.addLayout(cache_layout)
+        
+        self.cache_stats_label = QLabel()
+        self.cache_stats_label.setStyleSheet("color: #666666;")
+        download_layout.addWidget(self.cache_stats_label)
+        
         download_group.setLayout(download_layout)
         source_layout.addWidget(download_group)
         
@@ -391,6 +493,25 @@ class SettingsDialog(QDialog):
         # 可以在这里添加根据选择的源更改UI的代码
         pass
     
+    def update_cache_stats(self):
+        """显示安装包缓存的统计信息"""
+        if not isinstance(self.parent(), MainWindow):
+            return
+        stats = self.parent().python_manager.get_installer_cache().get_stats()
+        self.cache_stats_label.setText(
+            f"已缓存 {stats['count']} 个安装包，共 {stats['size'] / 1024 / 1024:.1f} MB；"
+            f"命中率 {stats['hit_rate']:.0%}，节省下载 {stats['bytes_saved'] / 1024 / 1024:.1f} MB，"
+            f"去重节省 {stats['dedup_bytes'] / 1024 / 1024:.1f} MB")
+    
+    def clear_installer_cache(self):
+        if not isinstance(self.parent(), MainWindow):
+            return
+        reply = QMessageBox.question(self, "确认", "确定要删除所有缓存的安装包吗？",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.parent().python_manager.get_installer_cache().clear()
+            self.update_cache_stats()
+    
     def select_download_dir(self):
         dir_path = QFileDialog.getExistingDirectory(self, "选择下载目录", self.download_dir_input.text())
         if dir_path:
@@ -412,6 +533,7 @@ class SettingsDialog(QDialog):
             self.path_check.setChecked(search_settings.get("use_path", True))
             self.custom_paths_check.setChecked(search_settings.get("use_custom_paths", False))
             self.custom_paths_input.setText(search_settings.get("custom_paths", ""))
+            self.probe_workers_spin.setValue(search_settings.get("probe_workers", 8))
             
             # 设置源选项
             source_settings = settings.get("source", {})
@@ -424,6 +546,7 @@ class SettingsDialog(QDialog):
             if 0 <= selected_index < self.source_combo.count():
                 self.source_combo.setCurrentIndex(selected_index)
             self.source_combo.setEnabled(not use_custom)
+            self.auto_select_source_check.setChecked(source_settings.get("auto_select_source", True))
             
             # 设置下载选项
             download_settings = settings.get("download", {})
@@ -431,6 +554,13 @@ class SettingsDialog(QDialog):
                                            os.path.join(os.environ.get("TEMP", ""), "PythoNest")))
             self.auto_install_check.setChecked(download_settings.get("auto_install", True))
             self.verify_ssl_check.setChecked(download_settings.get("verify_ssl", True))
+            self.keep_partial_check.setChecked(download_settings.get("keep_partial_on_cancel", False))
+            self.connections_spin.setValue(download_settings.get("connections", 4))
+            self.max_downloads_spin.setValue(download_settings.get("max_concurrent_downloads",
+                                                                   DEFAULT_MAX_CONCURRENT_DOWNLOADS))
+            self.bandwidth_limit_spin.setValue(download_settings.get("bandwidth_limit", 0))
+            self.cache_size_spin.setValue(int(download_settings.get("cache_max_size", 2048 * 1024 * 1024) / 1024 / 1024))
+            self.update_cache_stats()
             
             # 设置版本选择模式
             version_select_mode = download_settings.get("version_select_mode", "direct")
@@ -442,28 +572,38 @@ class SettingsDialog(QDialog):
             self.version_select_mode.setCurrentIndex(index)
     
     def save_settings(self):
+        # 以当前设置为基础，保留对话框中未展示的设置项
+        settings = {"search": {}, "source": {}, "download": {}}
+        if isinstance(self.parent(), MainWindow):
+            settings = copy.deepcopy(self.parent().python_manager.settings)
+        
         # 保存设置到配置文件或全局设置
-        settings = {
-            "search": {
-                "use_registry": self.registry_check.isChecked(),
-                "use_py_launcher": self.py_launcher_check.isChecked(),
-                "use_path": self.path_check.isChecked(),
-                "use_custom_paths": self.custom_paths_check.isChecked(),
-                "custom_paths": self.custom_paths_input.text()
-            },
-            "source": {
-                "use_custom_source": self.custom_source_check.isChecked(),
-                "custom_source_url": self.custom_source_input.text(),
-                "selected_source_index": self.source_combo.currentIndex(),
-                "selected_source_url": self.source_combo.currentData()
-            },
-            "download": {
-                "download_dir": self.download_dir_input.text(),
-                "auto_install": self.auto_install_check.isChecked(),
-                "verify_ssl": self.verify_ssl_check.isChecked(),
-                "version_select_mode": self.version_select_mode.currentData()
-            }
-        }
+        settings.setdefault("search", {}).update({
+            "use_registry": self.registry_check.isChecked(),
+            "use_py_launcher": self.py_launcher_check.isChecked(),
+            "use_path": self.path_check.isChecked(),
+            "use_custom_paths": self.custom_paths_check.isChecked(),
+            "custom_paths": self.custom_paths_input.text(),
+            "probe_workers": self.probe_workers_spin.value()
+        })
+        settings.setdefault("source", {}).update({
+            "use_custom_source": self.custom_source_check.isChecked(),
+            "custom_source_url": self.custom_source_input.text(),
+            "selected_source_index": self.source_combo.currentIndex(),
+            "selected_source_url": self.source_combo.currentData(),
+            "auto_select_source": self.auto_select_source_check.isChecked()
+        })
+        settings.setdefault("download", {}).update({
+            "download_dir": self.download_dir_input.text(),
+            "auto_install": self.auto_install_check.isChecked(),
+            "verify_ssl": self.verify_ssl_check.isChecked(),
+            "keep_partial_on_cancel": self.keep_partial_check.isChecked(),
+            "connections": self.connections_spin.value(),
+            "max_concurrent_downloads": self.max_downloads_spin.value(),
+            "bandwidth_limit": self.bandwidth_limit_spin.value(),
+            "cache_max_size": self.cache_size_spin.value() * 1024 * 1024,
+            "version_select_mode": self.version_select_mode.currentData()
+        })
         
         # 通过父窗口获取PythonManager实例并保存设置
         if isinstance(self.parent(), MainWindow):
@@ -511,7 +651,7 @@ class VersionSelectDialog(QDialog):
         layout.addWidget(title_label)
         
         # 描述
-        desc_label = QLabel("以下是可安装的Python版本列表，请选择一个版本进行安装：")
+        desc_label = QLabel("以下是可安装的Python版本列表，请选择要安装的版本（按住Ctrl或Shift可选择多个版本）：")
         desc_label.setWordWrap(True)
         layout.addWidget(desc_label)
         
@@ -535,33 +675,7 @@ class VersionSelectDialog(QDialog):
             }
         """)
         
-        # 添加版本到列表
-        for version in self.versions:
-            item = QListWidgetItem(f"Python {version}")
-            major, minor, patch = version.split('.')
-            
-            # 为不同主版本使用不同图标或样式
-            if major == '3':
-                if minor in ['9', '10', '11', '12']:
-                    item.setIcon(QIcon("src/ui/images/python_new.svg"))  # 最新版本
-                else:
-                    item.setIcon(QIcon("src/ui/images/python_new.svg"))  # 较旧版本
-            else:
-                # Python 2.x版本
-                item.setIcon(QIcon("src/ui/images/python_old.png"))
-            
-            self.version_list.addItem(item)
-        
-        # 如果有版本，选中第一个
-        if self.versions:
-            self.version_list.setCurrentRow(0)
-            
-        # 当没有可用版本时显示提示
-        if not self.versions:
-            empty_item = QListWidgetItem("没有可用的Python版本")
-            empty_item.setFlags(Qt.ItemFlag.NoItemFlags)
-            self.version_list.addItem(empty_item)
-        
+        self.version_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.version_list.itemDoubleClicked.connect(self.accept)
         layout.addWidget(self.version_list)
         
@@ -584,6 +698,17 @@ class VersionSelectDialog(QDialog):
         
         self.version_list.currentItemChanged.connect(self.update_version_details)
         
+        # 添加版本到列表
+        self.populate_versions()
+        
+        # 构建变体
+        variant_layout = QHBoxLayout()
+        variant_layout.addWidget(QLabel("构建变体:"))
+        self.variant_combo = create_variant_combo()
+        self.variant_combo.setToolTip("自由线程 (t) 和 JIT 需要 Python 3.13 及以上版本")
+        variant_layout.addWidget(self.variant_combo, 1)
+        layout.addLayout(variant_layout)
+        
         # 按钮区域
         buttons_layout = QHBoxLayout()
         
@@ -623,6 +748,51 @@ class VersionSelectDialog(QDialog):
         
         self.setLayout(layout)
     
+    def populate_versions(self, selected_version=None):
+        """将版本添加到列表"""
+        self.version_list.clear()
+        
+        for version in self.versions:
+            item = QListWidgetItem(f"Python {version}")
+            major, minor, patch = version.split('.')
+            
+            # 为不同主版本使用不同图标或样式
+            if major == '3':
+                if minor in ['9', '10', '11', '12']:
+                    item.setIcon(QIcon("src/ui/images/python_new.svg"))  # 最新版本
+                else:
+                    item.setIcon(QIcon("src/ui/images/python_new.svg"))  # 较旧版本
+            else:
+                # Python 2.x版本
+                item.setIcon(QIcon("src/ui/images/python_old.png"))
+            
+            self.version_list.addItem(item)
+        
+        # 如果有版本，选中之前选中的版本或第一个
+        if self.versions:
+            if selected_version in self.versions:
+                self.version_list.setCurrentRow(self.versions.index(selected_version))
+            else:
+                self.version_list.setCurrentRow(0)
+            
+        # 当没有可用版本时显示提示
+        if not self.versions:
+            empty_item = QListWidgetItem("没有可用的Python版本")
+            empty_item.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.version_list.addItem(empty_item)
+    
+    def set_catalog(self, catalog):
+        """后台刷新版本目录后更新列表"""
+        self.set_versions(catalog.to_list())
+
+    def set_versions(self, versions):
+        """后台刷新版本目录后更新列表，保留当前选中的版本"""
+        if versions == self.versions:
+            return
+        selected_version = self.get_selected_version()
+        self.versions = versions
+        self.populate_versions(selected_version)
+    
     def update_version_details(self, current, previous):
         if not current or not self.versions:
             return
@@ -648,6 +818,18 @@ class VersionSelectDialog(QDialog):
         if row >= 0 and row < len(self.versions):
             return self.versions[row]
         return None
+    
+    def get_selected_versions(self):
+        """获取所有选中的版本，按列表顺序排列"""
+        rows = sorted(index.row() for index in self.version_list.selectedIndexes())
+        versions = [self.versions[row] for row in rows if row < len(self.versions)]
+        if not versions and self.get_selected_version():
+            versions = [self.get_selected_version()]
+        return versions
+
+    def get_selected_variant(self):
+        """选中的构建变体后缀，标准构建为空字符串"""
+        return self.variant_combo.currentData()
 
 
 class MainWindow(QMainWindow):
@@ -656,6 +838,8 @@ class MainWindow(QMainWindow):
         self.python_manager = PythonManager()
         self.venv_manager = VenvManager()
         self.package_manager = PackageManager()
+        # 最近一次刷新得到的已安装版本，用于在界面线程中过滤缓存的版本目录
+        self.installed_versions = None
         
         # 禁用系统颜色主题，强制使用浅色主题
         self.force_light_theme()
@@ -1017,7 +1201,7 @@ class MainWindow(QMainWindow):
         
         # 使用QThread运行耗时操作
         class VersionThread(QThread):
-            versions_ready = pyqtSignal(list)
+            versions_ready = pyqtSignal(list, str)  # versions, default_version
             
             def __init__(self, python_manager):
                 super().__init__()
@@ -1025,24 +1209,32 @@ class MainWindow(QMainWindow):
             
             def run(self):
                 versions = self.python_manager.get_installed_versions()
-                self.versions_ready.emit(versions)
+                # 默认版本同样在后台线程中获取，避免阻塞界面
+                default_interpreter = self.python_manager.get_default_interpreter()
+                default_version = default_interpreter.version_id if default_interpreter else ""
+                self.versions_ready.emit(versions, default_version)
         
         self.version_thread = VersionThread(self.python_manager)
         self.version_thread.versions_ready.connect(self.on_versions_ready)
         self.version_thread.start()
 
-    def on_versions_ready(self, versions):
+    def on_versions_ready(self, versions, default_version=""):
         """当版本列表刷新完成时调用"""
+        self.installed_versions = list(versions)
         if not versions:
             self.version_list.addItem("未找到已安装的Python版本")
             empty_item = self.version_list.item(0)
             empty_item.setFlags(Qt.ItemFlag.NoItemFlags)
         else:
             # 获取当前系统默认Python版本
-            default_version = self.get_default_python_version()
+            if not default_version:
+                default_version = self.get_default_python_version()
             
             for version in versions:
-                item = QListWidgetItem(f"Python {version}")
+                parsed = PythonVersion.parse(version)
+                variant = parsed.variant if parsed else ""
+                label = f"Python {version} ({variant_name(variant)})" if variant else f"Python {version}"
+                item = QListWidgetItem(label)
                 major, minor = version.split(".")[:2]
                 
                 # 为不同主版本使用不同图标或样式
@@ -1060,7 +1252,7 @@ class MainWindow(QMainWindow):
                     font = item.font()
                     font.setBold(True)
                     item.setFont(font)
-                    item.setText(f"Python {version} (默认)")
+                    item.setText(f"{label} (默认)")
                 
                 self.version_list.addItem(item)
         
@@ -1068,19 +1260,19 @@ class MainWindow(QMainWindow):
         if versions and self.version_list.count() > 0:
             self.version_list.setCurrentRow(0)
         
-        self.statusBar().showMessage("Python版本刷新完成", 3000)
+        quarantined = self.python_manager.get_quarantined_interpreters()
+        if quarantined:
+            self.statusBar().showMessage(f"Python版本刷新完成，已跳过 {len(quarantined)} 个无响应的解释器", 5000)
+        else:
+            self.statusBar().showMessage("Python版本刷新完成", 3000)
 
     def get_default_python_version(self):
         """获取系统默认Python版本"""
         try:
-            # 运行python --version命令
-            result = subprocess.run(["python", "--version"], 
-                                   capture_output=True, text=True)
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_output)
-                if version_match:
-                    return version_match.group(1)
+            # 从解释器元数据记录中读取，文件未变化时无需启动子进程
+            interpreter = self.python_manager.get_default_interpreter()
+            if interpreter:
+                return interpreter.version_id
         except:
             pass
         
@@ -1092,14 +1284,18 @@ class MainWindow(QMainWindow):
             return
         
         version_text = current.text()
-        version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_text)
+        version_match = VERSION_ITEM_PATTERN.search(version_text)
         
         if version_match:
             version = version_match.group(1)
             major, minor, patch = version.split(".")
             
-            # 获取安装路径
-            install_path = self.python_manager._get_python_install_path(version)
+            # 读取搜索时记录的解释器元数据
+            interpreter = self.python_manager.get_interpreter(version)
+            if interpreter:
+                install_path = interpreter.prefix or os.path.dirname(interpreter.executable)
+            else:
+                install_path = self.python_manager._get_python_install_path(version)
             
             # 检查是否为默认版本
             is_default = "默认" in version_text
@@ -1115,6 +1311,37 @@ class MainWindow(QMainWindow):
             </p>
             """
             
+            if interpreter:
+                build_flags = []
+                if interpreter.free_threaded:
+                    build_flags.append("自由线程 (无GIL)")
+                if interpreter.debug:
+                    build_flags.append("调试版本")
+                if interpreter.jit:
+                    build_flags.append("JIT")
+                
+                html_content += f"""
+                <p style="color: #333333;">
+                    <b>可执行文件:</b> {interpreter.realpath}<br>
+                    <b>实现:</b> {interpreter.implementation or "未知"}<br>
+                    <b>架构:</b> {interpreter.architecture or "未知"}{f" ({interpreter.bits}位)" if interpreter.bits else ""}<br>
+                """
+                other_paths = [path for path in interpreter.aliases if path != interpreter.executable]
+                if other_paths:
+                    html_content += f"<b>其他路径:</b> {'<br>'.join(other_paths)}<br>"
+                if interpreter.is_venv:
+                    html_content += f"<b>基础环境:</b> {interpreter.base_prefix}<br>"
+                if interpreter.paths.get("purelib"):
+                    html_content += f"<b>site-packages:</b> {interpreter.paths['purelib']}<br>"
+                if build_flags:
+                    html_content += f"<b>构建特性:</b> {'、'.join(build_flags)}<br>"
+                if interpreter.probe_latency_ms is not None:
+                    html_content += f"<b>探测耗时:</b> {interpreter.probe_latency_ms} ms<br>"
+                benchmark = self.python_manager.get_benchmark(interpreter.executable)
+                if benchmark:
+                    html_content += f"<b>速度评分:</b> {benchmark['score']}<br>"
+                html_content += "</p>"
+            
             # 添加版本特性信息
             if int(major) == 3:
                 features = {
@@ -1149,33 +1376,75 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "错误", f"安装新版本失败: {str(e)}")
             logging.error(f"安装新版本失败: {str(e)}")
     
+    def _start_catalog_refresh(self, on_refreshed, dialog=None):
+        """在后台重新验证版本目录缓存，完成后调用on_refreshed(catalog)
+        
+        传入dialog时在对话框关闭后断开连接，关闭的对话框不会被刷新线程继续引用。
+        """
+        # 上一次刷新仍在进行时直接等待其结果
+        start = not (getattr(self, "catalog_thread", None) and self.catalog_thread.isRunning())
+        if start:
+            self.catalog_thread = CatalogRefreshThread(self.python_manager)
+        thread = self.catalog_thread
+        thread.catalog_ready.connect(on_refreshed)
+        if start:
+            thread.start()
+        if dialog is not None:
+            dialog.finished.connect(lambda _result: self._disconnect_catalog_refresh(thread, on_refreshed))
+    
+    def _disconnect_catalog_refresh(self, thread, on_refreshed):
+        try:
+            thread.catalog_ready.disconnect(on_refreshed)
+        except TypeError:
+            # 刷新完成前已断开或从未连接
+            pass
+    
     def _install_direct_mode(self):
         """直接选择完整版本模式"""
-        # 获取可用版本
-        versions = self.python_manager.get_available_versions()
-        
-        if not versions:
+        # 优先使用缓存的版本目录，立即打开对话框；没有缓存时在后台获取，完成后再打开
+        versions = self.python_manager.get_cached_available_versions(self.installed_versions)
+        if versions is None:
+            self.statusBar().showMessage("正在获取可用的Python版本...")
+            self._start_catalog_refresh(lambda catalog: self._show_version_dialog(catalog.to_list(), False))
+            return
+        self._show_version_dialog(versions, True)
+    
+    def _show_version_dialog(self, versions, from_cache):
+        """显示版本选择对话框，from_cache为True时在后台重新验证版本目录并更新对话框"""
+        if not versions and not from_cache:
             QMessageBox.warning(self, "警告", "没有找到可用的Python版本")
             return
         
         # 创建并显示版本选择对话框
         version_dialog = VersionSelectDialog(versions, self)
+        if from_cache:
+            self._start_catalog_refresh(version_dialog.set_catalog, version_dialog)
         if version_dialog.exec():
-            selected_version = version_dialog.get_selected_version()
-            if selected_version:
-                self._download_and_install_version(selected_version)
+            selected_versions = self._apply_variant(version_dialog.get_selected_versions(),
+                                                    version_dialog.get_selected_variant())
+            if selected_versions:
+                self._download_and_install_versions(selected_versions)
     
     def _install_two_step_mode(self):
         """两步选择模式（先选择主版本，再选择次版本）"""
-        # 获取主版本列表
-        major_versions = self.python_manager.get_major_versions()
-        
-        if not major_versions:
+        # 优先使用缓存的版本目录，立即打开对话框；没有缓存时在后台获取，完成后再打开
+        catalog = self.python_manager.get_cached_version_catalog(self.installed_versions)
+        if catalog is None:
+            self.statusBar().showMessage("正在获取可用的Python版本...")
+            self._start_catalog_refresh(lambda catalog: self._show_major_version_dialog(catalog, False))
+            return
+        self._show_major_version_dialog(catalog, True)
+    
+    def _show_major_version_dialog(self, catalog, from_cache):
+        """显示主版本选择对话框，from_cache为True时在后台重新验证版本目录并更新对话框"""
+        if not catalog and not from_cache:
             QMessageBox.warning(self, "警告", "没有找到可用的Python版本")
             return
         
         # 创建并显示主版本选择对话框
-        major_dialog = MajorVersionSelectDialog(major_versions, self)
+        major_dialog = MajorVersionSelectDialog(catalog, self)
+        if from_cache:
+            self._start_catalog_refresh(major_dialog.set_catalog, major_dialog)
         if major_dialog.exec():
             # 获取选中的主版本及其对应的次版本列表
             selected_major, minor_versions = major_dialog.get_selected_major_version()
@@ -1184,91 +1453,101 @@ class MainWindow(QMainWindow):
                 # 创建并显示次版本选择对话框
                 minor_dialog = MinorVersionSelectDialog(selected_major, minor_versions, self)
                 if minor_dialog.exec():
-                    selected_version = minor_dialog.get_selected_version()
-                    if selected_version:
-                        self._download_and_install_version(selected_version)
+                    selected_versions = self._apply_variant([minor_dialog.get_selected_version()],
+                                                            minor_dialog.get_selected_variant())
+                    if selected_versions:
+                        self._download_and_install_versions(selected_versions)
     
-    def _download_and_install_version(self, version):
-        """下载并安装指定版本"""
-        # 创建下载进度对话框
-        progress_dialog = DownloadProgressDialog(self)
-        progress_dialog.setWindowTitle(f"下载Python {version}")
-        progress_dialog.show()
-        
-        # 定义进度回调函数
-        def update_progress(progress):
-            progress_dialog.update_progress(progress)
-        
-        # 在后台线程中下载
-        download_thread = DownloadThread(self.python_manager, version, update_progress)
-        download_thread.download_complete.connect(self._handle_download_complete)
-        download_thread.download_error.connect(self._handle_download_error)
-        download_thread.start()
-        
-        # 存储当前下载信息
-        self.current_download = {
-            "version": version,
-            "thread": download_thread,
-            "progress_dialog": progress_dialog
-        }
+    def _apply_variant(self, versions, variant):
+        """为选中的版本加上构建变体后缀，跳过不支持该变体的版本"""
+        selected = [version for version in versions if version]
+        if not variant:
+            return selected
+        supported = [version for version in selected
+                     if variant in self.python_manager.get_supported_variants(version)]
+        skipped = [version for version in selected if version not in supported]
+        if skipped:
+            QMessageBox.warning(self, "不支持的构建变体",
+                                f"以下版本不提供{VARIANT_NAMES[variant]}构建，已跳过: {', '.join(skipped)}")
+        return [version + variant for version in supported]
     
-    def _handle_download_complete(self, version, installer_path):
-        """处理下载完成事件"""
-        if hasattr(self, 'current_download') and self.current_download:
-            self.current_download["progress_dialog"].close()
-            
-            # 检查是否自动安装
-            auto_install = self.python_manager.settings["download"].get("auto_install", True)
-            
-            if auto_install:
-                # 自动安装
-                self.statusBar().showMessage(f"正在安装Python {version}...")
-                
-                try:
-                    # 安装Python
-                    success = self.python_manager.install_version(version, installer_path)
-                    
-                    if success:
-                        QMessageBox.information(self, "安装成功", f"Python {version} 已成功安装")
-                        self.refresh_versions()
-                    else:
-                        QMessageBox.warning(self, "安装失败", f"Python {version} 安装失败")
-                except Exception as e:
-                    QMessageBox.critical(self, "安装错误", f"安装Python {version}时发生错误: {str(e)}")
-                    logging.error(f"安装Python {version}时发生错误: {str(e)}")
-            else:
-                # 提示用户手动安装
-                result = QMessageBox.question(
-                    self, 
-                    "下载完成", 
-                    f"Python {version} 已下载完成，是否立即安装？\n\n安装文件位置: {installer_path}",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                
-                if result == QMessageBox.StandardButton.Yes:
-                    try:
-                        # 安装Python
-                        success = self.python_manager.install_version(version, installer_path)
-                        
-                        if success:
-                            QMessageBox.information(self, "安装成功", f"Python {version} 已成功安装")
-                            self.refresh_versions()
-                        else:
-                            QMessageBox.warning(self, "安装失败", f"Python {version} 安装失败")
-                    except Exception as e:
-                        QMessageBox.critical(self, "安装错误", f"安装Python {version}时发生错误: {str(e)}")
-                        logging.error(f"安装Python {version}时发生错误: {str(e)}")
-            
-            # 清除当前下载信息
-            self.current_download = None
+    def _get_download_scheduler(self):
+        """获取下载队列，并应用最新的并发数和限速设置"""
+        download_settings = self.python_manager.settings["download"]
+        if getattr(self, "download_scheduler", None) is None:
+            # 调度器在工作线程中回调，通过信号转到界面线程处理
+            self.download_bridge = DownloadSchedulerBridge()
+            self.download_bridge.job_updated.connect(self._on_download_job_updated)
+            self.download_scheduler = DownloadScheduler(self.python_manager,
+                                                        listener=self.download_bridge.job_updated.emit)
+            self.download_dialog = DownloadProgressDialog(self.download_scheduler, self)
+            self.download_job_states = {}
+        self.download_scheduler.set_max_concurrent(
+            download_settings.get("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT_DOWNLOADS))
+        self.download_scheduler.set_bandwidth_limit(download_settings.get("bandwidth_limit", 0) * 1024)
+        return self.download_scheduler
+    
+    def _download_and_install_versions(self, versions, priority=0):
+        """将版本加入下载队列，下载完成后逐个安装"""
+        scheduler = self._get_download_scheduler()
+        auto_install = self.python_manager.settings["download"].get("auto_install", True)
+        for version in versions:
+            scheduler.submit(version, priority=priority, install=auto_install)
+        
+        self.download_dialog.show()
+        self.download_dialog.raise_()
+        self.statusBar().showMessage(f"已将 {len(versions)} 个版本加入下载队列")
+    
+    def _on_download_job_updated(self, job):
+        """处理下载任务的状态和进度变化（界面线程）"""
+        self.download_dialog.update_job(job)
+        
+        previous_state = self.download_job_states.get(job["job_id"])
+        if previous_state == job["state"]:
+            return
+        self.download_job_states[job["job_id"]] = job["state"]
+        version = job["version"]
+        
+        if job["state"] == JOB_DOWNLOADING:
+            self.statusBar().showMessage(f"正在下载Python {version}...")
+        elif job["state"] == JOB_PAUSED:
+            self.statusBar().showMessage(f"Python {version} 的下载已暂停")
+        elif job["state"] == JOB_DOWNLOADED:
+            # 未开启自动安装时提示用户手动确认
+            result = QMessageBox.question(
+                self, 
+                "下载完成", 
+                f"Python {version} 已下载完成，是否立即安装？\n\n安装文件位置: {job['installer_path']}",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if result == QMessageBox.StandardButton.Yes:
+                self.download_scheduler.install(job["job_id"])
+        elif job["state"] == JOB_COMPLETED:
+            self.statusBar().showMessage(f"Python {version} 已成功安装")
+        elif job["state"] == JOB_FAILED:
+            self.statusBar().showMessage(f"Python {version} 失败: {job['error']}")
+        
+        if job["state"] in FINISHED_STATES and self.download_scheduler.is_idle():
+            self._handle_download_queue_finished()
+    
+    def _handle_download_queue_finished(self):
+        """队列中的任务全部结束后汇总结果，并在有新版本安装时刷新版本列表"""
+        jobs = self.download_scheduler.get_jobs()
+        completed = [job["version"] for job in jobs if job["state"] == JOB_COMPLETED]
+        failed = [f"Python {job['version']}: {job['error']}" for job in jobs if job["state"] == JOB_FAILED]
+        if not completed and not failed:
+            return
+        self.download_scheduler.clear_finished()
+        self.download_dialog.clear_finished_rows()
+        
+        if completed:
+            self.refresh_versions()
+        if failed:
+            QMessageBox.warning(self, "安装失败", "以下版本下载或安装失败:\n\n" + "\n".join(failed)
+                                + (f"\n\n已成功安装: {', '.join(completed)}" if completed else ""))
+        else:
+            QMessageBox.information(self, "安装成功", f"Python {', '.join(completed)} 已成功安装")
     
-    def _handle_download_error(self, version, error_msg):
-        """处理下载错误事件"""
-        if hasattr(self, 'current_download') and self.current_download:
-            self.current_download["progress_dialog"].close()
-            QMessageBox.critical(self, "下载错误", f"下载Python {version}失败: {error_msg}")
-            self.current_download = None
-
     def set_default_version(self):
         """设置默认Python版本"""
         current_item = self.version_list.currentItem()
@@ -1277,7 +1556,7 @@ class MainWindow(QMainWindow):
             return
         
         version_text = current_item.text()
-        version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_text)
+        version_match = VERSION_ITEM_PATTERN.search(version_text)
         
         if not version_match:
             return
@@ -1334,7 +1613,7 @@ class MainWindow(QMainWindow):
             return
         
         version_text = current_item.text()
-        version_match = re.search(r"Python (\d+\.\d+\.\d+)", version_text)
+        version_match = VERSION_ITEM_PATTERN.search(version_text)
         
         if not version_match:
             return
@@ -1415,9 +1694,10 @@ class MainWindow(QMainWindow):
 
 
 class MajorVersionSelectDialog(QDialog):
-    def __init__(self, major_versions, parent=None):
+    def __init__(self, catalog, parent=None):
         super().__init__(parent)
-        self.major_versions = major_versions  # 格式: [("3.12", ["3.12.0", ...]), ("3.11", ["3.11.5", ...])]
+        self.catalog = catalog
+        self.major_versions = catalog.get_major_versions()  # 格式: [("3.12", ["3.12.1", ...]), ("3.11", ["3.11.5", ...])]
         self.selected_major = None
         
         self.setWindowTitle("选择Python主版本")
@@ -1472,38 +1752,6 @@ class MajorVersionSelectDialog(QDialog):
             }
         """)
         
-        # 添加版本到列表
-        for major_version, minor_versions in self.major_versions:
-            item = QListWidgetItem(f"Python {major_version}")
-            
-            # 为不同主版本使用不同图标或样式
-            major = major_version.split('.')[0]
-            if major == '3':
-                minor = major_version.split('.')[1]
-                if int(minor) >= 9:
-                    item.setIcon(QIcon("website/images/version-tab.svg"))  # 最新版本
-                else:
-                    item.setIcon(QIcon("website/images/version-tab.png"))  # 较旧版本
-            else:
-                # Python 2.x版本
-                item.setIcon(QIcon("website/images/logo.png"))
-            
-            # 添加次版本数量信息
-            item.setData(Qt.ItemDataRole.UserRole, major_version)
-            item.setText(f"Python {major_version} ({len(minor_versions)} 个可用版本)")
-            
-            self.version_list.addItem(item)
-        
-        # 如果有版本，选中第一个
-        if self.major_versions:
-            self.version_list.setCurrentRow(0)
-            
-        # 当没有可用版本时显示提示
-        if not self.major_versions:
-            empty_item = QListWidgetItem("没有可用的Python版本")
-            empty_item.setFlags(Qt.ItemFlag.NoItemFlags)
-            self.version_list.addItem(empty_item)
-        
         self.version_list.itemDoubleClicked.connect(self.accept)
         layout.addWidget(self.version_list)
         
@@ -1526,6 +1774,9 @@ class MajorVersionSelectDialog(QDialog):
         
         self.version_list.currentItemChanged.connect(self.update_version_details)
         
+        # 添加版本到列表
+        self.populate_major_versions()
+        
         # 按钮区域
         buttons_layout = QHBoxLayout()
         
@@ -1565,6 +1816,55 @@ class MajorVersionSelectDialog(QDialog):
         
         self.setLayout(layout)
     
+    def populate_major_versions(self, selected_major=None):
+        """将主版本添加到列表"""
+        self.version_list.clear()
+        
+        selected_row = 0
+        for row, (major_version, minor_versions) in enumerate(self.major_versions):
+            item = QListWidgetItem(f"Python {major_version}")
+            
+            # 为不同主版本使用不同图标或样式
+            major = major_version.split('.')[0]
+            if major == '3':
+                minor = major_version.split('.')[1]
+                if int(minor) >= 9:
+                    item.setIcon(QIcon("website/images/version-tab.svg"))  # 最新版本
+                else:
+                    item.setIcon(QIcon("website/images/version-tab.png"))  # 较旧版本
+            else:
+                # Python 2.x版本
+                item.setIcon(QIcon("website/images/logo.png"))
+            
+            # 添加次版本数量信息
+            item.setData(Qt.ItemDataRole.UserRole, major_version)
+            item.setText(f"Python {major_version} ({len(minor_versions)} 个可用版本)")
+            
+            if major_version == selected_major:
+                selected_row = row
+            
+            self.version_list.addItem(item)
+        
+        # 如果有版本，选中之前选中的主版本或第一个
+        if self.major_versions:
+            self.version_list.setCurrentRow(selected_row)
+            
+        # 当没有可用版本时显示提示
+        if not self.major_versions:
+            empty_item = QListWidgetItem("没有可用的Python版本")
+            empty_item.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.version_list.addItem(empty_item)
+    
+    def set_catalog(self, catalog):
+        """后台刷新版本目录后更新列表，保留当前选中的主版本"""
+        major_versions = catalog.get_major_versions()
+        if major_versions == self.major_versions:
+            return
+        selected_major, _ = self.get_selected_major_version()
+        self.catalog = catalog
+        self.major_versions = major_versions
+        self.populate_major_versions(selected_major)
+    
     def update_version_details(self, current, previous):
         if not current or not self.major_versions:
             return
@@ -1574,11 +1874,8 @@ class MajorVersionSelectDialog(QDialog):
             return
             
         # 找到对应的主版本信息
-        minor_versions = []
-        for mv, versions in self.major_versions:
-            if mv == major_version:
-                minor_versions = versions
-                break
+        minor_versions = self.catalog.get_versions(major_version)
+        latest_version = self.catalog.latest(major_version)
         
         # 显示版本详情
         major, minor = major_version.split('.')
@@ -1601,7 +1898,7 @@ class MajorVersionSelectDialog(QDialog):
             <h3 style="color: #333333;">Python {major_version}</h3>
             <p style="color: #333333;">
                 <b>可用版本数量:</b> {len(minor_versions)}<br>
-                <b>最新版本:</b> {minor_versions[0] if minor_versions else '无'}<br>
+                <b>最新版本:</b> {latest_version or '无'}<br>
                 <b>主要特性:</b> {features}
             </p>
             <p style="color: #666666;">点击"选择"进入次版本选择</p>
@@ -1612,9 +1909,8 @@ class MajorVersionSelectDialog(QDialog):
         current_item = self.version_list.currentItem()
         if current_item:
             major_version = current_item.data(Qt.ItemDataRole.UserRole)
-            for mv, versions in self.major_versions:
-                if mv == major_version:
-                    return mv, versions
+            if major_version:
+                return major_version, self.catalog.get_versions(major_version)
         return None, []
 
 
@@ -1722,6 +2018,14 @@ class MinorVersionSelectDialog(QDialog):
         
         self.version_list.currentItemChanged.connect(self.update_version_details)
         
+        # 构建变体
+        variant_layout = QHBoxLayout()
+        variant_layout.addWidget(QLabel("构建变体:"))
+        self.variant_combo = create_variant_combo()
+        self.variant_combo.setToolTip("自由线程 (t) 和 JIT 需要 Python 3.13 及以上版本")
+        variant_layout.addWidget(self.variant_combo, 1)
+        layout.addLayout(variant_layout)
+        
         # 按钮区域
         buttons_layout = QHBoxLayout()
         
@@ -1787,93 +2091,86 @@ class MinorVersionSelectDialog(QDialog):
             return self.minor_versions[row]
         return None
 
+    def get_selected_variant(self):
+        """选中的构建变体后缀，标准构建为空字符串"""
+        return self.variant_combo.currentData()
+
 
-class DownloadThread(QThread):
-    download_complete = pyqtSignal(str, str)  # version, installer_path
-    download_error = pyqtSignal(str, str)     # version, error_message
+class CatalogRefreshThread(QThread):
+    catalog_ready = pyqtSignal(object)  # VersionCatalog
     
-    def __init__(self, python_manager, version, progress_callback=None):
+    def __init__(self, python_manager):
         super().__init__()
         self.python_manager = python_manager
-        self.version = version
-        self.progress_callback = progress_callback
-        self.cancelled = False
     
     def run(self):
         try:
-            installer_path = self.python_manager.download_version(
-                self.version, 
-                progress_callback=self.progress_callback
-            )
-            
-            if installer_path and not self.cancelled:
-                self.download_complete.emit(self.version, installer_path)
-            elif self.cancelled:
-                self.download_error.emit(self.version, "下载已取消")
-            else:
-                self.download_error.emit(self.version, "下载失败，未获取到安装文件路径")
+            # 缓存过期时发送条件请求，目录未变化只需一次304响应
+            catalog = self.python_manager.get_version_catalog()
+            self.catalog_ready.emit(catalog)
         except Exception as e:
-            self.download_error.emit(self.version, str(e))
-    
-    def cancel(self):
-        self.cancelled = True
+            logging.error(f"后台刷新版本目录失败: {str(e)}")
+
+
+class DownloadSchedulerBridge(QObject):
+    """把下载调度器在工作线程中的回调转为Qt信号"""
+    job_updated = pyqtSignal(dict)  # 任务状态快照
+
+
+PROGRESS_BAR_STYLE = """
+    QProgressBar {
+        border: 1px solid #dddddd;
+        border-radius: 4px;
+        background-color: #f5f5f5;
+        color: #333333;
+        text-align: center;
+    }
+    QProgressBar::chunk {
+        background-color: #4a86e8;
+    }
+"""
 
 
 class DownloadProgressDialog(QDialog):
-    def __init__(self, parent=None):
+    """下载队列对话框，显示总进度和每个任务的进度"""
+    
+    def __init__(self, scheduler, parent=None):
         super().__init__(parent)
-        self.setFixedSize(400, 180)
+        self.scheduler = scheduler
+        self.rows = {}  # job_id -> 行号
+        self.setWindowTitle("下载队列")
+        self.resize(560, 360)
         self.setStyleSheet("background-color: white;")
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
         
-        self.last_downloaded = 0
-        self.last_time = 0
-        
         self.init_ui()
     
     def init_ui(self):
         layout = QVBoxLayout()
         layout.setSpacing(10)
         
-        # 状态标签
+        # 总进度
         self.status_label = QLabel("正在准备下载...")
         self.status_label.setStyleSheet("color: #333333;")
         layout.addWidget(self.status_label)
         
-        # 下载大小标签
-        self.size_label = QLabel("已下载: 0 MB / 0 MB")
-        self.size_label.setStyleSheet("color: #666666;")
-        self.size_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-        layout.addWidget(self.size_label)
-        
-        # 进度条
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid #dddddd;
-                border-radius: 4px;
-                background-color: #f5f5f5;
-                color: #333333;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #4a86e8;
-            }
-        """)
+        self.progress_bar.setStyleSheet(PROGRESS_BAR_STYLE)
         layout.addWidget(self.progress_bar)
         
-        # 速度标签
-        self.speed_label = QLabel("下载速度: 0 KB/s")
-        self.speed_label.setStyleSheet("color: #666666;")
-        self.speed_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-        layout.addWidget(self.speed_label)
-        
-        # 取消按钮
-        cancel_btn = QPushButton("取消")
-        cancel_btn.clicked.connect(self.reject)
-        cancel_btn.setStyleSheet("""
+        # 任务列表
+        self.job_table = QTableWidget(0, 5)
+        self.job_table.setHorizontalHeaderLabels(["版本", "状态", "进度", "大小", "速度"])
+        self.job_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.setStyleSheet("color: #333333;")
+        layout.addWidget(self.job_table)
+        
+        button_style = """
             QPushButton {
                 background-color: white;
                 color: #333333;
@@ -1884,54 +2181,115 @@ class DownloadProgressDialog(QDialog):
             QPushButton:hover {
                 background-color: #f5f5f5;
             }
-        """)
+        """
+        
+        # 暂停、继续或取消选中的任务
+        pause_btn = QPushButton("暂停")
+        pause_btn.clicked.connect(self.pause_selected)
+        pause_btn.setStyleSheet(button_style)
+        
+        resume_btn = QPushButton("继续")
+        resume_btn.clicked.connect(self.resume_selected)
+        resume_btn.setStyleSheet(button_style)
+        
+        cancel_btn = QPushButton("取消选中任务")
+        cancel_btn.clicked.connect(self.cancel_selected)
+        cancel_btn.setStyleSheet(button_style)
+        
+        # 关闭对话框不影响后台下载
+        hide_btn = QPushButton("后台运行")
+        hide_btn.clicked.connect(self.hide)
+        hide_btn.setStyleSheet(button_style)
         
         buttons_layout = QHBoxLayout()
         buttons_layout.addStretch()
+        buttons_layout.addWidget(pause_btn)
+        buttons_layout.addWidget(resume_btn)
         buttons_layout.addWidget(cancel_btn)
+        buttons_layout.addWidget(hide_btn)
         layout.addLayout(buttons_layout)
         
         self.setLayout(layout)
     
-    def update_progress(self, progress):
-        """更新下载进度
+    def update_job(self, job):
+        """更新任务所在的行和总进度
         
         参数:
-            progress: 字典，包含以下键:
-                - downloaded: 已下载的字节数
-                - total: 总字节数
-                - percentage: 下载进度百分比
+            job: DownloadScheduler提供的任务状态快照
         """
-        downloaded = progress.get('downloaded', 0)
-        total = progress.get('total', 0)
-        percentage = progress.get('percentage', 0)
-        
-        # 更新进度条
+        row = self.rows.get(job["job_id"])
+        if row is None:
+            row = self.job_table.rowCount()
+            self.job_table.insertRow(row)
+            self.rows[job["job_id"]] = row
+            version_item = QTableWidgetItem(f"Python {job['version']}")
+            version_item.setData(Qt.ItemDataRole.UserRole, job["job_id"])
+            self.job_table.setItem(row, 0, version_item)
+            self.job_table.setItem(row, 1, QTableWidgetItem())
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 100)
+            progress_bar.setStyleSheet(PROGRESS_BAR_STYLE)
+            self.job_table.setCellWidget(row, 2, progress_bar)
+            self.job_table.setItem(row, 3, QTableWidgetItem())
+            self.job_table.setItem(row, 4, QTableWidgetItem())
+        
+        state_text = JOB_STATE_NAMES.get(job["state"], job["state"])
+        if job["error"]:
+            state_text = f"{state_text}: {job['error']}"
+        self.job_table.item(row, 1).setText(state_text)
+        self.job_table.item(row, 1).setToolTip(state_text)
+        self.job_table.cellWidget(row, 2).setValue(job["percentage"])
+        self.job_table.item(row, 3).setText(
+            f"{job['downloaded'] / (1024 * 1024):.1f} / {job['total'] / (1024 * 1024):.1f} MB")
+        speed_text = ""
+        if job["state"] == JOB_DOWNLOADING and job["speed"] > 0:
+            speed_text = format_speed(job["speed"])
+            if job["eta"] is not None:
+                speed_text += f"，剩余 {format_eta(job['eta'])}"
+        self.job_table.item(row, 4).setText(speed_text)
+        
+        self.update_total()
+    
+    def update_total(self):
+        """更新所有任务的总进度"""
+        jobs = self.scheduler.get_jobs()
+        downloaded, total = self.scheduler.get_aggregate_progress()
+        active = [job for job in jobs if job["state"] not in FINISHED_STATES]
+        speed = sum(job["speed"] for job in jobs if job["state"] == JOB_DOWNLOADING)
+        percentage = int(downloaded * 100 / total) if total > 0 else 0
         self.progress_bar.setValue(percentage)
-        
-        # 更新大小标签
-        downloaded_mb = downloaded / (1024 * 1024)
-        total_mb = total / (1024 * 1024)
-        self.size_label.setText(f"已下载: {downloaded_mb:.1f} MB / {total_mb:.1f} MB")
-        
-        # 更新窗口标题
-        self.setWindowTitle(f"下载Python - {percentage}%")
-        
-        # 计算下载速度
-        current_time = time.time()
-        if self.last_time > 0:
-            time_diff = current_time - self.last_time
-            if time_diff >= 1.0:  # 每秒更新一次速度
-                bytes_diff = downloaded - self.last_downloaded
-                speed = bytes_diff / time_diff / 1024  # KB/s
-                
-                if speed >= 1024:
-                    self.speed_label.setText(f"下载速度: {speed/1024:.2f} MB/s")
-                else:
-                    self.speed_label.setText(f"下载速度: {speed:.1f} KB/s")
-                
-                self.last_downloaded = downloaded
-                self.last_time = current_time
-        else:
-            self.last_downloaded = downloaded
-            self.last_time = current_time 
+        status = (f"共 {len(jobs)} 个任务，{len(active)} 个进行中；"
+                  f"已下载 {downloaded / (1024 * 1024):.1f} MB / {total / (1024 * 1024):.1f} MB")
+        if speed > 0:
+            status += f"，{format_speed(speed)}"
+            if total > downloaded:
+                status += f"，剩余 {format_eta((total - downloaded) / speed)}"
+        self.status_label.setText(status)
+        self.setWindowTitle(f"下载队列 - {percentage}%")
+    
+    def get_selected_job_ids(self):
+        rows = {index.row() for index in self.job_table.selectedIndexes()}
+        return [self.job_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+                for row in sorted(rows) if self.job_table.item(row, 0)]
+    
+    def pause_selected(self):
+        for job_id in self.get_selected_job_ids():
+            self.scheduler.pause(job_id)
+    
+    def resume_selected(self):
+        for job_id in self.get_selected_job_ids():
+            self.scheduler.resume(job_id)
+    
+    def cancel_selected(self):
+        for job_id in self.get_selected_job_ids():
+            self.scheduler.cancel(job_id)
+    
+    def clear_finished_rows(self):
+        """移除调度器中已清除的任务所在的行"""
+        existing = {job["job_id"] for job in self.scheduler.get_jobs()}
+        for row in reversed(range(self.job_table.rowCount())):
+            item = self.job_table.item(row, 0)
+            if item and item.data(Qt.ItemDataRole.UserRole) not in existing:
+                self.job_table.removeRow(row)
+        self.rows = {self.job_table.item(row, 0).data(Qt.ItemDataRole.UserRole): row
+                     for row in range(self.job_table.rowCount())}